@@ -1,18 +1,16 @@
 from __future__ import annotations
 
-from dateutil import parser
 import aio_pika
 
 from shared.shared.consumer import run_consumer_with_retry_dlq
 from shared.shared.idempotency import already_processed
-from shared.shared.intervals import fully_contains as contains_interval, overlaps
-
 from .redis_client import redis_client
-from .reservations import create_reservation, get_reservation, delete_reservation
+from .reservations import create_reservation, get_reservation, delete_reservation, reservation_ttl
 from .events import build_event
 from .outbox_worker import enqueue_domain_event
 from .messaging import RABBIT_URL, EXCHANGE_NAME
-from .slot_helpers import avail_key, parse_raw_slot
+from .slot_helpers import parse_dt
+from .slot_store import has_containing_slot, subtract_interval
 
 QUEUE_NAME = "availability_service_booking_events"
 RETRY_QUEUE = "availability_service_booking_events_retry"
@@ -27,76 +25,20 @@ ROUTING_KEYS = [
 IDEMPOTENCY_TTL = 3600
 
 
-async def read_current_slots(email: str) -> list[dict]:
-    slots = await redis_client.lrange(avail_key(email), 0, -1)
-
-    parsed: list[dict] = []
-    for slot in slots or []:
-        result = parse_raw_slot(slot)
-        if result is None:
-            continue
-        ss, ee = result
-        parsed.append({"start": ss.isoformat(), "end": ee.isoformat()})
-
-    return parsed
-
-
-async def emit_availability_updated(email: str) -> None:
-    ev = build_event(
-        "availability.updated",
-        {
-            "email": email,
-            "slots": await read_current_slots(email),
-        },
-    )
+async def emit_availability_updated(change: dict) -> None:
+    """Publishes the delta returned by the slot store; no-op changes are skipped."""
+    if not change.get("version"):
+        return
+    ev = build_event("availability.updated", change)
     await enqueue_domain_event(ev)
 
 
 async def handyman_has_slot(email: str, desired_start: str, desired_end: str) -> bool:
-    ds = parser.isoparse(desired_start)
-    de = parser.isoparse(desired_end)
-
-    if de <= ds:
-        return False
-
-    slots = await redis_client.lrange(avail_key(email), 0, -1)
-    for slot in slots:
-        result = parse_raw_slot(slot)
-        if result is None:
-            continue
-        ss, ee = result
-        if contains_interval(ss, ee, ds, de):
-            return True
-
-    return False
-
-
-async def apply_confirm_to_slots(email: str, desired_start: str, desired_end: str):
-    ds = parser.isoparse(desired_start)
-    de = parser.isoparse(desired_end)
-
-    key = avail_key(email)
-    slots = await redis_client.lrange(key, 0, -1)
-
-    new_slots: list[str] = []
-    for slot in slots:
-        result = parse_raw_slot(slot)
-        if result is None:
-            continue
-        ss, ee = result
-
-        if not overlaps(ss, ee, ds, de):
-            new_slots.append(f"{ss.isoformat()}|{ee.isoformat()}")
-            continue
+    return await has_containing_slot(email, parse_dt(desired_start), parse_dt(desired_end))
 
-        if ss < ds:
-            new_slots.append(f"{ss.isoformat()}|{ds.isoformat()}")
-        if ee > de:
-            new_slots.append(f"{de.isoformat()}|{ee.isoformat()}")
 
-    await redis_client.delete(key)
-    if new_slots:
-        await redis_client.rpush(key, *new_slots)
+async def apply_confirm_to_slots(email: str, desired_start: str, desired_end: str) -> dict:
+    return await subtract_interval(email, parse_dt(desired_start), parse_dt(desired_end))
 
 
 async def process_event(payload: dict):
@@ -146,6 +88,7 @@ async def process_event(payload: dict):
             handyman_email,
             desired_start,
             desired_end,
+            ttl_seconds=reservation_ttl(data.get("hold_seconds"), data.get("category")),
         )
         if ok:
             ev = build_event(
@@ -193,9 +136,9 @@ async def process_event(payload: dict):
             await enqueue_domain_event(ev)
             return
 
-        await apply_confirm_to_slots(handyman_email, desired_start, desired_end)
+        change = await apply_confirm_to_slots(handyman_email, desired_start, desired_end)
         await delete_reservation(booking_id)
-        await emit_availability_updated(handyman_email)
+        await emit_availability_updated(change)
 
         ev = build_event(
             "slot.confirmed",
@@ -1,3 +1,5 @@
 from shared.shared.events import make_event_builder
 
-build_event = make_event_builder("availability-service")
+EVENT_SOURCE = "availability-service"
+
+build_event = make_event_builder(EVENT_SOURCE)
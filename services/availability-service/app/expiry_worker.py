@@ -1,36 +1,42 @@
 import asyncio
 import time
 
-from .redis_client import redis_client
-from .reservations import delete_reservation, get_reservation
-from .events import build_event
-from .outbox_worker import enqueue_domain_event
+from .reservations import claim_expired_reservations
 
-EXPIRY_ZSET = "reservation_expiry"
+EXPIRY_BATCH = 200
+# Sleep until the next reservation expires, within these bounds. The upper
+# bound also caps how late a reservation created meanwhile can be noticed.
+EXPIRY_MIN_SLEEP_SECONDS = 0.05
+EXPIRY_MAX_SLEEP_SECONDS = 2.0
+
+
+def _sleep_seconds(now: float, next_score: float | None, claimed: int) -> float:
+    if claimed >= EXPIRY_BATCH:
+        return 0.0
+    if next_score is None:
+        return EXPIRY_MAX_SLEEP_SECONDS
+    return min(EXPIRY_MAX_SLEEP_SECONDS, max(EXPIRY_MIN_SLEEP_SECONDS, next_score - now))
+
+
+async def expire_due_reservations(now: float) -> tuple[int, float | None]:
+    """Claims one batch of expired reservations; the claim enqueues their slot.expired events."""
+    claimed, next_score = await claim_expired_reservations(now, EXPIRY_BATCH)
+    return len(claimed), next_score
 
 
 async def expiry_loop(stop_event: asyncio.Event):
     while not stop_event.is_set():
         now = time.time()
-        expired = await redis_client.zrangebyscore(EXPIRY_ZSET, 0, now, start=0, num=50)
-
-        if expired:
-            for booking_id in expired:
-                await redis_client.zrem(EXPIRY_ZSET, booking_id)
-                reservation = await get_reservation(booking_id)
-                await delete_reservation(booking_id)
-
-                ev = build_event(
-                    "slot.expired",
-                    {
-                        "booking_id": booking_id,
-                        "user_email": (reservation or {}).get("user_email"),
-                        "handyman_email": (reservation or {}).get("handyman_email"),
-                    },
-                )
-                await enqueue_domain_event(ev)
+        try:
+            claimed, next_score = await expire_due_reservations(now)
+            delay = _sleep_seconds(now, next_score, claimed)
+        except Exception as e:
+            print(f"[availability-service] expiry batch failed: {e}")
+            delay = EXPIRY_MAX_SLEEP_SECONDS
 
+        if delay <= 0:
+            continue
         try:
-            await asyncio.wait_for(stop_event.wait(), timeout=2.0)
+            await asyncio.wait_for(stop_event.wait(), timeout=delay)
         except asyncio.TimeoutError:
-            continue
\ No newline at end of file
+            continue
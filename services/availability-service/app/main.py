@@ -7,6 +7,8 @@ from .messaging import publisher, RABBIT_URL, EXCHANGE_NAME
 from .event_consumer import start_consumer, QUEUE_NAME, ROUTING_KEYS
 from .expiry_worker import expiry_loop
 from .outbox_worker import worker, outbox_stats
+from .slot_store import build_availability_index, migrate_legacy_slots
+from .reservations import migrate_legacy_holds
 
 
 @asynccontextmanager
@@ -41,6 +43,27 @@ async def lifespan(app: FastAPI):
 
     await worker.start()
 
+    try:
+        migrated = await migrate_legacy_slots()
+        if migrated:
+            print(f"[availability-service] migrated {migrated} legacy availability lists")
+    except Exception as e:
+        print(f"[availability-service] legacy availability migration failed: {e}")
+
+    try:
+        indexed = await build_availability_index()
+        if indexed:
+            print(f"[availability-service] indexed {indexed} handymen with availability")
+    except Exception as e:
+        print(f"[availability-service] availability index backfill failed: {e}")
+
+    try:
+        held = await migrate_legacy_holds()
+        if held:
+            print(f"[availability-service] migrated {held} legacy reservation holds")
+    except Exception as e:
+        print(f"[availability-service] legacy reservation migration failed: {e}")
+
     expiry_task = asyncio.create_task(expiry_loop(stop_event))
     consumer_task = asyncio.create_task(consumer_with_retry())
 
@@ -1,28 +1,280 @@
 from __future__ import annotations
 
 import json
+import os
 import time
-from datetime import datetime
-from dateutil import parser
+from datetime import datetime, timezone
 
-from shared.shared.intervals import overlaps
+from shared.shared.events import utc_now_iso
 
+from .events import EVENT_SOURCE
+from .outbox_worker import OUTBOX_PENDING
 from .redis_client import redis_client
+from .slot_helpers import epoch_str, parse_dt
 
-RES_TTL_SECONDS = 300
+RES_TTL_SECONDS = int(os.getenv("RESERVATION_TTL_SECONDS") or "300")
+# Upper bound for any hold, requested or extended, counted from now.
+RES_MAX_TTL_SECONDS = int(os.getenv("RESERVATION_MAX_TTL_SECONDS") or "3600")
+
+
+def _parse_ttl_by_category(raw: str | None) -> dict[str, int]:
+    try:
+        entries = json.loads(raw or "{}")
+        if not isinstance(entries, dict):
+            raise ValueError("expected a JSON object")
+    except ValueError as e:
+        print(f"[availability-service] ignoring RESERVATION_TTL_BY_CATEGORY: {e}")
+        return {}
+
+    out: dict[str, int] = {}
+    for category, seconds in entries.items():
+        try:
+            out[str(category).lower()] = int(seconds)
+        except (TypeError, ValueError):
+            print(
+                f"[availability-service] ignoring RESERVATION_TTL_BY_CATEGORY "
+                f"entry {category!r}: {seconds!r}"
+            )
+    return out
+
+
+# Default hold per booking category as JSON, e.g. {"plumbing": 900}.
+RES_TTL_BY_CATEGORY = _parse_ttl_by_category(os.getenv("RESERVATION_TTL_BY_CATEGORY"))
+# Reservation payloads outlive their hold by this much so the expiry worker
+# can still read who to notify when it claims them.
+RES_PAYLOAD_GRACE_SECONDS = 60
 EXPIRY_ZSET = "reservation_expiry"
+RES_KEY_PREFIX = "reservation:"
+RES_WINDOWS_PREFIX = "reservation_windows:"
+RES_WINDOW_ENDS_PREFIX = "reservation_window_ends:"
+RES_WINDOWS_MAXLEN_PREFIX = "reservation_windows_maxlen:"
+# booking_id -> handyman email for every indexed hold, so cleanup can find
+# the handyman's window keys after the payload is gone.
+RES_HOLDERS_HASH = "reservation_holders"
+# Per-handyman sets of booking ids written by earlier releases.
+LEGACY_RES_HANDYMAN_SET_PREFIX = "reservations_by_handyman:"
+
+# Each handyman's holds are booking ids in a sorted set scored by epoch
+# start, with the epoch ends in a hash and the longest hold next to them
+# (the same bound the slot sets use). A hold can only overlap [ds, de) if
+# it starts in [ds - maxlen, de), so the conflict check reads just those
+# neighbours. A hold counts only while reservation_expiry still scores it
+# in the future; index entries are removed together with that entry.
+#
+# KEYS: reservation, windows, window ends, windows maxlen, expiry zset, holders
+# ARGV: booking_id, ds_epoch, de_epoch, payload, payload ttl, expires_at, now,
+#       handyman email
+RESERVE_LUA = """
+local ds = tonumber(ARGV[2])
+local de = tonumber(ARGV[3])
+local now = tonumber(ARGV[7])
+local raw = redis.call('GET', KEYS[4])
+local lo = '-inf'
+if raw then lo = ds - tonumber(raw) end
+
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], lo, '(' .. ARGV[3])) do
+  if id ~= ARGV[1] then
+    local ee = tonumber(redis.call('HGET', KEYS[3], id))
+    local expires = tonumber(redis.call('ZSCORE', KEYS[5], id))
+    if ee and ee > ds and expires and expires > now then
+      return 0
+    end
+  end
+end
+
+redis.call('SET', KEYS[1], ARGV[4], 'EX', ARGV[5])
+redis.call('ZADD', KEYS[2], ds, ARGV[1])
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[3])
+local len = math.ceil(de - ds) + 1
+if len > tonumber(raw or '0') then redis.call('SET', KEYS[4], len) end
+redis.call('ZADD', KEYS[5], ARGV[6], ARGV[1])
+redis.call('HSET', KEYS[6], ARGV[1], ARGV[8])
+return 1
+"""
+
+# Lua helper shared by the claim and delete scripts: removes a hold from its
+# handyman's window index. The holder comes from the holders hash; holds
+# indexed before it existed fall back to the payload.
+_UNINDEX_HOLD_LUA = """
+local function unindex_hold(holders, id, raw, windows_prefix, ends_prefix)
+  local email = redis.call('HGET', holders, id)
+  if not email and raw then
+    local ok, obj = pcall(cjson.decode, raw)
+    if ok and type(obj) == 'table' and type(obj.handyman_email) == 'string' then
+      email = obj.handyman_email
+    end
+  end
+  if email then
+    redis.call('ZREM', windows_prefix .. email, id)
+    redis.call('HDEL', ends_prefix .. email, id)
+  end
+  redis.call('HDEL', holders, id)
+end
+"""
+
+# Claims up to ARGV[2] reservations whose hold ended by ARGV[1]: each id is
+# removed from the expiry index together with its payload and handyman
+# window, so concurrent workers never claim the same id twice. The window
+# keys derive from the claimed ids and cannot be declared up front. Cleanup
+# goes through the holders hash, so it also works once the payload expired.
+#
+# The slot.expired outbox entry for each claimed id is pushed in the same
+# script (same envelope as outbox_worker._envelope), so a crash can never
+# leave a claimed hold without its event. The event id is derived from the
+# booking id and its expiry score, so a replayed event dedupes downstream.
+# Returns {{id, payload or false, ...}, next expiry score or false}.
+#
+# KEYS: expiry zset, holders, outbox pending list
+# ARGV: now, limit, reservation key prefix, windows prefix, window ends prefix,
+#       occurred_at, created_at_ms, event source
+CLAIM_EXPIRED_LUA = _UNINDEX_HOLD_LUA + """
+local rows = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, tonumber(ARGV[2]))
+local out = {}
+for i = 1, #rows, 2 do
+  local id = rows[i]
+  redis.call('ZREM', KEYS[1], id)
+  local key = ARGV[3] .. id
+  local raw = redis.call('GET', key)
+  if raw then redis.call('DEL', key) end
+  unindex_hold(KEYS[2], id, raw, ARGV[4], ARGV[5])
+
+  local user_email, handyman_email = cjson.null, cjson.null
+  if raw then
+    local ok, obj = pcall(cjson.decode, raw)
+    if ok and type(obj) == 'table' then
+      if type(obj.user_email) == 'string' then user_email = obj.user_email end
+      if type(obj.handyman_email) == 'string' then handyman_email = obj.handyman_email end
+    end
+  end
+  local event = {
+    event_id = 'slot.expired:' .. id .. ':' .. rows[i + 1],
+    event_type = 'slot.expired',
+    occurred_at = ARGV[6],
+    source = ARGV[8],
+    data = {booking_id = id, user_email = user_email, handyman_email = handyman_email},
+  }
+  redis.call('RPUSH', KEYS[3], cjson.encode({
+    routing_key = 'slot.expired',
+    payload = event,
+    attempts = 0,
+    created_at_ms = tonumber(ARGV[7]),
+    last_error = cjson.null,
+  }))
+
+  table.insert(out, id)
+  table.insert(out, raw or false)
+end
+local nxt = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {out, nxt[2] or false}
+"""
+
+# Drops a reservation with its expiry entry and window index entries.
+#
+# KEYS: reservation, expiry zset, holders
+# ARGV: booking_id, windows prefix, window ends prefix
+DELETE_RESERVATION_LUA = _UNINDEX_HOLD_LUA + """
+local raw = redis.call('GET', KEYS[1])
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+unindex_hold(KEYS[3], ARGV[1], raw, ARGV[2], ARGV[3])
+return 1
+"""
+
+# Pushes an active hold's expiry to at least ARGV[2] and stretches the payload
+# TTL to match. Holds already past their expiry (or claimed) are left alone,
+# so an extension can never revive a reservation the worker is expiring.
+# Returns the new expiry score, or false.
+#
+# KEYS: expiry zset, reservation
+# ARGV: booking_id, expires_at, now, payload grace
+EXTEND_LUA = """
+local score = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[1]))
+local now = tonumber(ARGV[3])
+if not score or score <= now or redis.call('EXISTS', KEYS[2]) == 0 then
+  return false
+end
+local expires = math.max(score, tonumber(ARGV[2]))
+redis.call('ZADD', KEYS[1], expires, ARGV[1])
+redis.call('EXPIRE', KEYS[2], math.ceil(expires - now) + tonumber(ARGV[4]))
+return tostring(expires)
+"""
+
+# Active holds overlapping [ARGV[1], ARGV[2]), read with the same neighbour
+# bound and expiry test as RESERVE_LUA. Returns {start, end, ...} epochs.
+#
+# KEYS: windows, window ends, windows maxlen, expiry zset
+# ARGV: lo, hi, now
+ACTIVE_HOLDS_LUA = """
+local lo = tonumber(ARGV[1])
+local now = tonumber(ARGV[3])
+local raw = redis.call('GET', KEYS[3])
+local from = '-inf'
+if raw then from = lo - tonumber(raw) end
+
+local rows = redis.call('ZRANGEBYSCORE', KEYS[1], from, '(' .. ARGV[2], 'WITHSCORES')
+local out = {}
+for i = 1, #rows, 2 do
+  local id = rows[i]
+  local ee = tonumber(redis.call('HGET', KEYS[2], id))
+  local expires = tonumber(redis.call('ZSCORE', KEYS[4], id))
+  if ee and ee > lo and expires and expires > now then
+    table.insert(out, rows[i + 1])
+    table.insert(out, tostring(ee))
+  end
+end
+return out
+"""
+
+# Carries one hold from a legacy reservations_by_handyman set into the window
+# index. Holds whose payload is gone or whose expiry entry has passed (or was
+# already claimed) are skipped; the expiry worker deals with those.
+#
+# KEYS: reservation, windows, window ends, windows maxlen, expiry zset, holders
+# ARGV: booking_id, ds_epoch, de_epoch, now, handyman email
+MIGRATE_LEGACY_HOLD_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+local expires = tonumber(redis.call('ZSCORE', KEYS[5], ARGV[1]))
+if not expires or expires <= tonumber(ARGV[4]) then return 0 end
+
+local ds = tonumber(ARGV[2])
+local de = tonumber(ARGV[3])
+redis.call('ZADD', KEYS[2], ds, ARGV[1])
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[3])
+local raw = redis.call('GET', KEYS[4])
+local len = math.ceil(de - ds) + 1
+if len > tonumber(raw or '0') then redis.call('SET', KEYS[4], len) end
+redis.call('HSET', KEYS[6], ARGV[1], ARGV[5])
+return 1
+"""
+
+_reserve_script = redis_client.register_script(RESERVE_LUA)
+_extend_script = redis_client.register_script(EXTEND_LUA)
+_active_holds_script = redis_client.register_script(ACTIVE_HOLDS_LUA)
+_claim_expired_script = redis_client.register_script(CLAIM_EXPIRED_LUA)
+_delete_reservation_script = redis_client.register_script(DELETE_RESERVATION_LUA)
+_migrate_legacy_hold_script = redis_client.register_script(MIGRATE_LEGACY_HOLD_LUA)
+
+
+def reservation_ttl(hold_seconds: int | None = None, category: str | None = None) -> int:
+    """Requested hold, else the category default, else RES_TTL_SECONDS; capped."""
+    ttl = hold_seconds or RES_TTL_BY_CATEGORY.get((category or "").lower()) or RES_TTL_SECONDS
+    return max(1, min(int(ttl), RES_MAX_TTL_SECONDS))
 
 
 def _res_key(booking_id: str) -> str:
-    return f"reservation:{booking_id}"
+    return f"{RES_KEY_PREFIX}{booking_id}"
+
+
+def _res_windows_key(email: str) -> str:
+    return f"{RES_WINDOWS_PREFIX}{email}"
 
 
-def _res_handyman_set(email: str) -> str:
-    return f"reservations_by_handyman:{email}"
+def _res_window_ends_key(email: str) -> str:
+    return f"{RES_WINDOW_ENDS_PREFIX}{email}"
 
 
-def _parse(dt_str: str) -> datetime:
-    return parser.isoparse(dt_str)
+def _res_windows_maxlen_key(email: str) -> str:
+    return f"{RES_WINDOWS_MAXLEN_PREFIX}{email}"
 
 
 async def create_reservation(
@@ -31,28 +283,15 @@ async def create_reservation(
     handyman_email: str,
     desired_start: str,
     desired_end: str,
+    ttl_seconds: int = RES_TTL_SECONDS,
 ) -> bool:
     """
     Idempotent reservation creation.
     Returns True if reservation stored, False if conflicts with existing reservations.
     """
-    ds = _parse(desired_start)
-    de = _parse(desired_end)
-
-    set_key = _res_handyman_set(handyman_email)
-    existing = await redis_client.smembers(set_key)
-    for bid in existing:
-        data = await redis_client.get(_res_key(bid))
-        if not data:
-            continue
-        try:
-            obj = json.loads(data)
-            ods = _parse(obj["desired_start"])
-            ode = _parse(obj["desired_end"])
-        except Exception:
-            continue
-        if overlaps(ods, ode, ds, de):
-            return False
+    ds = parse_dt(desired_start)
+    de = parse_dt(desired_end)
+    now = time.time()
 
     payload = {
         "booking_id": booking_id,
@@ -60,16 +299,31 @@ async def create_reservation(
         "handyman_email": handyman_email,
         "desired_start": desired_start,
         "desired_end": desired_end,
-        "created_at": time.time(),
+        "created_at": now,
+        "hold_seconds": ttl_seconds,
     }
 
-    pipe = redis_client.pipeline()
-    pipe.set(_res_key(booking_id), json.dumps(payload), ex=RES_TTL_SECONDS)
-    pipe.sadd(set_key, booking_id)
-    pipe.expire(set_key, RES_TTL_SECONDS + 30)
-    pipe.zadd(EXPIRY_ZSET, {booking_id: time.time() + RES_TTL_SECONDS})
-    await pipe.execute()
-    return True
+    stored = await _reserve_script(
+        keys=[
+            _res_key(booking_id),
+            _res_windows_key(handyman_email),
+            _res_window_ends_key(handyman_email),
+            _res_windows_maxlen_key(handyman_email),
+            EXPIRY_ZSET,
+            RES_HOLDERS_HASH,
+        ],
+        args=[
+            booking_id,
+            epoch_str(ds),
+            epoch_str(de),
+            json.dumps(payload),
+            ttl_seconds + RES_PAYLOAD_GRACE_SECONDS,
+            now + ttl_seconds,
+            now,
+            handyman_email,
+        ],
+    )
+    return bool(stored)
 
 
 async def get_reservation(booking_id: str) -> dict | None:
@@ -82,11 +336,106 @@ async def get_reservation(booking_id: str) -> dict | None:
         return None
 
 
+async def extend_reservation(booking_id: str, seconds: int) -> float | None:
+    """
+    Keeps an active hold for at least `seconds` more (capped at
+    RES_MAX_TTL_SECONDS) and returns its expiry; None when the hold is gone.
+    """
+    now = time.time()
+    expires = await _extend_script(
+        keys=[EXPIRY_ZSET, _res_key(booking_id)],
+        args=[booking_id, now + min(seconds, RES_MAX_TTL_SECONDS), now, RES_PAYLOAD_GRACE_SECONDS],
+    )
+    return float(expires) if expires is not None else None
+
+
+async def active_holds(email: str, lo: datetime, hi: datetime) -> list[tuple[datetime, datetime]]:
+    """Windows of the handyman's unexpired holds overlapping [lo, hi)."""
+    flat = await _active_holds_script(
+        keys=[
+            _res_windows_key(email),
+            _res_window_ends_key(email),
+            _res_windows_maxlen_key(email),
+            EXPIRY_ZSET,
+        ],
+        args=[epoch_str(lo), epoch_str(hi), time.time()],
+    ) or []
+    return [
+        (datetime.fromtimestamp(float(ds), timezone.utc), datetime.fromtimestamp(float(de), timezone.utc))
+        for ds, de in zip(flat[0::2], flat[1::2])
+    ]
+
+
 async def delete_reservation(booking_id: str) -> None:
-    res = await get_reservation(booking_id)
-    pipe = redis_client.pipeline()
-    pipe.delete(_res_key(booking_id))
-    pipe.zrem(EXPIRY_ZSET, booking_id)
-    if res and res.get("handyman_email"):
-        pipe.srem(_res_handyman_set(res["handyman_email"]), booking_id)
-    await pipe.execute()
\ No newline at end of file
+    await _delete_reservation_script(
+        keys=[_res_key(booking_id), EXPIRY_ZSET, RES_HOLDERS_HASH],
+        args=[booking_id, RES_WINDOWS_PREFIX, RES_WINDOW_ENDS_PREFIX],
+    )
+
+
+async def claim_expired_reservations(
+    now: float, limit: int
+) -> tuple[list[tuple[str, dict | None]], float | None]:
+    """
+    Atomically removes up to limit expired reservations, enqueueing their
+    slot.expired events in the same step, and returns them as
+    (booking_id, payload) pairs plus the score of the next pending expiry.
+    """
+    flat, next_score = await _claim_expired_script(
+        keys=[EXPIRY_ZSET, RES_HOLDERS_HASH, OUTBOX_PENDING],
+        args=[
+            now,
+            limit,
+            RES_KEY_PREFIX,
+            RES_WINDOWS_PREFIX,
+            RES_WINDOW_ENDS_PREFIX,
+            utc_now_iso(),
+            int(time.time() * 1000),
+            EVENT_SOURCE,
+        ],
+    )
+
+    claimed: list[tuple[str, dict | None]] = []
+    for booking_id, raw in zip(flat[0::2], flat[1::2]):
+        try:
+            payload = json.loads(raw) if raw else None
+        except Exception:
+            payload = None
+        claimed.append((booking_id, payload))
+    return claimed, float(next_score) if next_score is not None else None
+
+
+async def migrate_legacy_holds(batch: int = 200) -> int:
+    """
+    Moves holds still listed in reservations_by_handyman:{email} sets into
+    the window index and deletes the sets. Safe to run on every startup.
+    """
+    migrated = 0
+    cursor = 0
+    while True:
+        cursor, keys = await redis_client.scan(cursor=cursor, match=f"{LEGACY_RES_HANDYMAN_SET_PREFIX}*", count=batch)
+        for k in keys or []:
+            if await redis_client.type(k) != "set":
+                continue
+            email = k[len(LEGACY_RES_HANDYMAN_SET_PREFIX):]
+            for booking_id in await redis_client.smembers(k) or ():
+                res = await get_reservation(booking_id)
+                try:
+                    ds = parse_dt(res["desired_start"])
+                    de = parse_dt(res["desired_end"])
+                except Exception:
+                    continue
+                migrated += int(await _migrate_legacy_hold_script(
+                    keys=[
+                        _res_key(booking_id),
+                        _res_windows_key(email),
+                        _res_window_ends_key(email),
+                        _res_windows_maxlen_key(email),
+                        EXPIRY_ZSET,
+                        RES_HOLDERS_HASH,
+                    ],
+                    args=[booking_id, epoch_str(ds), epoch_str(de), time.time(), email],
+                ) or 0)
+            await redis_client.delete(k)
+        if not cursor:
+            return migrated
@@ -1,97 +1,173 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
-from dateutil import parser
-
-from shared.shared.intervals import fully_contains as contains_interval
+import json
+from datetime import datetime, timedelta, timezone
 
-from .redis_client import redis_client
-from .schemas import SetAvailability, OverlapRequest, AvailabilitySlot
-from .reservations import get_reservation, delete_reservation
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from shared.shared.intervals import free_windows
+from shared.shared.recurrence import MAX_EXPANSION_DAYS, normalize_rules
+
+from .schemas import (
+    SetAvailability,
+    OverlapRequest,
+    AvailabilitySlot,
+    AvailabilityRules,
+    BulkAvailabilityCheck,
+    ExtendReservation,
+)
+from .reservations import active_holds, get_reservation, delete_reservation, extend_reservation
 from .events import build_event
 from .outbox_worker import enqueue_domain_event
-from .slot_helpers import avail_key
+from .slot_helpers import parse_dt
+from .slot_store import (
+    clear_availability as clear_all_availability,
+    get_rules,
+    has_containing_slot,
+    has_containing_slots,
+    iter_availability,
+    list_slots_page,
+    read_availability,
+    read_open_intervals,
+    replace_slots,
+    set_rules,
+)
 
 router = APIRouter()
 
 
-def _slots_payload(slots: list[AvailabilitySlot]) -> list[dict]:
-    out: list[dict] = []
+async def emit_availability_updated(email: str, version: int, **parts) -> None:
+    """
+    Publishes one versioned change. Full parts (slots, rules, blocked)
+    replace what consumers hold; slots_added / slots_removed / blocked_added
+    apply on top of version - 1. Anything left out is unchanged.
+    """
+    ev = build_event("availability.updated", {"email": email, "version": version, **parts})
+    await enqueue_domain_event(ev)
+
+
+def _parse_slots(slots: list[AvailabilitySlot]) -> list[tuple[datetime, datetime]]:
+    out: list[tuple[datetime, datetime]] = []
     for s in slots or []:
         try:
-            out.append({"start": str(s.start), "end": str(s.end)})
+            start, end = parse_dt(s.start), parse_dt(s.end)
         except Exception:
-            continue
+            raise HTTPException(status_code=400, detail="Invalid datetime format")
+        if end <= start:
+            raise HTTPException(status_code=400, detail="Slot end must be after start")
+        out.append((start, end))
     return out
 
 
-async def emit_availability_updated(email: str, slots_payload: list[dict]) -> None:
-    ev = build_event("availability.updated", {"email": email, "slots": slots_payload})
-    await enqueue_domain_event(ev)
+# Registered before /availability/{email} so "check" is not taken for an email.
+@router.post("/availability/check")
+async def check_availability_bulk(req: BulkAvailabilityCheck):
+    checks = []
+    for c in req.checks:
+        try:
+            checks.append((c.email, parse_dt(c.desired_start), parse_dt(c.desired_end)))
+        except Exception:
+            raise HTTPException(status_code=400, detail=f"Invalid datetime format for {c.email}")
+
+    return {"available": await has_containing_slots(checks)}
 
 
 @router.post("/availability/{email}")
 async def set_availability(email: str, data: SetAvailability):
-    key = avail_key(email)
-    await redis_client.delete(key)
+    change = await replace_slots(email, _parse_slots(data.slots))
+    await emit_availability_updated(**change)
+    return {"message": "Availability updated"}
 
-    if data.slots:
-        await redis_client.rpush(key, *[f"{slot.start}|{slot.end}" for slot in data.slots])
 
-    await emit_availability_updated(email, _slots_payload(data.slots))
-    return {"message": "Availability updated"}
+@router.get("/availability/export")
+async def export_availability(batch: int = Query(500, ge=1, le=5000)):
+    """Every indexed handyman's availability as NDJSON, one document per line."""
 
+    async def lines():
+        async for items in iter_availability(batch):
+            yield "".join(json.dumps(item, separators=(",", ":")) + "\n" for item in items)
 
-@router.get("/availability/{email}")
-async def get_availability(email: str):
-    key = avail_key(email)
-    slots = await redis_client.lrange(key, 0, -1)
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
-    parsed: list[dict] = []
-    for slot in slots:
-        try:
-            start, end = slot.split("|")
-            parsed.append({"start": start, "end": end})
-        except Exception:
-            continue
 
-    return {"email": email, "slots": parsed}
+@router.get("/availability/{email}")
+async def get_availability(email: str):
+    return await read_availability(email)
 
 
 @router.delete("/availability/{email}")
 async def clear_availability(email: str):
-    key = avail_key(email)
-    await redis_client.delete(key)
-    await emit_availability_updated(email, [])
+    version = await clear_all_availability(email)
+    await emit_availability_updated(email, version, slots=[], rules=None, blocked=[])
     return {"message": "Availability cleared"}
 
 
+@router.put("/availability/{email}/rules")
+async def set_availability_rules(email: str, data: AvailabilityRules):
+    try:
+        rules = normalize_rules(data.model_dump())
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid availability rules: {e}")
+
+    version = await set_rules(email, rules)
+    await emit_availability_updated(email, version, rules=rules, blocked=[])
+    return {"message": "Availability rules updated", "rules": rules}
+
+
+@router.get("/availability/{email}/rules")
+async def get_availability_rules(email: str):
+    return {"email": email, "rules": await get_rules(email)}
+
+
+@router.delete("/availability/{email}/rules")
+async def clear_availability_rules(email: str):
+    version = await set_rules(email, None)
+    await emit_availability_updated(email, version, rules=None, blocked=[])
+    return {"message": "Availability rules cleared"}
+
+
 @router.post("/availability/{email}/overlap")
 async def check_overlap(email: str, req: OverlapRequest):
     try:
-        ds = parser.isoparse(req.desired_start)
-        de = parser.isoparse(req.desired_end)
+        ds = parse_dt(req.desired_start)
+        de = parse_dt(req.desired_end)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid datetime format")
 
-    if de <= ds:
-        return {"available": False}
-
-    key = avail_key(email)
-    slots = await redis_client.lrange(key, 0, -1)
+    return {"available": await has_containing_slot(email, ds, de)}
 
-    for slot in slots:
-        try:
-            s, e = slot.split("|")
-            ss = parser.isoparse(s)
-            ee = parser.isoparse(e)
-        except Exception:
-            continue
-
-        if contains_interval(ss, ee, ds, de):
-            return {"available": True}
 
-    return {"available": False}
+@router.get("/availability/{email}/free-windows")
+async def find_free_windows(
+    email: str,
+    duration_minutes: int = Query(..., ge=5, le=1440),
+    horizon_days: int = Query(14, ge=1, le=MAX_EXPANSION_DAYS),
+    limit: int = Query(5, ge=1, le=100),
+    start: str | None = None,
+):
+    """The next `limit` windows that a booking of `duration_minutes` would fit."""
+    now = datetime.now(timezone.utc)
+    try:
+        lo = max(parse_dt(start), now) if start else now
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid datetime format")
+    hi = lo + timedelta(days=horizon_days)
+
+    intervals, blocked = await read_open_intervals(email, lo, hi)
+    busy = blocked + await active_holds(email, lo, hi)
+    windows = free_windows(
+        [(ss, min(ee, hi)) for ss, ee in intervals],
+        busy,
+        timedelta(minutes=duration_minutes),
+        limit,
+        not_before=lo,
+    )
+    return {
+        "email": email,
+        "duration_minutes": duration_minutes,
+        "windows": [{"start": ws.isoformat(), "end": we.isoformat()} for ws, we in windows],
+    }
 
 
 @router.get("/availability")
@@ -99,25 +175,8 @@ async def list_all_availability(
     limit: int = Query(200, ge=1, le=1000),
     cursor: int = Query(0, ge=0),
 ):
-    pattern = "availability:*"
-    next_cursor, keys = await redis_client.scan(cursor=cursor, match=pattern, count=limit)
-
-    items: list[dict] = []
-    for k in keys or []:
-        if not isinstance(k, str) or ":" not in k:
-            continue
-        _, email = k.split(":", 1)
-        slots = await redis_client.lrange(k, 0, -1)
-        parsed: list[dict] = []
-        for slot in slots or []:
-            try:
-                start, end = slot.split("|")
-                parsed.append({"start": start, "end": end})
-            except Exception:
-                continue
-        items.append({"email": email, "slots": parsed})
-
-    return {"cursor": int(next_cursor or 0), "items": items}
+    next_cursor, items = await list_slots_page(cursor, limit)
+    return {"cursor": next_cursor, "items": items}
 
 
 @router.get("/reservations/{booking_id}")
@@ -126,6 +185,14 @@ async def get_reservation_endpoint(booking_id: str):
     return {"booking_id": booking_id, "reservation": res}
 
 
+@router.post("/reservations/{booking_id}/extend")
+async def extend_reservation_endpoint(booking_id: str, req: ExtendReservation):
+    expires_at = await extend_reservation(booking_id, req.seconds)
+    if expires_at is None:
+        raise HTTPException(status_code=404, detail="Reservation not found or already expired")
+    return {"booking_id": booking_id, "expires_at": expires_at}
+
+
 @router.delete("/reservations/{booking_id}")
 async def delete_reservation_endpoint(booking_id: str):
     await delete_reservation(booking_id)
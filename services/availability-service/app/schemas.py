@@ -2,4 +2,8 @@ from shared.shared.schemas.availability import (
     AvailabilitySlot,
     SetAvailability,
     OverlapRequest,
+    AvailabilityCheck,
+    BulkAvailabilityCheck,
+    AvailabilityRules,
+    ExtendReservation,
 )
\ No newline at end of file
@@ -1,15 +1,80 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+
 from dateutil import parser
 
+SLOTS_KEY_PREFIX = "avail:slots:"
+
+# Set of handyman emails that have published slots or rules; exports walk it
+# with SSCAN instead of scanning the keyspace.
+AVAIL_INDEX_KEY = "avail:index"
+
 
 def avail_key(email: str) -> str:
+    """
+    Sorted set of "start|end|end_epoch" members scored by the slot's epoch
+    start; the trailing end epoch lets server-side scripts compare intervals
+    without parsing ISO timestamps.
+    """
+    return f"{SLOTS_KEY_PREFIX}{email}"
+
+
+def avail_maxlen_key(email: str) -> str:
+    """Upper bound (seconds) on the length of any slot in avail_key(email)."""
+    return f"avail:maxlen:{email}"
+
+
+def rules_key(email: str) -> str:
+    """Normalized recurrence document (JSON), see shared.recurrence."""
+    return f"avail:rules:{email}"
+
+
+def blocked_key(email: str) -> str:
+    """Booked windows carved out of rule occurrences; same layout as avail_key."""
+    return f"avail:blocked:{email}"
+
+
+def blocked_maxlen_key(email: str) -> str:
+    return f"avail:blocked_maxlen:{email}"
+
+
+def version_key(email: str) -> str:
+    """Counter bumped with every change, carried by availability.updated events."""
+    return f"avail:version:{email}"
+
+
+def legacy_avail_key(email: str) -> str:
     return f"availability:{email}"
 
 
+def parse_dt(value: str) -> datetime:
+    dt = parser.isoparse(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
 def parse_raw_slot(raw: str):
     try:
-        s, e = raw.split("|")
-        return parser.isoparse(s), parser.isoparse(e)
+        s, e = raw.split("|")[:2]
+        return parse_dt(s), parse_dt(e)
     except Exception:
         return None
+
+
+def epoch_str(dt: datetime) -> str:
+    return repr(dt.timestamp())
+
+
+def encode_slot(start: datetime, end: datetime) -> tuple[str, float]:
+    """Returns the (member, score) pair stored for a slot."""
+    return f"{start.isoformat()}|{end.isoformat()}|{epoch_str(end)}", start.timestamp()
+
+
+def slot_dict(raw: str) -> dict | None:
+    result = parse_raw_slot(raw)
+    if result is None:
+        return None
+    ss, ee = result
+    return {"start": ss.isoformat(), "end": ee.isoformat()}
@@ -0,0 +1,487 @@
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime
+
+from shared.shared.intervals import fully_contains as contains_interval
+from shared.shared.recurrence import expand_rules, rules_contain
+
+from .redis_client import redis_client
+from .slot_helpers import (
+    AVAIL_INDEX_KEY,
+    SLOTS_KEY_PREFIX,
+    avail_key,
+    avail_maxlen_key,
+    blocked_key,
+    blocked_maxlen_key,
+    encode_slot,
+    epoch_str,
+    legacy_avail_key,
+    parse_raw_slot,
+    rules_key,
+    slot_dict,
+    version_key,
+)
+
+RULES_KEY_PREFIX = rules_key("")
+AVAIL_INDEX_BUILT_KEY = "avail:index:built"
+
+# Slots are members of a sorted set scored by their epoch start, next to a
+# per-handyman upper bound on slot length. A slot can only contain or overlap
+# [a, b) if its start lies in [a - maxlen, b], so lookups are a short
+# ZRANGEBYSCORE instead of a scan of every published slot.
+#
+# The same bound trims the past: anything starting before now - maxlen has
+# ended. A missing maxlen key (should not happen) falls back to a full range.
+#
+# KEYS: zset, maxlen   ARGV: now, lo, hi (hi may be "(x" or "+inf")
+FIND_SLOTS_LUA = """
+local raw = redis.call('GET', KEYS[2])
+local lo = '-inf'
+if raw then
+  local maxlen = tonumber(raw)
+  redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. (tonumber(ARGV[1]) - maxlen))
+  lo = tonumber(ARGV[2]) - maxlen
+end
+return redis.call('ZRANGEBYSCORE', KEYS[1], lo, ARGV[3])
+"""
+
+# Swaps the whole slot set, bumps the version and returns the previous
+# members so callers can publish what was added and removed. The email
+# leaves the index once it has neither slots nor rules.
+#
+# KEYS: zset, maxlen, version, index, rules
+# ARGV: email, maxlen seconds (or ""), score, member, ...
+REPLACE_SLOTS_LUA = """
+local old = redis.call('ZRANGE', KEYS[1], 0, -1)
+redis.call('DEL', KEYS[1], KEYS[2])
+for i = 3, #ARGV, 2 do
+  redis.call('ZADD', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+if ARGV[2] ~= '' then
+  redis.call('SET', KEYS[2], ARGV[2])
+  redis.call('SADD', KEYS[4], ARGV[1])
+elseif redis.call('EXISTS', KEYS[5]) == 0 then
+  redis.call('SREM', KEYS[4], ARGV[1])
+end
+return {redis.call('INCR', KEYS[3]), old}
+"""
+
+# Replaces (or with an empty ARGV[2], removes) the rules and drops the
+# blocked set carved out of the old ones. Keeps the index in step the same
+# way REPLACE_SLOTS_LUA does. Returns the new version.
+#
+# KEYS: rules, blocked, blocked_maxlen, version, index, zset
+# ARGV: email, rules json (or "")
+SET_RULES_LUA = """
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[3])
+if ARGV[2] ~= '' then
+  redis.call('SET', KEYS[1], ARGV[2])
+  redis.call('SADD', KEYS[5], ARGV[1])
+elseif redis.call('ZCARD', KEYS[6]) == 0 then
+  redis.call('SREM', KEYS[5], ARGV[1])
+end
+return redis.call('INCR', KEYS[4])
+"""
+
+# Removes [ds, de) from the slot set in place: overlapping members are
+# replaced by their uncovered remainders, everything else is left alone.
+# When the window overlaps a rule occurrence it is also recorded in the
+# blocked set, whether or not explicit slots were split: otherwise the rules
+# would keep offering the booked time once the slot check falls through to
+# them. The caller expands the rules it read (ARGV[5], ARGV[6]); if they
+# changed since, the window is blocked whenever rules exist, which is safe.
+# The version is only bumped when something changed (0 otherwise).
+# Returns {version, removed members, added members, blocked members added}.
+#
+# KEYS: zset, maxlen, rules, blocked, blocked_maxlen, version, index
+# ARGV: ds_epoch, de_epoch, ds_iso, de_iso, overlaps rules ("1"/""), rules raw,
+#       email
+SUBTRACT_INTERVAL_LUA = """
+local ds = tonumber(ARGV[1])
+local de = tonumber(ARGV[2])
+local raw = redis.call('GET', KEYS[2])
+local lo = '-inf'
+if raw then lo = ds - tonumber(raw) end
+
+local cands = redis.call('ZRANGEBYSCORE', KEYS[1], lo, '(' .. ARGV[2], 'WITHSCORES')
+local removed, added, blocked = {}, {}, {}
+for i = 1, #cands, 2 do
+  local member = cands[i]
+  local ss = tonumber(cands[i + 1])
+  local s_iso, e_iso, e_epoch = string.match(member, '^([^|]*)|([^|]*)|([^|]*)$')
+  local ee = tonumber(e_epoch)
+  if ee and ss < de and ee > ds then
+    redis.call('ZREM', KEYS[1], member)
+    table.insert(removed, member)
+    if ss < ds then
+      local piece = s_iso .. '|' .. ARGV[3] .. '|' .. ARGV[1]
+      redis.call('ZADD', KEYS[1], ss, piece)
+      table.insert(added, piece)
+    end
+    if ee > de then
+      local piece = ARGV[4] .. '|' .. e_iso .. '|' .. e_epoch
+      redis.call('ZADD', KEYS[1], de, piece)
+      table.insert(added, piece)
+    end
+  end
+end
+
+local rules = redis.call('GET', KEYS[3])
+if rules and (ARGV[5] == '1' or rules ~= ARGV[6]) then
+  local member = ARGV[3] .. '|' .. ARGV[4] .. '|' .. ARGV[2]
+  redis.call('ZADD', KEYS[4], ds, member)
+  table.insert(blocked, member)
+  local len = math.ceil(de - ds) + 1
+  local cur = tonumber(redis.call('GET', KEYS[5]) or '0')
+  if len > cur then redis.call('SET', KEYS[5], len) end
+end
+
+if #removed == 0 and #blocked == 0 then
+  return {0, removed, added, blocked}
+end
+if not rules and redis.call('ZCARD', KEYS[1]) == 0 then
+  redis.call('SREM', KEYS[7], ARGV[7])
+end
+return {redis.call('INCR', KEYS[6]), removed, added, blocked}
+"""
+
+_find_slots_script = redis_client.register_script(FIND_SLOTS_LUA)
+_replace_slots_script = redis_client.register_script(REPLACE_SLOTS_LUA)
+_set_rules_script = redis_client.register_script(SET_RULES_LUA)
+_subtract_interval_script = redis_client.register_script(SUBTRACT_INTERVAL_LUA)
+
+
+def _slot_seconds(start: datetime, end: datetime) -> int:
+    return int((end - start).total_seconds()) + 1
+
+
+def _slot_dicts(members: list[str] | None) -> list[dict]:
+    return [s for s in (slot_dict(raw) for raw in members or []) if s is not None]
+
+
+def _parse_members(members: list[str] | None) -> list[tuple[datetime, datetime]]:
+    return [p for p in (parse_raw_slot(raw) for raw in members or []) if p is not None]
+
+
+def _rules_from_raw(raw: str | None) -> dict | None:
+    try:
+        return json.loads(raw) if raw else None
+    except Exception:
+        return None
+
+
+async def find_slots(email: str, lo: float, hi: float | str, *, now: float | None = None) -> list[str]:
+    """Raw members that may intersect [lo, hi]; callers do the exact interval test."""
+    now = time.time() if now is None else now
+    return await _find_slots_script(
+        keys=[avail_key(email), avail_maxlen_key(email)],
+        args=[now, lo, hi],
+    ) or []
+
+
+async def find_blocked(email: str, lo: float, hi: float | str, *, now: float | None = None) -> list[str]:
+    now = time.time() if now is None else now
+    return await _find_slots_script(
+        keys=[blocked_key(email), blocked_maxlen_key(email)],
+        args=[now, lo, hi],
+    ) or []
+
+
+async def read_slots(email: str) -> list[dict]:
+    return _slot_dicts(await find_slots(email, 0, "+inf"))
+
+
+async def get_rules(email: str) -> dict | None:
+    return _rules_from_raw(await redis_client.get(rules_key(email)))
+
+
+async def get_version(email: str) -> int:
+    return int(await redis_client.get(version_key(email)) or 0)
+
+
+async def set_rules(email: str, rules: dict | None) -> int:
+    """
+    Stores normalized rules; replacing or removing them also drops the
+    blocked set. Returns the new availability version.
+    """
+    version = await _set_rules_script(
+        keys=[
+            rules_key(email),
+            blocked_key(email),
+            blocked_maxlen_key(email),
+            version_key(email),
+            AVAIL_INDEX_KEY,
+            avail_key(email),
+        ],
+        args=[email, json.dumps(rules, separators=(",", ":")) if rules else ""],
+    )
+    return int(version)
+
+
+async def read_availability(email: str) -> dict:
+    """Explicit slots, recurrence rules and upcoming blocked windows."""
+    # The version is read first: a change landing between the reads is
+    # replayed on top of this document by its delta event, which is harmless.
+    version = await get_version(email)
+    return {
+        "email": email,
+        "version": version,
+        "slots": await read_slots(email),
+        "rules": await get_rules(email),
+        "blocked": _slot_dicts(await find_blocked(email, 0, "+inf")),
+    }
+
+
+async def replace_slots(email: str, slots: list[tuple[datetime, datetime]]) -> dict:
+    """
+    Swaps the whole slot set atomically so readers never see it half written,
+    and returns the change as {email, version, slots_added, slots_removed}.
+    """
+    encoded = dict(encode_slot(s, e) for s, e in slots)
+    args: list = [email, max(_slot_seconds(s, e) for s, e in slots) if slots else ""]
+    for member, score in encoded.items():
+        args.extend([score, member])
+
+    version, old = await _replace_slots_script(
+        keys=[avail_key(email), avail_maxlen_key(email), version_key(email), AVAIL_INDEX_KEY, rules_key(email)],
+        args=args,
+    )
+    old = set(old or [])
+    return {
+        "email": email,
+        "version": int(version),
+        "slots_added": _slot_dicts(sorted(m for m in encoded if m not in old)),
+        "slots_removed": _slot_dicts(sorted(m for m in old if m not in encoded)),
+    }
+
+
+async def clear_availability(email: str) -> int:
+    """Drops slots, rules and blocked windows; the version survives."""
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(
+        avail_key(email),
+        avail_maxlen_key(email),
+        rules_key(email),
+        blocked_key(email),
+        blocked_maxlen_key(email),
+    )
+    pipe.srem(AVAIL_INDEX_KEY, email)
+    pipe.incr(version_key(email))
+    return int((await pipe.execute())[-1])
+
+
+async def has_containing_slot(email: str, ds: datetime, de: datetime) -> bool:
+    if de <= ds:
+        return False
+
+    for raw in await find_slots(email, de.timestamp(), ds.timestamp()):
+        result = parse_raw_slot(raw)
+        if result is None:
+            continue
+        ss, ee = result
+        if contains_interval(ss, ee, ds, de):
+            return True
+
+    rules = await get_rules(email)
+    if not rules:
+        return False
+    blocked = _parse_members(await find_blocked(email, ds.timestamp(), f"({de.timestamp()}"))
+    return rules_contain(rules, blocked, ds, de)
+
+
+async def has_containing_slots(checks: list[tuple[str, datetime, datetime]]) -> list[bool]:
+    """
+    Bulk has_containing_slot: every check's slot, rule and blocked lookups
+    go out in one pipeline, results come back in request order.
+    """
+    now = time.time()
+    pipe = redis_client.pipeline()
+    queued: list[int] = []
+    for i, (email, ds, de) in enumerate(checks):
+        if de <= ds:
+            continue
+        await _find_slots_script(
+            keys=[avail_key(email), avail_maxlen_key(email)],
+            args=[now, de.timestamp(), ds.timestamp()],
+            client=pipe,
+        )
+        pipe.get(rules_key(email))
+        await _find_slots_script(
+            keys=[blocked_key(email), blocked_maxlen_key(email)],
+            args=[now, ds.timestamp(), f"({de.timestamp()}"],
+            client=pipe,
+        )
+        queued.append(i)
+
+    results = [False] * len(checks)
+    if not queued:
+        return results
+
+    rows = await pipe.execute()
+    for n, i in enumerate(queued):
+        _email, ds, de = checks[i]
+        members, rules_raw, blocked = rows[3 * n:3 * n + 3]
+        if any(contains_interval(ss, ee, ds, de) for ss, ee in _parse_members(members)):
+            results[i] = True
+            continue
+        rules = _rules_from_raw(rules_raw)
+        results[i] = bool(rules) and rules_contain(rules, _parse_members(blocked), ds, de)
+    return results
+
+
+async def read_open_intervals(
+    email: str, lo: datetime, hi: datetime
+) -> tuple[list[tuple[datetime, datetime]], list[tuple[datetime, datetime]]]:
+    """
+    Explicit slots and rule occurrences overlapping [lo, hi) in start order,
+    plus the blocked windows carved out of them, from one pipeline.
+    """
+    now = time.time()
+    pipe = redis_client.pipeline()
+    await _find_slots_script(
+        keys=[avail_key(email), avail_maxlen_key(email)],
+        args=[now, lo.timestamp(), f"({hi.timestamp()}"],
+        client=pipe,
+    )
+    pipe.get(rules_key(email))
+    await _find_slots_script(
+        keys=[blocked_key(email), blocked_maxlen_key(email)],
+        args=[now, lo.timestamp(), f"({hi.timestamp()}"],
+        client=pipe,
+    )
+    members, rules_raw, blocked = await pipe.execute()
+
+    intervals = _parse_members(members) + expand_rules(_rules_from_raw(rules_raw), lo, hi)
+    intervals.sort()
+    return intervals, _parse_members(blocked)
+
+
+async def subtract_interval(email: str, ds: datetime, de: datetime) -> dict:
+    """
+    Removes [ds, de) from the handyman's availability atomically, splitting
+    only the slots it touches and blocking the window out of any rule
+    occurrence it overlaps. Returns the change as {email, version, slots_added,
+    slots_removed, blocked_added}; version is None when nothing changed.
+    """
+    rules_raw = await redis_client.get(rules_key(email))
+    in_rules = bool(expand_rules(_rules_from_raw(rules_raw), ds, de))
+    version, removed, added, blocked = await _subtract_interval_script(
+        keys=[
+            avail_key(email),
+            avail_maxlen_key(email),
+            rules_key(email),
+            blocked_key(email),
+            blocked_maxlen_key(email),
+            version_key(email),
+            AVAIL_INDEX_KEY,
+        ],
+        args=[
+            epoch_str(ds),
+            epoch_str(de),
+            ds.isoformat(),
+            de.isoformat(),
+            "1" if in_rules else "",
+            rules_raw or "",
+            email,
+        ],
+    )
+    return {
+        "email": email,
+        "version": int(version) or None,
+        "slots_added": _slot_dicts(added),
+        "slots_removed": _slot_dicts(removed),
+        "blocked_added": _slot_dicts(blocked),
+    }
+
+
+async def list_slots_page(cursor: int, limit: int) -> tuple[int, list[dict]]:
+    """
+    One SSCAN page of the availability index, read back with a single
+    pipeline. Like any SSCAN, an email may appear on more than one page.
+    """
+    next_cursor, members = await redis_client.sscan(AVAIL_INDEX_KEY, cursor=cursor, count=limit)
+    emails = list(dict.fromkeys(m for m in members or [] if isinstance(m, str)))
+    if not emails:
+        return int(next_cursor or 0), []
+
+    pipe = redis_client.pipeline()
+    for email in emails:
+        pipe.zrange(avail_key(email), 0, -1)
+        pipe.get(rules_key(email))
+        pipe.zrange(blocked_key(email), 0, -1)
+        pipe.get(version_key(email))
+    rows = await pipe.execute()
+
+    items: list[dict] = []
+    for i, email in enumerate(emails):
+        members, rules_raw, blocked, version = rows[4 * i:4 * i + 4]
+        items.append(
+            {
+                "email": email,
+                "version": int(version or 0),
+                "slots": _slot_dicts(members),
+                "rules": _rules_from_raw(rules_raw),
+                "blocked": _slot_dicts(blocked),
+            }
+        )
+    return int(next_cursor or 0), items
+
+
+async def iter_availability(batch: int = 500):
+    """Yields every indexed handyman's availability, one page of items at a time."""
+    cursor = 0
+    while True:
+        cursor, items = await list_slots_page(cursor, batch)
+        if items:
+            yield items
+        if not cursor:
+            return
+
+
+async def build_availability_index(batch: int = 500) -> int:
+    """
+    Backfills avail:index from the slot and rule keys written before it
+    existed. Runs once; later writes maintain the index themselves.
+    """
+    if await redis_client.exists(AVAIL_INDEX_BUILT_KEY):
+        return 0
+
+    added = 0
+    cursor = 0
+    while True:
+        cursor, keys = await redis_client.scan(cursor=cursor, match="avail:*", count=batch)
+        emails = {
+            k[len(prefix):]
+            for k in keys or []
+            if isinstance(k, str)
+            for prefix in (SLOTS_KEY_PREFIX, RULES_KEY_PREFIX)
+            if k.startswith(prefix)
+        }
+        if emails:
+            added += int(await redis_client.sadd(AVAIL_INDEX_KEY, *emails) or 0)
+        if not cursor:
+            await redis_client.set(AVAIL_INDEX_BUILT_KEY, "1")
+            return added
+
+
+async def migrate_legacy_slots(batch: int = 200) -> int:
+    """
+    Converts availability:{email} lists written by earlier releases into the
+    sorted-set layout and deletes them. Safe to run on every startup.
+    """
+    migrated = 0
+    cursor = 0
+    while True:
+        cursor, keys = await redis_client.scan(cursor=cursor, match=legacy_avail_key("*"), count=batch)
+        for k in keys or []:
+            if await redis_client.type(k) != "list":
+                continue
+            email = k.split(":", 1)[1]
+            parsed = [p for p in (parse_raw_slot(raw) for raw in await redis_client.lrange(k, 0, -1)) if p]
+            await replace_slots(email, [(s, e) for s, e in parsed if e > s])
+            await redis_client.delete(k)
+            migrated += 1
+        if not cursor:
+            return migrated
@@ -0,0 +1,57 @@
+"""add composite indexes for booking list queries
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_bookings_user_email_created_at",
+        "bookings",
+        ["user_email", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_bookings_handyman_email_created_at",
+        "bookings",
+        ["handyman_email", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_bookings_user_email_desired_start",
+        "bookings",
+        ["user_email", "desired_start"],
+    )
+    op.create_index(
+        "ix_bookings_handyman_email_desired_start",
+        "bookings",
+        ["handyman_email", "desired_start"],
+    )
+    op.create_index(
+        "ix_bookings_status_created_at",
+        "bookings",
+        ["status", "created_at", "id"],
+    )
+
+    op.drop_index("ix_bookings_status", table_name="bookings")
+    op.drop_index("ix_bookings_handyman_email", table_name="bookings")
+    op.drop_index("ix_bookings_user_email", table_name="bookings")
+
+
+def downgrade():
+    op.create_index("ix_bookings_user_email", "bookings", ["user_email"], unique=False)
+    op.create_index("ix_bookings_handyman_email", "bookings", ["handyman_email"], unique=False)
+    op.create_index("ix_bookings_status", "bookings", ["status"], unique=False)
+
+    op.drop_index("ix_bookings_status_created_at", table_name="bookings")
+    op.drop_index("ix_bookings_handyman_email_desired_start", table_name="bookings")
+    op.drop_index("ix_bookings_user_email_desired_start", table_name="bookings")
+    op.drop_index("ix_bookings_handyman_email_created_at", table_name="bookings")
+    op.drop_index("ix_bookings_user_email_created_at", table_name="bookings")
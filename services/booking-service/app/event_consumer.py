@@ -1,13 +1,12 @@
 from __future__ import annotations
 
-from sqlalchemy import select
 import aio_pika
 
 from shared.shared.consumer import run_consumer_with_retry_dlq
 
 from .db import SessionLocal
-from .models import Booking
 from .messaging import EXCHANGE_NAME, RABBIT_URL, publisher
+from .state_machine import apply_slot_event
 
 QUEUE_NAME = "booking_service_domain_events"
 RETRY_QUEUE = "booking_service_domain_events_retry"
@@ -31,33 +30,7 @@ async def process_event(payload: dict):
         return
 
     async with SessionLocal() as db:
-        res = await db.execute(select(Booking).where(Booking.booking_id == booking_id))
-        booking = res.scalar_one_or_none()
-        if not booking:
-            return
-
-        if event_type == "slot.reserved":
-            if booking.status == "PENDING":
-                booking.status = "RESERVED"
-
-        elif event_type == "slot.rejected":
-            if booking.status in ("PENDING", "RESERVED"):
-                booking.status = "FAILED"
-                booking.failure_reason = data.get("reason") or "slot_rejected"
-
-        elif event_type == "slot.confirmed":
-            if booking.status == "RESERVED":
-                booking.status = "CONFIRMED"
-
-        elif event_type == "slot.expired":
-            if booking.status in ("PENDING", "RESERVED"):
-                booking.status = "EXPIRED"
-
-        elif event_type == "slot.released":
-            if booking.status not in ("CANCELED", "REJECTED"):
-                booking.status = "CANCELED"
-                booking.cancellation_reason = booking.cancellation_reason or "released"
-
+        await apply_slot_event(db, event_type, booking_id, data)
         await db.commit()
 
 
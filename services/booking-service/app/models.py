@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean, Index
 from sqlalchemy.sql import func
 
 from .db import Base
@@ -7,6 +7,13 @@ from shared.shared.outbox_model import make_outbox_event_model
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_user_email_created_at", "user_email", "created_at", "id"),
+        Index("ix_bookings_handyman_email_created_at", "handyman_email", "created_at", "id"),
+        Index("ix_bookings_user_email_desired_start", "user_email", "desired_start"),
+        Index("ix_bookings_handyman_email_desired_start", "handyman_email", "desired_start"),
+        Index("ix_bookings_status_created_at", "status", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     booking_id = Column(String, unique=True, nullable=False, index=True)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Booking
+
+ACTIVE_BOOKING_STATUSES = ("PENDING", "RESERVED", "CONFIRMED")
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def list_bookings_page(
+    db: AsyncSession,
+    *,
+    limit: int,
+    cursor: str | None = None,
+    status: str | None = None,
+    user_email: str | None = None,
+    handyman_email: str | None = None,
+) -> tuple[Sequence[Booking], str | None]:
+    stmt = select(Booking)
+
+    if user_email:
+        stmt = stmt.where(Booking.user_email == user_email)
+    if handyman_email:
+        stmt = stmt.where(Booking.handyman_email == handyman_email)
+    if status:
+        stmt = stmt.where(Booking.status == status)
+
+    if cursor:
+        c_created_at, c_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Booking.created_at, Booking.id) < tuple_(c_created_at, c_id))
+
+    stmt = stmt.order_by(Booking.created_at.desc(), Booking.id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows, next_cursor
+
+
+async def list_upcoming_bookings(
+    db: AsyncSession,
+    *,
+    now: datetime,
+    limit: int,
+    user_email: str | None = None,
+    handyman_email: str | None = None,
+) -> Sequence[Booking]:
+    stmt = select(Booking).where(
+        Booking.desired_start >= now,
+        Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+    )
+
+    if user_email:
+        stmt = stmt.where(Booking.user_email == user_email)
+    if handyman_email:
+        stmt = stmt.where(Booking.handyman_email == handyman_email)
+
+    stmt = stmt.order_by(Booking.desired_start.asc(), Booking.id.asc()).limit(limit)
+    return (await db.execute(stmt)).scalars().all()
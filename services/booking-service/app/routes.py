@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 
 from .db import SessionLocal
@@ -9,6 +9,7 @@ from .models import Booking, OutboxEvent
 from .schemas import (
     CreateBooking,
     BookingResponse,
+    BookingListResponse,
     CancelBooking,
     CancelBookingResponse,
     ConfirmBookingResponse,
@@ -17,7 +18,10 @@ from .schemas import (
     RejectBookingRequest,
     RejectBookingResponse,
 )
+from . import state_machine
+from .auth import get_current_email, get_current_roles, is_admin
 from .events import build_event
+from .repository import list_bookings_page, list_upcoming_bookings
 from shared.shared.outbox_helpers import add_outbox_event
 from shared.shared.crud_helpers import fetch_or_404
 
@@ -48,6 +52,38 @@ def _to_response(booking: Booking) -> BookingResponse:
     )
 
 
+def _event_data(booking: Booking, **extra) -> dict:
+    return {
+        "booking_id": booking.booking_id,
+        "user_email": booking.user_email,
+        "handyman_email": booking.handyman_email,
+        "desired_start": booking.desired_start,
+        "desired_end": booking.desired_end,
+        "job_description": booking.job_description,
+        **extra,
+    }
+
+
+async def _current_or_404(db, booking_id: str) -> Booking:
+    booking = await state_machine.get_booking(db, booking_id)
+    if booking is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return booking
+
+
+def _owner_clause(owner_field: str, email: str, roles: list[str]) -> tuple:
+    if is_admin(roles):
+        return ()
+    return (getattr(Booking, owner_field) == email,)
+
+
+async def _current_for_caller(db, booking_id: str, *, owner_field: str, email: str, roles: list[str], detail: str) -> Booking:
+    booking = await _current_or_404(db, booking_id)
+    if not is_admin(roles) and getattr(booking, owner_field) != email:
+        raise HTTPException(status_code=403, detail=detail)
+    return booking
+
+
 @router.post("/bookings", response_model=BookingResponse)
 async def create_booking(data: CreateBooking):
     booking_id = str(uuid.uuid4())
@@ -61,6 +97,8 @@ async def create_booking(data: CreateBooking):
             "desired_start": data.desired_start,
             "desired_end": data.desired_end,
             "job_description": data.job_description,
+            "hold_seconds": data.hold_seconds,
+            "category": data.category,
         },
     )
 
@@ -95,24 +133,25 @@ async def get_booking(booking_id: str):
 
 
 @router.post("/bookings/{booking_id}/confirm", response_model=ConfirmBookingResponse)
-async def confirm_booking(booking_id: str):
+async def confirm_booking(
+    booking_id: str,
+    email: str = Depends(get_current_email),
+    roles: list[str] = Depends(get_current_roles),
+):
     async with SessionLocal() as db:
-        booking = await fetch_or_404(db, Booking, filter_column=Booking.booking_id, filter_value=booking_id, detail="Booking not found")
+        booking = await _current_for_caller(
+            db,
+            booking_id,
+            owner_field="handyman_email",
+            email=email,
+            roles=roles,
+            detail="Cannot confirm another handyman's booking",
+        )
 
         if booking.status != "RESERVED":
-            raise HTTPException(status_code=400, detail=f"Cannot confirm booking in status {booking.status}")
+            raise HTTPException(status_code=409, detail=f"Cannot confirm booking in status {booking.status}")
 
-        event = build_event(
-            "booking.confirm_requested",
-            {
-                "booking_id": booking.booking_id,
-                "user_email": booking.user_email,
-                "handyman_email": booking.handyman_email,
-                "desired_start": booking.desired_start,
-                "desired_end": booking.desired_end,
-                "job_description": booking.job_description,
-            },
-        )
+        event = build_event("booking.confirm_requested", _event_data(booking))
 
         add_outbox_event(db, OutboxEvent, event)
 
@@ -121,32 +160,38 @@ async def confirm_booking(booking_id: str):
 
 
 @router.post("/bookings/{booking_id}/cancel", response_model=CancelBookingResponse)
-async def cancel_booking(booking_id: str, data: CancelBooking):
+async def cancel_booking(
+    booking_id: str,
+    data: CancelBooking,
+    email: str = Depends(get_current_email),
+    roles: list[str] = Depends(get_current_roles),
+):
     async with SessionLocal() as db:
-        booking = await fetch_or_404(db, Booking, filter_column=Booking.booking_id, filter_value=booking_id, detail="Booking not found")
+        booking = await state_machine.cancel(
+            db,
+            booking_id,
+            reason=data.reason or "user_requested",
+            where=_owner_clause("user_email", email, roles),
+        )
 
-        if booking.status in ("CANCELED", "FAILED", "EXPIRED", "REJECTED"):
+        if booking is None:
+            booking = await _current_for_caller(
+                db,
+                booking_id,
+                owner_field="user_email",
+                email=email,
+                roles=roles,
+                detail="Cannot cancel another user's booking",
+            )
             return CancelBookingResponse(
                 booking_id=booking.booking_id,
                 status=booking.status,
                 cancellation_reason=booking.cancellation_reason,
             )
 
-        booking.status = "CANCELED"
-        booking.cancellation_reason = data.reason or "user_requested"
-        booking.canceled_at = datetime.now(timezone.utc)
-
         event = build_event(
             "booking.cancel_requested",
-            {
-                "booking_id": booking.booking_id,
-                "user_email": booking.user_email,
-                "handyman_email": booking.handyman_email,
-                "desired_start": booking.desired_start,
-                "desired_end": booking.desired_end,
-                "job_description": booking.job_description,
-                "reason": booking.cancellation_reason,
-            },
+            _event_data(booking, reason=booking.cancellation_reason),
         )
 
         add_outbox_event(db, OutboxEvent, event)
@@ -160,47 +205,32 @@ async def cancel_booking(booking_id: str, data: CancelBooking):
         )
 
 
-@router.post("/bookings/{booking_id}/complete/user", response_model=CompleteBookingResponse)
-async def complete_booking_as_user(booking_id: str):
+async def _complete_booking(booking_id: str, by: str, email: str, roles: list[str]) -> CompleteBookingResponse:
+    owner_field = f"{by}_email"
+
     async with SessionLocal() as db:
-        booking = await fetch_or_404(db, Booking, filter_column=Booking.booking_id, filter_value=booking_id, detail="Booking not found")
+        booking = await state_machine.mark_completed(
+            db,
+            booking_id,
+            by=by,
+            where=_owner_clause(owner_field, email, roles),
+        )
 
-        if booking.status != "CONFIRMED":
-            raise HTTPException(status_code=400, detail=f"Cannot complete booking in status {booking.status}")
-
-        booking.completed_by_user = True
-
-        if booking.completed_by_user and booking.completed_by_handyman:
-            booking.status = "COMPLETED"
-            booking.completed_at = datetime.now(timezone.utc)
-            event = build_event(
-                "booking.completed",
-                {
-                    "booking_id": booking.booking_id,
-                    "user_email": booking.user_email,
-                    "handyman_email": booking.handyman_email,
-                    "desired_start": booking.desired_start,
-                    "desired_end": booking.desired_end,
-                    "job_description": booking.job_description,
-                },
-            )
-        else:
-            event = build_event(
-                "booking.completed_by_user",
-                {
-                    "booking_id": booking.booking_id,
-                    "user_email": booking.user_email,
-                    "handyman_email": booking.handyman_email,
-                    "desired_start": booking.desired_start,
-                    "desired_end": booking.desired_end,
-                    "job_description": booking.job_description,
-                },
+        if booking is None:
+            booking = await _current_for_caller(
+                db,
+                booking_id,
+                owner_field=owner_field,
+                email=email,
+                roles=roles,
+                detail=f"Cannot complete another {by}'s booking as {by}",
             )
+            raise HTTPException(status_code=409, detail=f"Cannot complete booking in status {booking.status}")
 
-        add_outbox_event(db, OutboxEvent, event)
+        event_type = "booking.completed" if booking.status == "COMPLETED" else f"booking.completed_by_{by}"
+        add_outbox_event(db, OutboxEvent, build_event(event_type, _event_data(booking)))
 
         await db.commit()
-        await db.refresh(booking)
 
         return CompleteBookingResponse(
             booking_id=booking.booking_id,
@@ -211,86 +241,55 @@ async def complete_booking_as_user(booking_id: str):
         )
 
 
-@router.post("/bookings/{booking_id}/complete/handyman", response_model=CompleteBookingResponse)
-async def complete_booking_as_handyman(booking_id: str):
-    async with SessionLocal() as db:
-        booking = await fetch_or_404(db, Booking, filter_column=Booking.booking_id, filter_value=booking_id, detail="Booking not found")
-
-        if booking.status != "CONFIRMED":
-            raise HTTPException(status_code=400, detail=f"Cannot complete booking in status {booking.status}")
-
-        booking.completed_by_handyman = True
-
-        if booking.completed_by_user and booking.completed_by_handyman:
-            booking.status = "COMPLETED"
-            booking.completed_at = datetime.now(timezone.utc)
-            event = build_event(
-                "booking.completed",
-                {
-                    "booking_id": booking.booking_id,
-                    "user_email": booking.user_email,
-                    "handyman_email": booking.handyman_email,
-                    "desired_start": booking.desired_start,
-                    "desired_end": booking.desired_end,
-                    "job_description": booking.job_description,
-                },
-            )
-        else:
-            event = build_event(
-                "booking.completed_by_handyman",
-                {
-                    "booking_id": booking.booking_id,
-                    "user_email": booking.user_email,
-                    "handyman_email": booking.handyman_email,
-                    "desired_start": booking.desired_start,
-                    "desired_end": booking.desired_end,
-                    "job_description": booking.job_description,
-                },
-            )
-
-        add_outbox_event(db, OutboxEvent, event)
+@router.post("/bookings/{booking_id}/complete/user", response_model=CompleteBookingResponse)
+async def complete_booking_as_user(
+    booking_id: str,
+    email: str = Depends(get_current_email),
+    roles: list[str] = Depends(get_current_roles),
+):
+    return await _complete_booking(booking_id, "user", email, roles)
 
-        await db.commit()
-        await db.refresh(booking)
 
-        return CompleteBookingResponse(
-            booking_id=booking.booking_id,
-            status=booking.status,
-            completed_by_user=bool(booking.completed_by_user),
-            completed_by_handyman=bool(booking.completed_by_handyman),
-            completed_at=booking.completed_at,
-        )
+@router.post("/bookings/{booking_id}/complete/handyman", response_model=CompleteBookingResponse)
+async def complete_booking_as_handyman(
+    booking_id: str,
+    email: str = Depends(get_current_email),
+    roles: list[str] = Depends(get_current_roles),
+):
+    return await _complete_booking(booking_id, "handyman", email, roles)
 
 
 @router.post("/bookings/{booking_id}/reject", response_model=RejectBookingResponse)
-async def reject_booking(booking_id: str, data: RejectBookingRequest):
+async def reject_booking(
+    booking_id: str,
+    data: RejectBookingRequest,
+    email: str = Depends(get_current_email),
+    roles: list[str] = Depends(get_current_roles),
+):
     async with SessionLocal() as db:
-        booking = await fetch_or_404(db, Booking, filter_column=Booking.booking_id, filter_value=booking_id, detail="Booking not found")
-
-        if booking.status not in ("RESERVED", "CONFIRMED"):
-            raise HTTPException(status_code=400, detail=f"Cannot reject booking in status {booking.status}")
+        booking = await state_machine.reject(
+            db,
+            booking_id,
+            reason=data.reason,
+            where=_owner_clause("handyman_email", email, roles),
+        )
 
-        booking.status = "REJECTED"
-        booking.rejected_by_handyman = True
-        booking.rejection_reason = data.reason
+        if booking is None:
+            booking = await _current_for_caller(
+                db,
+                booking_id,
+                owner_field="handyman_email",
+                email=email,
+                roles=roles,
+                detail="Cannot reject another handyman's booking",
+            )
+            raise HTTPException(status_code=409, detail=f"Cannot reject booking in status {booking.status}")
 
-        event = build_event(
-            "booking.rejected",
-            {
-                "booking_id": booking.booking_id,
-                "user_email": booking.user_email,
-                "handyman_email": booking.handyman_email,
-                "desired_start": booking.desired_start,
-                "desired_end": booking.desired_end,
-                "job_description": booking.job_description,
-                "reason": data.reason,
-            },
-        )
+        event = build_event("booking.rejected", _event_data(booking, reason=data.reason))
 
         add_outbox_event(db, OutboxEvent, event)
 
         await db.commit()
-        await db.refresh(booking)
 
         return RejectBookingResponse(
             booking_id=booking.booking_id,
@@ -325,6 +324,66 @@ async def list_bookings(
         return [_to_response(b) for b in rows]
 
 
+@router.get("/users/{user_email}/bookings", response_model=BookingListResponse)
+async def list_user_bookings(
+    user_email: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+):
+    async with SessionLocal() as db:
+        rows, next_cursor = await list_bookings_page(
+            db,
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            user_email=user_email,
+        )
+        return BookingListResponse(items=[_to_response(b) for b in rows], next_cursor=next_cursor)
+
+
+@router.get("/handymen/{handyman_email}/bookings", response_model=BookingListResponse)
+async def list_handyman_bookings(
+    handyman_email: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+):
+    async with SessionLocal() as db:
+        rows, next_cursor = await list_bookings_page(
+            db,
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            handyman_email=handyman_email,
+        )
+        return BookingListResponse(items=[_to_response(b) for b in rows], next_cursor=next_cursor)
+
+
+@router.get("/users/{user_email}/bookings/upcoming", response_model=list[BookingResponse])
+async def list_user_upcoming_bookings(user_email: str, limit: int = Query(20, ge=1, le=200)):
+    async with SessionLocal() as db:
+        rows = await list_upcoming_bookings(
+            db,
+            now=datetime.now(timezone.utc),
+            limit=limit,
+            user_email=user_email,
+        )
+        return [_to_response(b) for b in rows]
+
+
+@router.get("/handymen/{handyman_email}/bookings/upcoming", response_model=list[BookingResponse])
+async def list_handyman_upcoming_bookings(handyman_email: str, limit: int = Query(20, ge=1, le=200)):
+    async with SessionLocal() as db:
+        rows = await list_upcoming_bookings(
+            db,
+            now=datetime.now(timezone.utc),
+            limit=limit,
+            handyman_email=handyman_email,
+        )
+        return [_to_response(b) for b in rows]
+
+
 @router.put("/bookings/{booking_id}", response_model=BookingResponse)
 async def admin_update_booking(booking_id: str, data: UpdateBookingAdmin):
     async with SessionLocal() as db:
@@ -1,6 +1,7 @@
 from shared.shared.schemas.bookings import (
     CreateBooking,
     BookingResponse,
+    BookingListResponse,
     CancelBooking,
     ConfirmBookingResponse,
     CancelBookingResponse,
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import case, func, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Booking
+
+CANCELABLE_STATUSES = ("PENDING", "RESERVED", "CONFIRMED", "COMPLETED")
+REJECTABLE_STATUSES = ("RESERVED", "CONFIRMED")
+RELEASABLE_STATUSES = ("PENDING", "RESERVED", "CONFIRMED", "COMPLETED", "FAILED", "EXPIRED")
+
+SLOT_EVENT_TRANSITIONS: dict[str, tuple[tuple[str, ...], str]] = {
+    "slot.reserved": (("PENDING",), "RESERVED"),
+    "slot.rejected": (("PENDING", "RESERVED"), "FAILED"),
+    "slot.confirmed": (("RESERVED",), "CONFIRMED"),
+    "slot.expired": (("PENDING", "RESERVED"), "EXPIRED"),
+    "slot.released": (RELEASABLE_STATUSES, "CANCELED"),
+}
+
+
+async def transition(
+    db: AsyncSession,
+    booking_id: str,
+    *,
+    from_statuses: Iterable[str],
+    values: dict[str, Any],
+    where: Iterable[Any] = (),
+) -> Booking | None:
+    """
+    Applies a status transition as a single conditional UPDATE ... RETURNING.
+    Returns the updated booking, or None when no row matched (missing booking
+    or status not in from_statuses).
+    """
+    stmt = (
+        update(Booking)
+        .where(
+            Booking.booking_id == booking_id,
+            Booking.status.in_(tuple(from_statuses)),
+            *where,
+        )
+        .values(**values)
+        .returning(Booking)
+    )
+    res = await db.execute(stmt)
+    return res.scalar_one_or_none()
+
+
+async def get_booking(db: AsyncSession, booking_id: str) -> Booking | None:
+    res = await db.execute(select(Booking).where(Booking.booking_id == booking_id))
+    return res.scalar_one_or_none()
+
+
+async def apply_slot_event(db: AsyncSession, event_type: str, booking_id: str, data: dict) -> Booking | None:
+    rule = SLOT_EVENT_TRANSITIONS.get(event_type)
+    if rule is None:
+        return None
+
+    from_statuses, to_status = rule
+    values: dict[str, Any] = {"status": to_status}
+
+    if event_type == "slot.rejected":
+        values["failure_reason"] = data.get("reason") or "slot_rejected"
+    elif event_type == "slot.released":
+        values["cancellation_reason"] = func.coalesce(Booking.cancellation_reason, "released")
+
+    return await transition(db, booking_id, from_statuses=from_statuses, values=values)
+
+
+async def cancel(db: AsyncSession, booking_id: str, *, reason: str, where: Iterable[Any] = ()) -> Booking | None:
+    return await transition(
+        db,
+        booking_id,
+        from_statuses=CANCELABLE_STATUSES,
+        values={
+            "status": "CANCELED",
+            "cancellation_reason": reason,
+            "canceled_at": datetime.now(timezone.utc),
+        },
+        where=where,
+    )
+
+
+async def mark_completed(db: AsyncSession, booking_id: str, *, by: str, where: Iterable[Any] = ()) -> Booking | None:
+    """
+    Sets the completed_by_<by> flag; the booking becomes COMPLETED in the same
+    statement when the other party has already confirmed completion.
+    """
+    if by == "user":
+        flag, other = "completed_by_user", Booking.completed_by_handyman
+    elif by == "handyman":
+        flag, other = "completed_by_handyman", Booking.completed_by_user
+    else:
+        raise ValueError(f"Unsupported completion party: {by}")
+
+    both_done = other.is_(true())
+    return await transition(
+        db,
+        booking_id,
+        from_statuses=("CONFIRMED",),
+        values={
+            flag: True,
+            "status": case((both_done, "COMPLETED"), else_=Booking.status),
+            "completed_at": case((both_done, func.now()), else_=Booking.completed_at),
+        },
+        where=where,
+    )
+
+
+async def reject(db: AsyncSession, booking_id: str, *, reason: str, where: Iterable[Any] = ()) -> Booking | None:
+    return await transition(
+        db,
+        booking_id,
+        from_statuses=REJECTABLE_STATUSES,
+        values={
+            "status": "REJECTED",
+            "rejected_by_handyman": True,
+            "rejection_reason": reason,
+        },
+        where=where,
+    )
@@ -1,4 +1,6 @@
 import json
+from urllib.parse import urlencode
+
 import httpx
 from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
@@ -15,12 +17,20 @@ from .config import (
 from .breaker import CircuitBreaker, CircuitBreakerOpen
 
 DEFAULT_TIMEOUT = 3.0
+# Streams may go quiet while upstream reads its next batch; this bounds the
+# wait for each chunk, not the whole transfer.
+STREAM_READ_TIMEOUT = 30.0
+# Admin projection checks read every source page before answering.
+ADMIN_TIMEOUT = 120.0
 
 cb_auth = CircuitBreaker("auth-service", 5, 10)
 cb_user = CircuitBreaker("user-service", 5, 10)
 cb_handyman = CircuitBreaker("handyman-service", 5, 10)
 cb_availability = CircuitBreaker("availability-service", 5, 10)
 cb_match = CircuitBreaker("match-service", 5, 10)
+# Separate from cb_match so slow admin calls never open the breaker that
+# guards /match for everyone else.
+cb_match_admin = CircuitBreaker("match-service-admin", 5, 10)
 cb_booking = CircuitBreaker("booking-service", 5, 10)
 cb_notification = CircuitBreaker("notification-service", 5, 10)
 
@@ -56,6 +66,7 @@ async def _call_with_breaker(
     payload: dict | None,
     request_id: str | None,
     user_payload: dict | None,
+    timeout: float = DEFAULT_TIMEOUT,
 ):
     try:
         await breaker.allow_request()
@@ -66,14 +77,17 @@ async def _call_with_breaker(
     safe_payload = jsonable_encoder(payload) if payload is not None else None
 
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
+        async with httpx.AsyncClient(timeout=timeout) as client:
             resp = await client.request(method=method, url=url, json=safe_payload, headers=headers)
 
         if 200 <= resp.status_code < 300:
             await breaker.record_success()
             return _safe_json(resp)
 
-        await breaker.record_failure()
+        if resp.status_code >= 500:
+            await breaker.record_failure()
+        else:
+            await breaker.record_success()
 
         detail = _safe_json(resp)
         raise HTTPException(status_code=resp.status_code, detail=detail)
@@ -88,6 +102,60 @@ async def _call_with_breaker(
         raise HTTPException(status_code=502, detail=f"Bad gateway calling upstream: {url}. err={type(e).__name__}: {e}")
 
 
+async def _stream_with_breaker(
+    breaker: CircuitBreaker,
+    url: str,
+    params: dict | None,
+    request_id: str | None,
+    user_payload: dict | None,
+):
+    """
+    Opens a streamed GET and returns an async iterator over its body. Upstream
+    errors are raised as HTTPException before anything is streamed, with the
+    same breaker accounting as _call_with_breaker.
+    """
+    try:
+        await breaker.allow_request()
+    except CircuitBreakerOpen as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    client = httpx.AsyncClient(timeout=httpx.Timeout(DEFAULT_TIMEOUT, read=STREAM_READ_TIMEOUT))
+    try:
+        request = client.build_request("GET", url, params=params, headers=_base_headers(request_id, user_payload))
+        resp = await client.send(request, stream=True)
+    except httpx.TimeoutException:
+        await client.aclose()
+        await breaker.record_failure()
+        raise HTTPException(status_code=504, detail=f"Timeout calling upstream: {url}")
+    except Exception as e:
+        await client.aclose()
+        await breaker.record_failure()
+        raise HTTPException(status_code=502, detail=f"Bad gateway calling upstream: {url}. err={type(e).__name__}: {e}")
+
+    if not 200 <= resp.status_code < 300:
+        await resp.aread()
+        await resp.aclose()
+        await client.aclose()
+        if resp.status_code >= 500:
+            await breaker.record_failure()
+        else:
+            await breaker.record_success()
+        raise HTTPException(status_code=resp.status_code, detail=_safe_json(resp))
+
+    await breaker.record_success()
+
+    async def body():
+        try:
+            async for chunk in resp.aiter_bytes():
+                if chunk:
+                    yield chunk
+        finally:
+            await resp.aclose()
+            await client.aclose()
+
+    return body()
+
+
 async def register_user(data: dict, request_id: str | None = None):
     return await _call_with_breaker(cb_auth, "POST", f"{AUTH_SERVICE_URL}/register", data, request_id, None)
 
@@ -317,12 +385,53 @@ async def clear_availability(email: str, request_id: str | None = None, user_pay
     return await _call_with_breaker(cb_availability, "DELETE", f"{AVAILABILITY_SERVICE_URL}/availability/{email}", None, request_id, user_payload)
 
 
+async def set_availability_rules(email: str, data: dict, request_id: str | None = None, user_payload: dict | None = None):
+    return await _call_with_breaker(cb_availability, "PUT", f"{AVAILABILITY_SERVICE_URL}/availability/{email}/rules", data, request_id, user_payload)
+
+
+async def get_availability_rules(email: str, request_id: str | None = None, user_payload: dict | None = None):
+    return await _call_with_breaker(cb_availability, "GET", f"{AVAILABILITY_SERVICE_URL}/availability/{email}/rules", None, request_id, user_payload)
+
+
+async def clear_availability_rules(email: str, request_id: str | None = None, user_payload: dict | None = None):
+    return await _call_with_breaker(cb_availability, "DELETE", f"{AVAILABILITY_SERVICE_URL}/availability/{email}/rules", None, request_id, user_payload)
+
+
+async def find_free_windows(email: str, params: dict, request_id: str | None = None, user_payload: dict | None = None):
+    query = urlencode({k: v for k, v in params.items() if v is not None})
+    return await _call_with_breaker(cb_availability, "GET", f"{AVAILABILITY_SERVICE_URL}/availability/{email}/free-windows?{query}", None, request_id, user_payload)
+
+
+async def stream_availability_export(batch: int, request_id: str | None = None, user_payload: dict | None = None):
+    return await _stream_with_breaker(
+        cb_availability, f"{AVAILABILITY_SERVICE_URL}/availability/export", {"batch": batch}, request_id, user_payload
+    )
+
+
+async def extend_reservation(booking_id: str, data: dict, request_id: str | None = None, user_payload: dict | None = None):
+    return await _call_with_breaker(cb_availability, "POST", f"{AVAILABILITY_SERVICE_URL}/reservations/{booking_id}/extend", data, request_id, user_payload)
+
+
 async def list_all_availability(request_id: str | None = None, user_payload: dict | None = None, limit: int = 200, cursor: int = 0):
     return await _call_with_breaker(cb_availability, "GET", f"{AVAILABILITY_SERVICE_URL}/availability?limit={limit}&cursor={cursor}", None, request_id, user_payload)
 
 
-async def match_request(data: dict, request_id: str | None = None, user_payload: dict | None = None):
-    return await _call_with_breaker(cb_match, "POST", f"{MATCH_SERVICE_URL}/match", data, request_id, user_payload)
+async def match_request(data: dict, request_id: str | None = None, user_payload: dict | None = None, limit: int = 20):
+    return await _call_with_breaker(cb_match, "POST", f"{MATCH_SERVICE_URL}/match?limit={limit}", data, request_id, user_payload)
+
+
+async def match_page_request(
+    data: dict,
+    request_id: str | None = None,
+    user_payload: dict | None = None,
+    limit: int = 20,
+    cursor: str | None = None,
+):
+    params: dict[str, str | int] = {"limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    url = f"{MATCH_SERVICE_URL}/match/page?{urlencode(params)}"
+    return await _call_with_breaker(cb_match, "POST", url, data, request_id, user_payload)
 
 
 async def list_match_logs(request_id: str | None = None, user_payload: dict | None = None, limit: int = 50, offset: int = 0, skill: str | None = None):
@@ -336,6 +445,20 @@ async def delete_match_log(log_id: int, request_id: str | None = None, user_payl
     return await _call_with_breaker(cb_match, "DELETE", f"{MATCH_SERVICE_URL}/match-logs/{log_id}", None, request_id, user_payload)
 
 
+async def resync_match_projections(request_id: str | None = None, user_payload: dict | None = None):
+    return await _call_with_breaker(cb_match_admin, "POST", f"{MATCH_SERVICE_URL}/admin/projections/resync", None, request_id, user_payload)
+
+
+async def match_projection_resync_status(request_id: str | None = None, user_payload: dict | None = None):
+    return await _call_with_breaker(cb_match_admin, "GET", f"{MATCH_SERVICE_URL}/admin/projections/resync", None, request_id, user_payload)
+
+
+async def match_projection_drift(request_id: str | None = None, user_payload: dict | None = None):
+    return await _call_with_breaker(
+        cb_match_admin, "GET", f"{MATCH_SERVICE_URL}/admin/projections/drift", None, request_id, user_payload, timeout=ADMIN_TIMEOUT
+    )
+
+
 async def create_booking(data: dict, request_id: str | None = None, user_payload: dict | None = None):
     return await _call_with_breaker(cb_booking, "POST", f"{BOOKING_SERVICE_URL}/bookings", data, request_id, user_payload)
 
@@ -396,6 +519,29 @@ async def list_bookings(request_id: str | None = None, user_payload: dict | None
     return await _call_with_breaker(cb_booking, "GET", f"{BOOKING_SERVICE_URL}/bookings?{qs}", None, request_id, user_payload)
 
 
+async def list_bookings_page(
+    owner: str,
+    email: str,
+    request_id: str | None = None,
+    user_payload: dict | None = None,
+    limit: int = 50,
+    cursor: str | None = None,
+    status: str | None = None,
+):
+    params: dict[str, str | int] = {"limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    if status:
+        params["status"] = status
+    url = f"{BOOKING_SERVICE_URL}/{owner}/{email}/bookings?{urlencode(params)}"
+    return await _call_with_breaker(cb_booking, "GET", url, None, request_id, user_payload)
+
+
+async def list_upcoming_bookings(owner: str, email: str, request_id: str | None = None, user_payload: dict | None = None, limit: int = 20):
+    url = f"{BOOKING_SERVICE_URL}/{owner}/{email}/bookings/upcoming?limit={limit}"
+    return await _call_with_breaker(cb_booking, "GET", url, None, request_id, user_payload)
+
+
 async def admin_update_booking(booking_id: str, data: dict, request_id: str | None = None, user_payload: dict | None = None):
     return await _call_with_breaker(cb_booking, "PUT", f"{BOOKING_SERVICE_URL}/bookings/{booking_id}", data, request_id, user_payload)
 
@@ -459,6 +605,17 @@ async def mark_all_my_notifications_read(request_id: str | None = None, user_pay
     )
 
 
+async def bulk_update_my_notifications(data: dict, request_id: str | None = None, user_payload: dict | None = None):
+    return await _call_with_breaker(
+        cb_notification,
+        "POST",
+        f"{NOTIFICATION_SERVICE_URL}/me/notifications/bulk",
+        data,
+        request_id,
+        user_payload,
+    )
+
+
 async def archive_my_notification(notification_id: str, request_id: str | None = None, user_payload: dict | None = None):
     return await _call_with_breaker(
         cb_notification,
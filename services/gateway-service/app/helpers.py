@@ -10,6 +10,7 @@ from .clients import (
     cb_handyman,
     cb_availability,
     cb_match,
+    cb_match_admin,
     cb_booking,
     cb_notification,
     get_auth_user_by_email,
@@ -25,6 +26,7 @@ def _breaker_registry():
         "handyman-service": cb_handyman,
         "availability-service": cb_availability,
         "match-service": cb_match,
+        "match-service-admin": cb_match_admin,
         "booking-service": cb_booking,
         "notification-service": cb_notification,
     }
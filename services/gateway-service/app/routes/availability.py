@@ -1,11 +1,19 @@
 from fastapi import APIRouter, Depends, Request, Query
+from fastapi.responses import StreamingResponse
 
-from ..schemas import SetAvailability
+from shared.shared.recurrence import MAX_EXPANSION_DAYS
+
+from ..schemas import SetAvailability, AvailabilityRules
 from ..clients import (
     set_availability,
     get_availability,
     clear_availability,
     list_all_availability,
+    set_availability_rules,
+    get_availability_rules,
+    clear_availability_rules,
+    find_free_windows,
+    stream_availability_export,
 )
 from ..security import get_current_user
 from ..rbac import require_role
@@ -32,6 +40,21 @@ async def clear_availability_endpoint(email: str, request: Request, user=Depends
     return await clear_availability(email, request_id=request.state.request_id, user_payload=user)
 
 
+@router.get("/availability/{email}/free-windows", tags=["Availability"])
+async def find_free_windows_endpoint(
+    email: str,
+    request: Request,
+    user=Depends(get_current_user),
+    duration_minutes: int = Query(..., ge=5, le=1440),
+    horizon_days: int = Query(14, ge=1, le=MAX_EXPANSION_DAYS),
+    limit: int = Query(5, ge=1, le=100),
+    start: str | None = None,
+):
+    require_role(user, ["user", "handyman", "admin"])
+    params = {"duration_minutes": duration_minutes, "horizon_days": horizon_days, "limit": limit, "start": start}
+    return await find_free_windows(email, params, request_id=request.state.request_id, user_payload=user)
+
+
 @router.get("/availability", tags=["Availability"])
 async def admin_list_all_availability(
     request: Request,
@@ -43,6 +66,17 @@ async def admin_list_all_availability(
     return await list_all_availability(request_id=request.state.request_id, user_payload=user, limit=limit, cursor=cursor)
 
 
+@router.get("/admin/availability/export", tags=["Availability"])
+async def admin_export_availability(
+    request: Request,
+    user=Depends(get_current_user),
+    batch: int = Query(500, ge=1, le=5000),
+):
+    require_role(user, ["admin"])
+    chunks = await stream_availability_export(batch, request_id=request.state.request_id, user_payload=user)
+    return StreamingResponse(chunks, media_type="application/x-ndjson")
+
+
 @router.get("/me/availability", tags=["Availability"])
 async def get_my_availability(request: Request, user=Depends(get_current_user)):
     require_role(user, ["handyman", "admin"])
@@ -59,3 +93,27 @@ async def set_my_availability(data: SetAvailability, request: Request, user=Depe
 async def clear_my_availability(request: Request, user=Depends(get_current_user)):
     require_role(user, ["handyman", "admin"])
     return await clear_availability(_user_email(user), request_id=request.state.request_id, user_payload=user)
+
+
+@router.put("/availability/{email}/rules", tags=["Availability"])
+async def set_availability_rules_endpoint(email: str, data: AvailabilityRules, request: Request, user=Depends(get_current_user)):
+    require_role(user, ["admin"])
+    return await set_availability_rules(email, data.model_dump(), request_id=request.state.request_id, user_payload=user)
+
+
+@router.get("/me/availability/rules", tags=["Availability"])
+async def get_my_availability_rules(request: Request, user=Depends(get_current_user)):
+    require_role(user, ["handyman", "admin"])
+    return await get_availability_rules(_user_email(user), request_id=request.state.request_id, user_payload=user)
+
+
+@router.put("/me/availability/rules", tags=["Availability"])
+async def set_my_availability_rules(data: AvailabilityRules, request: Request, user=Depends(get_current_user)):
+    require_role(user, ["handyman", "admin"])
+    return await set_availability_rules(_user_email(user), data.model_dump(), request_id=request.state.request_id, user_payload=user)
+
+
+@router.delete("/me/availability/rules", tags=["Availability"])
+async def clear_my_availability_rules(request: Request, user=Depends(get_current_user)):
+    require_role(user, ["handyman", "admin"])
+    return await clear_availability_rules(_user_email(user), request_id=request.state.request_id, user_payload=user)
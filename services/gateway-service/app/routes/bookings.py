@@ -3,6 +3,7 @@ from typing import List
 
 from ..schemas import (
     BookingResponse,
+    BookingListResponse,
     ConfirmBookingResponse,
     CancelBookingResponse,
     CompleteBookingResponse,
@@ -13,6 +14,7 @@ from ..schemas import (
     CancelBookingRequest,
     HandymanReviewResponse,
     CreateHandymanReviewRequest,
+    ExtendHoldRequest,
 )
 from ..clients import (
     create_booking,
@@ -24,8 +26,11 @@ from ..clients import (
     reject_booking,
     create_handyman_review,
     list_bookings,
+    list_bookings_page,
+    list_upcoming_bookings,
     admin_update_booking,
     admin_delete_booking,
+    extend_reservation,
 )
 from ..security import get_current_user
 from ..rbac import require_role
@@ -58,51 +63,33 @@ async def get_booking_endpoint(booking_id: str, request: Request, user=Depends(g
 @router.post("/bookings/{booking_id}/confirm", response_model=ConfirmBookingResponse, tags=["Bookings"])
 async def confirm_booking_endpoint(booking_id: str, request: Request, user=Depends(get_current_user)):
     require_role(user, ["handyman", "admin"])
-
-    booking = await get_booking(booking_id, request_id=request.state.request_id, user_payload=user)
-
-    if not _has_role(user, "admin") and booking.get("handyman_email") != _user_email(user):
-        raise HTTPException(status_code=403, detail="Cannot confirm another handyman's booking")
-
     return await confirm_booking(booking_id, request_id=request.state.request_id, user_payload=user)
 
 
 @router.post("/bookings/{booking_id}/cancel", response_model=CancelBookingResponse, tags=["Bookings"])
 async def cancel_booking_endpoint(booking_id: str, data: CancelBookingRequest, request: Request, user=Depends(get_current_user)):
     require_role(user, ["user", "admin"])
+    return await cancel_booking(booking_id, data.model_dump(), request_id=request.state.request_id, user_payload=user)
 
-    booking = await get_booking(booking_id, request_id=request.state.request_id, user_payload=user)
-
-    if not _has_role(user, "admin"):
-        current_email = _user_email(user)
-        is_user_owner = booking.get("user_email") == current_email
-        if not (is_user_owner):
-            raise HTTPException(status_code=403, detail="Cannot cancel another user's booking")
 
-    return await cancel_booking(booking_id, data.model_dump(), request_id=request.state.request_id, user_payload=user)
+@router.post("/bookings/{booking_id}/hold/extend", tags=["Bookings"])
+async def extend_booking_hold_endpoint(booking_id: str, data: ExtendHoldRequest, request: Request, user=Depends(get_current_user)):
+    require_role(user, ["user", "admin"])
+    booking = await _booking_owned_or_admin(booking_id, user, request.state.request_id)
+    if not _has_role(user, "admin") and booking.get("user_email") != _user_email(user):
+        raise HTTPException(status_code=403, detail="Only the booking owner can extend its hold")
+    return await extend_reservation(booking_id, data.model_dump(), request_id=request.state.request_id, user_payload=user)
 
 
 @router.post("/bookings/{booking_id}/complete/user", response_model=CompleteBookingResponse, tags=["Bookings"])
 async def complete_booking_user_endpoint(booking_id: str, request: Request, user=Depends(get_current_user)):
     require_role(user, ["user", "admin"])
-
-    booking = await get_booking(booking_id, request_id=request.state.request_id, user_payload=user)
-
-    if not _has_role(user, "admin") and booking.get("user_email") != _user_email(user):
-        raise HTTPException(status_code=403, detail="Cannot complete another user's booking as user")
-
     return await complete_booking_as_user(booking_id, request_id=request.state.request_id, user_payload=user)
 
 
 @router.post("/bookings/{booking_id}/complete/handyman", response_model=CompleteBookingResponse, tags=["Bookings"])
 async def complete_booking_handyman_endpoint(booking_id: str, request: Request, user=Depends(get_current_user)):
     require_role(user, ["handyman", "admin"])
-
-    booking = await get_booking(booking_id, request_id=request.state.request_id, user_payload=user)
-
-    if not _has_role(user, "admin") and booking.get("handyman_email") != _user_email(user):
-        raise HTTPException(status_code=403, detail="Cannot complete another handyman's booking as handyman")
-
     return await complete_booking_as_handyman(booking_id, request_id=request.state.request_id, user_payload=user)
 
 
@@ -114,12 +101,6 @@ async def reject_booking_completion_endpoint(
     user=Depends(get_current_user),
 ):
     require_role(user, ["handyman", "admin"])
-
-    booking = await get_booking(booking_id, request_id=request.state.request_id, user_payload=user)
-
-    if not _has_role(user, "admin") and booking.get("handyman_email") != _user_email(user):
-        raise HTTPException(status_code=403, detail="Cannot reject another handyman's booking")
-
     return await reject_booking(
         booking_id,
         data.model_dump(),
@@ -198,6 +179,78 @@ async def get_my_jobs(
     )
 
 
+@router.get("/me/bookings/page", response_model=BookingListResponse, tags=["Bookings"])
+async def get_my_bookings_page(
+    request: Request,
+    user=Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+):
+    require_role(user, ["user", "admin"])
+    return await list_bookings_page(
+        "users",
+        _user_email(user),
+        request_id=request.state.request_id,
+        user_payload=user,
+        limit=limit,
+        cursor=cursor,
+        status=status,
+    )
+
+
+@router.get("/me/bookings/upcoming", response_model=List[BookingResponse], tags=["Bookings"])
+async def get_my_upcoming_bookings(
+    request: Request,
+    user=Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=200),
+):
+    require_role(user, ["user", "admin"])
+    return await list_upcoming_bookings(
+        "users",
+        _user_email(user),
+        request_id=request.state.request_id,
+        user_payload=user,
+        limit=limit,
+    )
+
+
+@router.get("/me/jobs/page", response_model=BookingListResponse, tags=["Bookings"])
+async def get_my_jobs_page(
+    request: Request,
+    user=Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+):
+    require_role(user, ["handyman", "admin"])
+    return await list_bookings_page(
+        "handymen",
+        _user_email(user),
+        request_id=request.state.request_id,
+        user_payload=user,
+        limit=limit,
+        cursor=cursor,
+        status=status,
+    )
+
+
+@router.get("/me/jobs/upcoming", response_model=List[BookingResponse], tags=["Bookings"])
+async def get_my_upcoming_jobs(
+    request: Request,
+    user=Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=200),
+):
+    require_role(user, ["handyman", "admin"])
+    return await list_upcoming_bookings(
+        "handymen",
+        _user_email(user),
+        request_id=request.state.request_id,
+        user_payload=user,
+        limit=limit,
+    )
+
+
 @router.get("/bookings", tags=["Bookings"])
 async def admin_list_bookings(
     request: Request,
@@ -1,8 +1,16 @@
 from fastapi import APIRouter, Depends, Request, Query
 from typing import List
 
-from ..schemas import MatchRequest, MatchResult
-from ..clients import match_request, list_match_logs, delete_match_log
+from ..schemas import MatchPage, MatchRequest, MatchResult
+from ..clients import (
+    match_request,
+    match_page_request,
+    list_match_logs,
+    delete_match_log,
+    resync_match_projections,
+    match_projection_resync_status,
+    match_projection_drift,
+)
 from ..security import get_current_user
 from ..rbac import require_role
 
@@ -10,9 +18,32 @@ router = APIRouter()
 
 
 @router.post("/match", response_model=List[MatchResult], tags=["Match"])
-async def match_endpoint(data: MatchRequest, request: Request, user=Depends(get_current_user)):
+async def match_endpoint(
+    data: MatchRequest,
+    request: Request,
+    user=Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=200),
+):
+    require_role(user, ["user", "admin"])
+    return await match_request(data.model_dump(), request_id=request.state.request_id, user_payload=user, limit=limit)
+
+
+@router.post("/match/page", response_model=MatchPage, tags=["Match"])
+async def match_page_endpoint(
+    data: MatchRequest,
+    request: Request,
+    user=Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+):
     require_role(user, ["user", "admin"])
-    return await match_request(data.model_dump(), request_id=request.state.request_id, user_payload=user)
+    return await match_page_request(
+        data.model_dump(),
+        request_id=request.state.request_id,
+        user_payload=user,
+        limit=limit,
+        cursor=cursor,
+    )
 
 
 @router.get("/match-logs", tags=["Match"])
@@ -35,3 +66,30 @@ async def admin_delete_match_log(
 ):
     require_role(user, ["admin"])
     return await delete_match_log(log_id, request_id=request.state.request_id, user_payload=user)
+
+
+@router.post("/admin/match/projections/resync", status_code=202, tags=["Match"])
+async def admin_resync_match_projections(
+    request: Request,
+    user=Depends(get_current_user),
+):
+    require_role(user, ["admin"])
+    return await resync_match_projections(request_id=request.state.request_id, user_payload=user)
+
+
+@router.get("/admin/match/projections/resync", tags=["Match"])
+async def admin_match_projection_resync_status(
+    request: Request,
+    user=Depends(get_current_user),
+):
+    require_role(user, ["admin"])
+    return await match_projection_resync_status(request_id=request.state.request_id, user_payload=user)
+
+
+@router.get("/admin/match/projections/drift", tags=["Match"])
+async def admin_match_projection_drift(
+    request: Request,
+    user=Depends(get_current_user),
+):
+    require_role(user, ["admin"])
+    return await match_projection_drift(request_id=request.state.request_id, user_payload=user)
@@ -7,6 +7,7 @@ from fastapi.responses import StreamingResponse
 
 from ..clients import (
     archive_my_notification,
+    bulk_update_my_notifications,
     delete_my_push_device,
     get_my_notification_preferences,
     get_my_unread_count,
@@ -18,6 +19,8 @@ from ..clients import (
 )
 from ..config import NOTIFICATION_SERVICE_URL
 from ..schemas import (
+    BulkNotificationStateRequest,
+    BulkNotificationStateResponse,
     MarkAllReadResponse,
     NotificationListResponse,
     NotificationPreferencesResponse,
@@ -68,6 +71,15 @@ async def mark_all_read(request: Request, user=Depends(get_current_user)):
     return await mark_all_my_notifications_read(request_id=request.state.request_id, user_payload=user)
 
 
+@router.post("/me/notifications/bulk", response_model=BulkNotificationStateResponse, tags=["Notifications"])
+async def bulk_update_notifications(payload: BulkNotificationStateRequest, request: Request, user=Depends(get_current_user)):
+    return await bulk_update_my_notifications(
+        payload.model_dump(),
+        request_id=request.state.request_id,
+        user_payload=user,
+    )
+
+
 @router.post("/me/notifications/{notification_id}/archive", response_model=OkResponse, tags=["Notifications"])
 async def archive_notification(notification_id: str, request: Request, user=Depends(get_current_user)):
     return await archive_my_notification(
@@ -106,7 +118,7 @@ async def delete_push_device(device_id: int, request: Request, user=Depends(get_
     tags=["Notifications"],
     responses={
         200: {
-            "description": "Server-Sent Events stream. Events: ready, ping, notification.created",
+            "description": "Server-Sent Events stream. Events: ready, ping, notification.created, notifications.updated",
             "content": {
                 "text/event-stream": {
                     "example": "event: ready\\ndata: {\"ok\":true}\\n\\n"
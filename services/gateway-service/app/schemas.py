@@ -40,13 +40,17 @@ from shared.shared.schemas.handymen import (
 from shared.shared.schemas.availability import (
     AvailabilitySlot,
     SetAvailability,
+    AvailabilityRules,
+    ExtendReservation as ExtendHoldRequest,
 )
 from shared.shared.schemas.match import (
     MatchRequest,
     MatchResult,
+    MatchPage,
 )
 from shared.shared.schemas.bookings import (
     BookingResponse,
+    BookingListResponse,
     ConfirmBookingResponse,
     CancelBookingResponse,
     CompleteBookingResponse,
@@ -57,6 +61,8 @@ from shared.shared.schemas.bookings import (
 from shared.shared.schemas.bookings import CreateBooking as CreateBookingRequest
 from shared.shared.schemas.bookings import CancelBooking as CancelBookingRequest
 from shared.shared.schemas.notifications import (
+    BulkNotificationStateRequest,
+    BulkNotificationStateResponse,
     MarkAllReadResponse,
     NotificationItem,
     NotificationListResponse,
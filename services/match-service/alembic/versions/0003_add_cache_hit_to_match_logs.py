@@ -0,0 +1,24 @@
+"""add cache_hit and result_count to match_logs
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("match_logs", sa.Column("cache_hit", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column("match_logs", sa.Column("result_count", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("match_logs", "result_count")
+    op.drop_column("match_logs", "cache_hit")
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import heapq
+import os
+import time
+from typing import Iterator
+
+import numpy as np
+
+from .services import get_effective_handymen_for_skill, norm
+
+EARTH_RADIUS_KM = 6371.0
+SNAPSHOT_TTL_SECONDS = float(os.getenv("MATCH_SNAPSHOT_TTL_SECONDS") or "5")
+
+RANK_WEIGHT_DISTANCE = float(os.getenv("MATCH_RANK_WEIGHT_DISTANCE") or "0.5")
+RANK_WEIGHT_RATING = float(os.getenv("MATCH_RANK_WEIGHT_RATING") or "0.35")
+RANK_WEIGHT_EXPERIENCE = float(os.getenv("MATCH_RANK_WEIGHT_EXPERIENCE") or "0.15")
+RANK_RATING_PRIOR = float(os.getenv("MATCH_RANK_RATING_PRIOR") or "3.5")
+RANK_RATING_PRIOR_WEIGHT = float(os.getenv("MATCH_RANK_RATING_PRIOR_WEIGHT") or "5")
+RANK_EXPERIENCE_CAP_YEARS = float(os.getenv("MATCH_RANK_EXPERIENCE_CAP_YEARS") or "20")
+MAX_RATING = 5.0
+
+
+def _float_or_nan(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class CandidateSnapshot:
+    """
+    Array-backed copy of the handyman projection for one skill. Distances
+    and radius masks for all candidates are computed in a single vectorized
+    pass instead of one haversine call per handyman.
+    """
+
+    def __init__(self, handymen: list[dict], built_at: float | None = None, generation: int = 0):
+        rows = [h for h in handymen if h.get("latitude") is not None and h.get("longitude") is not None]
+
+        self.handymen = rows
+        self.built_at = built_at if built_at is not None else time.monotonic()
+        self.generation = generation
+
+        self.lat = np.array([_float_or_nan(h["latitude"]) for h in rows], dtype=np.float64)
+        self.lon = np.array([_float_or_nan(h["longitude"]) for h in rows], dtype=np.float64)
+        self.radius_km = np.nan_to_num(
+            np.array([_float_or_nan(h.get("service_radius_km")) for h in rows], dtype=np.float64),
+            nan=0.0,
+        )
+        self.years_experience = np.nan_to_num(
+            np.array([_float_or_nan(h.get("years_experience")) for h in rows], dtype=np.float64),
+            nan=0.0,
+        )
+        self.avg_rating = np.nan_to_num(
+            np.array([_float_or_nan(h.get("avg_rating")) for h in rows], dtype=np.float64),
+            nan=0.0,
+        )
+        self.rating_count = np.nan_to_num(
+            np.array([_float_or_nan(h.get("rating_count")) for h in rows], dtype=np.float64),
+            nan=0.0,
+        )
+
+        self._lat_rad = np.radians(self.lat)
+        self._lon_rad = np.radians(self.lon)
+        self._cos_lat = np.cos(self._lat_rad)
+
+    def __len__(self) -> int:
+        return len(self.handymen)
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        current = now if now is not None else time.monotonic()
+        return current - self.built_at < SNAPSHOT_TTL_SECONDS
+
+    def distances_km(self, lat: float, lon: float) -> np.ndarray:
+        lat_rad = np.radians(lat)
+        d_lat = self._lat_rad - lat_rad
+        d_lon = self._lon_rad - np.radians(lon)
+        a = np.sin(d_lat / 2) ** 2 + np.cos(lat_rad) * self._cos_lat * np.sin(d_lon / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    def within_radius(self, lat: float, lon: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (indices, distances) of the handymen whose service radius
+        covers the point, ordered by distance.
+        """
+        if not self.handymen:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+
+        distances = self.distances_km(lat, lon)
+        idx = np.flatnonzero(distances <= self.radius_km)
+        order = np.argsort(distances[idx], kind="stable")
+        idx = idx[order]
+        return idx, distances[idx]
+
+    def scores(self, idx: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        """
+        Scores candidates in [0, 1]: closeness relative to each handyman's own
+        radius, a Bayesian-smoothed rating (so a single 5-star review does not
+        beat a long track record) and capped years of experience.
+        """
+        radius = np.maximum(self.radius_km[idx], 1.0)
+        distance_score = 1.0 - np.clip(distances / radius, 0.0, 1.0)
+
+        count = self.rating_count[idx]
+        smoothed = (self.avg_rating[idx] * count + RANK_RATING_PRIOR * RANK_RATING_PRIOR_WEIGHT) / (
+            count + RANK_RATING_PRIOR_WEIGHT
+        )
+        rating_score = smoothed / MAX_RATING
+
+        experience_score = np.clip(self.years_experience[idx] / RANK_EXPERIENCE_CAP_YEARS, 0.0, 1.0)
+
+        return (
+            RANK_WEIGHT_DISTANCE * distance_score
+            + RANK_WEIGHT_RATING * rating_score
+            + RANK_WEIGHT_EXPERIENCE * experience_score
+        )
+
+    def ranked(self, lat: float, lon: float) -> Iterator[tuple[int, float, float]]:
+        """
+        Yields (index, distance_km, score) for in-radius handymen, best score
+        first. Candidates come off a heap lazily, so callers that stop after
+        the first K accepted results never order the rest.
+        """
+        idx, distances = self.within_radius(lat, lon)
+        if len(idx) == 0:
+            return
+
+        scores = self.scores(idx, distances)
+        heap = list(zip((-scores).tolist(), distances.tolist(), idx.tolist()))
+        heapq.heapify(heap)
+
+        while heap:
+            neg_score, distance, i = heapq.heappop(heap)
+            yield i, distance, -neg_score
+
+
+_snapshots: dict[str, CandidateSnapshot] = {}
+
+
+async def get_candidate_snapshot(skill: str, generation: int = 0) -> CandidateSnapshot:
+    """
+    Snapshots are keyed on the skill generation read by the caller: a bump on
+    any replica makes every replica rebuild, not only the one that consumed
+    the event.
+    """
+    skill = norm(skill)
+    snapshot = _snapshots.get(skill)
+    if snapshot is not None and snapshot.generation == generation and snapshot.is_fresh():
+        return snapshot
+
+    handymen, _source = await get_effective_handymen_for_skill(skill)
+    snapshot = CandidateSnapshot(handymen, generation=generation)
+    _snapshots[skill] = snapshot
+    return snapshot
+
+
+def invalidate_snapshots(skills) -> None:
+    for skill in skills:
+        _snapshots.pop(norm(skill), None)
@@ -7,16 +7,18 @@ from shared.shared.idempotency import already_processed
 
 from .services import (
     redis_client,
-    invalidate_bucket,
-    buckets_in_radius,
+    bump_generations,
+    region_bounds,
     norm,
     upsert_handyman_projection,
     get_handyman_projection,
     upsert_availability_projection,
+    AVAILABILITY_DELTA_KEYS,
     delete_handyman_projection,
     delete_availability_projection,
 )
 
+from .candidates import invalidate_snapshots
 from .messaging import connect, EXCHANGE_NAME
 
 QUEUE_NAME = "match_service_domain_events"
@@ -37,9 +39,9 @@ IDEMPOTENCY_TTL_SECONDS = 3600
 RETRY_SECONDS = 5
 
 
-async def _invalidate_for_handyman_profile(profile: dict | None):
+def _invalidation_regions(profile: dict | None) -> list[tuple[str, tuple[int, int, int, int]]]:
     if not profile:
-        return
+        return []
 
     lat = profile.get("latitude")
     lon = profile.get("longitude")
@@ -47,23 +49,21 @@ async def _invalidate_for_handyman_profile(profile: dict | None):
     skills = profile.get("skills") or []
 
     if lat is None or lon is None or radius is None:
-        return
+        return []
 
-    skills = [norm(s) for s in skills if s]
+    skills = {norm(s) for s in skills if s}
     if not skills:
-        return
-
-    buckets = buckets_in_radius(float(lat), float(lon), float(radius))
+        return []
 
-    for skill in skills:
-        for mode in ("strict", "degraded"):
-            for b_lat, b_lon in buckets:
-                await invalidate_bucket(mode, skill, b_lat, b_lon)
+    bounds = region_bounds(float(lat), float(lon), float(radius))
+    return [(skill, bounds) for skill in sorted(skills)]
 
 
 async def _invalidate_profiles(*profiles: dict | None):
-    for p in profiles:
-        await _invalidate_for_handyman_profile(p)
+    regions = [r for p in profiles for r in _invalidation_regions(p)]
+    if regions:
+        invalidate_snapshots(skill for skill, _bounds in regions)
+        await bump_generations(regions)
 
 
 async def process_event(payload: dict):
@@ -85,35 +85,31 @@ async def process_event(payload: dict):
 
     if event_type == "availability.updated":
         email = data.get("email")
-        slots = data.get("slots") or []
-
         if not email:
             return
 
-        if slots:
-            await upsert_availability_projection(email=email, slots=slots)
-        else:
-            await delete_availability_projection(email)
+        # Events only carry what changed: full parts (slots, rules, blocked)
+        # and/or deltas against the previous version.
+        parts = {k: data[k] for k in ("slots", "rules", "blocked") if k in data}
+        delta = {k: data[k] for k in AVAILABILITY_DELTA_KEYS if k in data}
+        await upsert_availability_projection(
+            email=email, delta=delta or None, version=data.get("version"), **parts
+        )
 
         profile = await get_handyman_projection(email)
         await _invalidate_profiles(profile)
         return
 
     if event_type == "handyman.created":
-        await upsert_handyman_projection(data)
-        await _invalidate_profiles(data)
+        old, stored = await upsert_handyman_projection(data)
+        await _invalidate_profiles(old, stored)
         return
 
     if event_type in ("handyman.location_updated", "handyman.updated"):
-        email = data.get("email")
-        if not email:
+        if not data.get("email"):
             return
 
-        old = await get_handyman_projection(email)
-        merged = dict(old or {})
-        merged.update(data)
-
-        await upsert_handyman_projection(merged)
+        old, merged = await upsert_handyman_projection(data, merge=True)
         await _invalidate_profiles(old, merged)
         return
 
@@ -7,19 +7,18 @@ from fastapi import FastAPI
 from .routes import router
 from .event_consumer import start_consumer_with_retry, QUEUE_NAME, ROUTING_KEYS
 from .outbox_worker import worker
+from .match_log_buffer import match_log_buffer
 from .messaging import RABBIT_URL, EXCHANGE_NAME
-from .services import (
-    seed_handyman_projection_if_empty,
-    handyman_projection_count,
-    availability_projection_count,
-)
+from .services import handyman_projection_count, availability_projection_count
+from .projection_sync import warm_projections
+from . import projection_sync
 
-_last_seed_status: dict | None = None
+_last_warm_status: dict | None = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global _last_seed_status
+    global _last_warm_status
 
     stop_event = asyncio.Event()
     consumer_task: asyncio.Task | None = None
@@ -31,10 +30,11 @@ async def lifespan(app: FastAPI):
 
     await worker.start()
 
-    _last_seed_status = await seed_handyman_projection_if_empty()
-    print(f"[match-service] seed status: {_last_seed_status}")
+    _last_warm_status = await warm_projections()
+    print(f"[match-service] projection warm status: {_last_warm_status}")
 
     consumer_task = asyncio.create_task(run_consumer())
+    log_flush_task = asyncio.create_task(match_log_buffer.run(stop_event))
 
     try:
         yield
@@ -47,6 +47,11 @@ async def lifespan(app: FastAPI):
         except Exception:
             pass
 
+        try:
+            await log_flush_task
+        except Exception:
+            pass
+
         try:
             if consumer_conn and not consumer_conn.is_closed:
                 await consumer_conn.close()
@@ -76,8 +81,13 @@ async def health():
         "projections": {
             "handymen": h_count,
             "availability": a_count,
-            "last_seed": _last_seed_status,
+            "last_warm": _last_warm_status,
+            "last_sync": projection_sync.last_sync,
+            "syncing": projection_sync.is_syncing(),
+            "sync_progress": projection_sync.sync_progress,
+            "last_sync_error": projection_sync.last_sync_error,
         },
+        "match_logs": match_log_buffer.stats(),
     }
 
 
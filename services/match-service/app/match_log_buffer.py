@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import deque
+
+from sqlalchemy import insert
+
+from .db import SessionLocal
+from .models import MatchLog
+
+MATCH_LOG_BUFFER_SIZE = int(os.getenv("MATCH_LOG_BUFFER_SIZE") or "10000")
+MATCH_LOG_FLUSH_BATCH = int(os.getenv("MATCH_LOG_FLUSH_BATCH") or "500")
+MATCH_LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("MATCH_LOG_FLUSH_INTERVAL_SECONDS") or "1.0")
+
+
+class MatchLogBuffer:
+    """
+    Bounded in-memory queue of MatchLog rows written in bulk by a background
+    task, so /match never waits on Postgres. When full, new rows are dropped
+    and counted rather than blocking the request.
+    """
+
+    def __init__(self, max_size: int = MATCH_LOG_BUFFER_SIZE, batch_size: int = MATCH_LOG_FLUSH_BATCH):
+        self._rows: deque[dict] = deque()
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.written = 0
+        self.failed_flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: dict) -> bool:
+        if len(self._rows) >= self.max_size:
+            self.dropped += 1
+            return False
+        self._rows.append(row)
+        return True
+
+    async def flush(self) -> int:
+        flushed = 0
+        while self._rows:
+            batch = [self._rows.popleft() for _ in range(min(self.batch_size, len(self._rows)))]
+            try:
+                async with SessionLocal() as db:
+                    await db.execute(insert(MatchLog), batch)
+                    await db.commit()
+            except Exception:
+                self.failed_flushes += 1
+                self.dropped += len(batch)
+                raise
+            flushed += len(batch)
+            self.written += len(batch)
+        return flushed
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=MATCH_LOG_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[match-service] match log flush failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._rows),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+match_log_buffer = MatchLogBuffer()
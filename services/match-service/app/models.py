@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String
+from sqlalchemy import Boolean, Column, Integer, Float, String, false
 from .db import Base
 
 
@@ -9,4 +9,6 @@ class MatchLog(Base):
     user_latitude = Column(Float, nullable=False)
     user_longitude = Column(Float, nullable=False)
     skill = Column(String, nullable=False)
-    job_description = Column(String, nullable=True)
\ No newline at end of file
+    job_description = Column(String, nullable=True)
+    cache_hit = Column(Boolean, nullable=False, default=False, server_default=false())
+    result_count = Column(Integer, nullable=True)
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from .services import (
+    redis_client,
+    PROJ_HANDYMAN_LEGACY_KEY,
+    PROJ_HANDYMEN_INDEX,
+    PROJ_SCHEMA_VERSION,
+    PROJ_AVAIL_KEY,
+    PROJ_AVAIL_INDEX,
+    fetch_handymen_http,
+    iter_availability_export_http,
+    bulk_upsert_handyman_projections,
+    bulk_delete_handyman_projections,
+    bulk_upsert_availability_projections,
+    clean_availability,
+    decode_handyman_fields,
+    encode_handyman_fields,
+    get_handyman_projections,
+    normalize_handyman,
+)
+
+SYNC_PAGE_SIZE = int(os.getenv("MATCH_SYNC_PAGE_SIZE") or "500")
+PROJ_META_KEY = "proj:meta"
+
+DIGEST_FIELDS = (
+    "email",
+    "skills",
+    "years_experience",
+    "avg_rating",
+    "rating_count",
+    "service_radius_km",
+    "latitude",
+    "longitude",
+)
+
+_sync_lock = asyncio.Lock()
+_sync_task: asyncio.Task | None = None
+last_sync: dict | None = None
+last_sync_error: str | None = None
+# Counters for the resync in flight, reset when the next one starts.
+sync_progress: dict = {}
+
+
+def _handyman_fingerprint(doc: dict) -> str:
+    row = {f: doc.get(f) for f in DIGEST_FIELDS}
+    row["skills"] = sorted(row.get("skills") or [])
+    return hashlib.sha1(json.dumps(row, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _availability_fingerprint(email: str, doc: dict) -> str:
+    row = {
+        "email": email,
+        "slots": sorted((s["start"], s["end"]) for s in doc.get("slots") or []),
+        "rules": doc.get("rules"),
+        "blocked": sorted((s["start"], s["end"]) for s in doc.get("blocked") or []),
+    }
+    return hashlib.sha1(json.dumps(row, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _handyman_fingerprints(docs: list[dict]) -> dict[str, str]:
+    """Fingerprints documents as they would read back from the projection hash."""
+    out: dict[str, str] = {}
+    for doc in docs:
+        normalized = normalize_handyman(doc)
+        if not normalized:
+            continue
+        pairs = encode_handyman_fields(normalized)
+        stored = decode_handyman_fields({f: v for f, v in zip(pairs[0::2], pairs[1::2]) if v != ""})
+        if stored:
+            out[stored["email"]] = _handyman_fingerprint(stored)
+    return out
+
+
+def _availability_fingerprints(items: list[dict]) -> dict[str, str]:
+    return {
+        item["email"]: _availability_fingerprint(item["email"], item)
+        for item in items
+        if item.get("email") and (item.get("slots") or item.get("rules"))
+    }
+
+
+def _digest(fingerprints) -> str:
+    h = hashlib.sha256()
+    for fp in sorted(fingerprints):
+        h.update(fp.encode("ascii"))
+    return h.hexdigest()
+
+
+async def _iter_handymen_pages():
+    offset = 0
+    while True:
+        page = await fetch_handymen_http(limit=SYNC_PAGE_SIZE, offset=offset)
+        if page:
+            yield page
+        if len(page) < SYNC_PAGE_SIZE:
+            return
+        offset += SYNC_PAGE_SIZE
+
+
+async def _iter_availability_pages():
+    async for items in iter_availability_export_http(batch=SYNC_PAGE_SIZE):
+        yield items
+
+
+async def _remove_stale(index_key: str, seen: set[str], *, handymen: bool) -> int:
+    existing = await redis_client.smembers(index_key)
+    stale = [e for e in (existing or ()) if e not in seen]
+    if not stale:
+        return 0
+
+    if handymen:
+        return await bulk_delete_handyman_projections(stale)
+
+    pipe = redis_client.pipeline()
+    for email in stale:
+        pipe.delete(PROJ_AVAIL_KEY.format(email=email))
+        pipe.srem(index_key, email)
+    await pipe.execute()
+    return len(stale)
+
+
+async def _drop_legacy_handyman_keys(emails: set[str]) -> None:
+    """
+    Removes JSON-string handyman documents left over from schema version 1,
+    including those of handymen that no longer exist upstream.
+    """
+    ordered = sorted(emails)
+    for i in range(0, len(ordered), SYNC_PAGE_SIZE):
+        await redis_client.delete(
+            *(PROJ_HANDYMAN_LEGACY_KEY.format(email=e) for e in ordered[i:i + SYNC_PAGE_SIZE])
+        )
+
+    cursor = 0
+    while True:
+        cursor, keys = await redis_client.scan(
+            cursor=cursor, match=PROJ_HANDYMAN_LEGACY_KEY.format(email="*"), count=SYNC_PAGE_SIZE
+        )
+        if keys:
+            pipe = redis_client.pipeline(transaction=False)
+            for k in keys:
+                pipe.type(k)
+            types = await pipe.execute()
+            legacy = [k for k, t in zip(keys, types) if t != "hash"]
+            if legacy:
+                await redis_client.delete(*legacy)
+        if not cursor:
+            return
+
+
+async def resync_projections() -> dict:
+    """
+    Rebuilds the handyman and availability projections from the source
+    services, page by page with pipelined writes, removes entries that no
+    longer exist upstream and records counts and digests in proj:meta.
+    """
+    global last_sync, sync_progress
+
+    async with _sync_lock:
+        sync_progress = {
+            "phase": "handymen",
+            "handymen": 0,
+            "availability": 0,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        }
+        previous_schema = await redis_client.hget(PROJ_META_KEY, "schema_version")
+
+        handyman_fps: dict[str, str] = {}
+        async for page in _iter_handymen_pages():
+            await bulk_upsert_handyman_projections(page)
+            handyman_fps.update(_handyman_fingerprints(page))
+            sync_progress["handymen"] = len(handyman_fps)
+
+        # SSCAN may return an email more than once, so fingerprints are keyed by email.
+        sync_progress["phase"] = "availability"
+        avail_fps: dict[str, str] = {}
+        async for items in _iter_availability_pages():
+            await bulk_upsert_availability_projections(items)
+            avail_fps.update(_availability_fingerprints(items))
+            sync_progress["availability"] = len(avail_fps)
+
+        sync_progress["phase"] = "cleanup"
+
+        seen_handymen = set(handyman_fps)
+        seen_avail = set(avail_fps)
+
+        removed_handymen = await _remove_stale(PROJ_HANDYMEN_INDEX, seen_handymen, handymen=True)
+        removed_avail = await _remove_stale(PROJ_AVAIL_INDEX, seen_avail, handymen=False)
+
+        if previous_schema != PROJ_SCHEMA_VERSION:
+            await _drop_legacy_handyman_keys(seen_handymen)
+
+        meta = {
+            "schema_version": PROJ_SCHEMA_VERSION,
+            "handymen_count": len(seen_handymen),
+            "handymen_digest": _digest(handyman_fps.values()),
+            "availability_count": len(seen_avail),
+            "availability_digest": _digest(avail_fps.values()),
+            "synced_at": datetime.now(timezone.utc).isoformat(),
+        }
+        await redis_client.hset(PROJ_META_KEY, mapping=meta)
+
+        last_sync = {
+            **meta,
+            "removed_handymen": removed_handymen,
+            "removed_availability": removed_avail,
+        }
+        return last_sync
+
+
+async def _read_projected_handymen() -> list[dict]:
+    emails = sorted(await redis_client.smembers(PROJ_HANDYMEN_INDEX) or ())
+    docs: list[dict] = []
+    for i in range(0, len(emails), SYNC_PAGE_SIZE):
+        docs.extend(await get_handyman_projections(emails[i:i + SYNC_PAGE_SIZE]))
+    return docs
+
+
+async def _read_projected_availability() -> list[dict]:
+    emails = sorted(await redis_client.smembers(PROJ_AVAIL_INDEX) or ())
+    docs: list[dict] = []
+    for i in range(0, len(emails), SYNC_PAGE_SIZE):
+        pipe = redis_client.pipeline()
+        for email in emails[i:i + SYNC_PAGE_SIZE]:
+            pipe.get(PROJ_AVAIL_KEY.format(email=email))
+        for raw in await pipe.execute():
+            if not raw:
+                continue
+            try:
+                docs.append(json.loads(raw))
+            except Exception:
+                continue
+    return docs
+
+
+async def check_drift() -> dict:
+    """
+    Compares counts and content digests of the source services with the
+    local projections without writing anything.
+    """
+    source_handymen: dict[str, str] = {}
+    async for page in _iter_handymen_pages():
+        source_handymen.update(_handyman_fingerprints(page))
+
+    source_avail: dict[str, str] = {}
+    async for items in _iter_availability_pages():
+        source_avail.update(_availability_fingerprints(items))
+
+    projected_handymen = {
+        doc["email"]: _handyman_fingerprint(doc) for doc in await _read_projected_handymen()
+    }
+    projected_avail = _availability_fingerprints(
+        [
+            {"email": doc.get("email"), **clean_availability(doc)}
+            for doc in await _read_projected_availability()
+        ]
+    )
+
+    handymen = {
+        "source_count": len(source_handymen),
+        "projection_count": len(projected_handymen),
+        "in_sync": _digest(source_handymen.values()) == _digest(projected_handymen.values()),
+    }
+    availability = {
+        "source_count": len(source_avail),
+        "projection_count": len(projected_avail),
+        "in_sync": _digest(source_avail.values()) == _digest(projected_avail.values()),
+    }
+    return {
+        "in_sync": handymen["in_sync"] and availability["in_sync"],
+        "handymen": handymen,
+        "availability": availability,
+    }
+
+
+async def warm_projections() -> dict:
+    """
+    Startup check: runs a full resync when proj:meta is missing (fresh or
+    flushed Redis), was written for an older projection encoding, or when
+    the projected handyman count no longer matches the last sync.
+    """
+    meta = await redis_client.hgetall(PROJ_META_KEY)
+    projected = int(await redis_client.scard(PROJ_HANDYMEN_INDEX) or 0)
+
+    schema_ok = bool(meta) and meta.get("schema_version") == PROJ_SCHEMA_VERSION
+    if schema_ok and int(meta.get("handymen_count") or -1) == projected:
+        return {"resynced": False, "reason": "meta_matches", "count": projected}
+
+    try:
+        result = await resync_projections()
+    except Exception as e:
+        return {"resynced": False, "reason": f"resync_failed: {type(e).__name__}: {e}", "count": projected}
+
+    if not meta:
+        reason = "meta_missing"
+    elif not schema_ok:
+        reason = "schema_changed"
+    else:
+        reason = "count_mismatch"
+    return {"resynced": True, "reason": reason, "count": result["handymen_count"]}
+
+
+def is_syncing() -> bool:
+    return _sync_lock.locked() or (_sync_task is not None and not _sync_task.done())
+
+
+async def _run_resync() -> None:
+    global last_sync_error
+
+    try:
+        await resync_projections()
+        last_sync_error = None
+    except Exception as e:
+        last_sync_error = f"{type(e).__name__}: {e}"
+        print(f"[match-service] projection resync failed: {last_sync_error}")
+
+
+def start_resync() -> bool:
+    """
+    Starts a resync in the background unless one is already running.
+    Returns False when nothing was started.
+    """
+    global _sync_task
+
+    if is_syncing():
+        return False
+    _sync_task = asyncio.create_task(_run_resync())
+    return True
+
+
+def sync_status() -> dict:
+    return {
+        "running": is_syncing(),
+        "progress": sync_progress,
+        "last_sync": last_sync,
+        "last_error": last_sync_error,
+    }
@@ -1,29 +1,47 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import base64
+import os
+from itertools import islice
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 
 from .db import SessionLocal
 from .models import MatchLog
-from .schemas import MatchRequest, MatchLogResponse, UpdateMatchLog
+from .schemas import MatchRequest, MatchLogResponse, MatchPage, UpdateMatchLog
 from shared.shared.crud_helpers import fetch_or_404
 from .services import (
-    haversine,
-    get_live_handymen_for_skill,
-    get_effective_availability_slots,
-    projected_has_overlap,
+    resolve_availability,
     projections_have_any_availability,
     cache_key,
     get_cached_result,
-    set_cache_with_index,
+    decode_cached_result,
+    get_generations,
+    result_ttl,
+    set_cached_result,
+    try_acquire_refresh,
+    try_acquire_compute_lock,
+    release_compute_lock,
+    wait_for_cached_result,
     norm,
-    bucket_id,
 )
+from .candidates import get_candidate_snapshot
+from .match_log_buffer import match_log_buffer
+from .singleflight import SingleFlight
+from .projection_sync import check_drift, start_resync, sync_status
 
 router = APIRouter()
 
+MATCH_DEFAULT_PAGE_SIZE = int(os.getenv("MATCH_DEFAULT_PAGE_SIZE") or "20")
+MATCH_MAX_RANKED_RESULTS = int(os.getenv("MATCH_MAX_RANKED_RESULTS") or "200")
+MATCH_AVAILABILITY_BATCH = int(os.getenv("MATCH_AVAILABILITY_BATCH") or "50")
+
+_background_tasks: set[asyncio.Task] = set()
+_inflight = SingleFlight()
+
 
 async def get_db():
     async with SessionLocal() as session:
@@ -37,108 +55,183 @@ def _log_to_response(row: MatchLog) -> MatchLogResponse:
         user_longitude=row.user_longitude,
         skill=row.skill,
         job_description=row.job_description,
+        cache_hit=bool(row.cache_hit),
+        result_count=row.result_count,
     )
 
 
-@router.post("/match")
-async def match(data: MatchRequest, db: AsyncSession = Depends(get_db)):
+def _log_match(data: MatchRequest, requested_skill: str, results: list[dict], cache_hit: bool) -> None:
+    match_log_buffer.add(
+        {
+            "user_latitude": data.latitude,
+            "user_longitude": data.longitude,
+            "skill": requested_skill,
+            "job_description": data.job_description,
+            "cache_hit": cache_hit,
+            "result_count": len(results),
+        }
+    )
+
+
+async def _compute_matches(
+    data: MatchRequest, requested_skill: str, degraded: bool, skill_generation: int = 0
+) -> list[dict]:
+    snapshot = await get_candidate_snapshot(requested_skill, skill_generation)
+
+    results: list[dict] = []
+
+    # Candidates are resolved in ranked chunks: one projection MGET and at
+    # most one bulk live check per chunk instead of a lookup per handyman.
+    ranked = iter(snapshot.ranked(data.latitude, data.longitude))
+    while len(results) < MATCH_MAX_RANKED_RESULTS:
+        chunk = list(islice(ranked, MATCH_AVAILABILITY_BATCH))
+        if not chunk:
+            break
+
+        emails = [snapshot.handymen[i]["email"] for i, _, _ in chunk]
+        availability = await resolve_availability(emails, data.desired_start, data.desired_end)
+
+        for (i, distance, score), (available, source) in zip(chunk, availability):
+            if len(results) >= MATCH_MAX_RANKED_RESULTS:
+                break
+
+            h = snapshot.handymen[i]
+
+            if available is None:
+                availability_unknown = True
+                if not degraded:
+                    continue
+            elif not available:
+                continue
+            else:
+                availability_unknown = False
+
+            results.append(
+                {
+                    "email": h["email"],
+                    "latitude": h["latitude"],
+                    "longitude": h["longitude"],
+                    "distance_km": round(distance, 2),
+                    "years_experience": h.get("years_experience"),
+                    "avg_rating": h.get("avg_rating"),
+                    "rating_count": h.get("rating_count"),
+                    "score": round(score, 4),
+                    "availability_unknown": availability_unknown,
+                    "availability_source": source,
+                }
+            )
+
+    return results
+
+
+async def _refresh_cached_matches(
+    data: MatchRequest, requested_skill: str, degraded: bool, key: str, skill_generation: int = 0
+) -> None:
+    try:
+        results = await _compute_matches(data, requested_skill, degraded, skill_generation)
+        await set_cached_result(key, results, result_ttl(results, degraded))
+    except Exception as e:
+        print(f"[match-service] background refresh failed for {key}: {e}")
+
+
+async def _compute_and_cache(
+    data: MatchRequest, requested_skill: str, degraded: bool, key: str, skill_generation: int = 0
+) -> list[dict]:
+    token = await try_acquire_compute_lock(key)
+    if token is None:
+        results = await wait_for_cached_result(key)
+        if results is not None:
+            return results
+
+    try:
+        results = await _compute_matches(data, requested_skill, degraded, skill_generation)
+        await set_cached_result(key, results, result_ttl(results, degraded))
+        return results
+    finally:
+        if token is not None:
+            await release_compute_lock(key, token)
+
+
+def _spawn_background(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _encode_cursor(offset: int, generation: int) -> str:
+    return base64.urlsafe_b64encode(f"{offset}:{generation}".encode("ascii")).decode("ascii")
+
+
+def _decode_cursor(cursor: str | None) -> tuple[int, int | None]:
+    if not cursor:
+        return 0, None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii")
+        offset, generation = (int(part) for part in raw.split(":"))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset, generation
+
+
+async def _ranked_matches(data: MatchRequest) -> tuple[list[dict], int]:
     if data.desired_end <= data.desired_start:
-        return []
+        return [], 0
 
     requested_skill = norm(data.skill)
     if not requested_skill:
-        return []
+        return [], 0
 
     has_any_avail = await projections_have_any_availability()
     degraded = not has_any_avail
 
+    generation, skill_generation = await get_generations(requested_skill, data.latitude, data.longitude)
     key = cache_key(
         data.latitude,
         data.longitude,
         requested_skill,
         degraded=degraded,
         desired_start=data.desired_start,
+        generation=generation,
     )
 
-    cached = await get_cached_result(key)
-    if cached:
-        try:
-            parsed = json.loads(cached)
-            if isinstance(parsed, list) and parsed:
-                return parsed
-        except Exception:
-            pass
-
-    handymen = await get_live_handymen_for_skill(requested_skill)
+    cached = decode_cached_result(await get_cached_result(key))
+    if cached is not None:
+        results, stale = cached
+        if stale and await try_acquire_refresh(key):
+            _spawn_background(_refresh_cached_matches(data, requested_skill, degraded, key, skill_generation))
+        _log_match(data, requested_skill, results, cache_hit=True)
+        return results, generation
 
-    results: list[dict] = []
+    results = await _inflight.do(key, lambda: _compute_and_cache(data, requested_skill, degraded, key, skill_generation))
+    _log_match(data, requested_skill, results, cache_hit=False)
 
-    for h in handymen:
-        if h.get("latitude") is None or h.get("longitude") is None:
-            continue
+    return results, generation
 
-        distance = haversine(
-            float(data.latitude),
-            float(data.longitude),
-            float(h["latitude"]),
-            float(h["longitude"]),
-        )
 
-        if distance > float(h.get("service_radius_km") or 0):
-            continue
+@router.post("/match")
+async def match(data: MatchRequest, limit: int = Query(MATCH_DEFAULT_PAGE_SIZE, ge=1, le=MATCH_MAX_RANKED_RESULTS)):
+    results, _ = await _ranked_matches(data)
+    return results[:limit]
 
-        slots, source = await get_effective_availability_slots(h["email"])
 
-        if slots is None:
-            availability_unknown = True
-            if not degraded:
-                continue
-        else:
-            ok = projected_has_overlap(slots, data.desired_start, data.desired_end)
-            if not ok:
-                continue
-            availability_unknown = False
-
-        results.append(
-            {
-                "email": h["email"],
-                "latitude": h["latitude"],
-                "longitude": h["longitude"],
-                "distance_km": round(distance, 2),
-                "years_experience": h.get("years_experience"),
-                "availability_unknown": availability_unknown,
-                "availability_source": source,
-            }
-        )
-
-    results.sort(key=lambda x: x["distance_km"])
-
-    mode = "degraded" if degraded else "strict"
-    ttl = 15 if degraded else 60
-    b_lat, b_lon = bucket_id(data.latitude, data.longitude)
-
-    if results:
-        await set_cache_with_index(
-            cache_key_str=key,
-            value=json.dumps(results),
-            ttl_seconds=ttl,
-            mode=mode,
-            skill=requested_skill,
-            b_lat=b_lat,
-            b_lon=b_lon,
-        )
-
-    db.add(
-        MatchLog(
-            user_latitude=data.latitude,
-            user_longitude=data.longitude,
-            skill=requested_skill,
-            job_description=data.job_description,
-        )
-    )
-    await db.commit()
+@router.post("/match/page", response_model=MatchPage)
+async def match_page(
+    data: MatchRequest,
+    limit: int = Query(MATCH_DEFAULT_PAGE_SIZE, ge=1, le=MATCH_MAX_RANKED_RESULTS),
+    cursor: str | None = Query(default=None),
+):
+    offset, cursor_generation = _decode_cursor(cursor)
+    results, generation = await _ranked_matches(data)
+    # Offsets only mean something against the ranked set they were cut
+    # from; once the generation moves the set is rebuilt and rows shift.
+    if cursor_generation is not None and cursor_generation != generation:
+        raise HTTPException(status_code=409, detail="Cursor is stale, restart from the first page")
 
-    return results
+    end = offset + limit
+    next_cursor = _encode_cursor(end, generation) if end < len(results) else None
+    return MatchPage(items=results[offset:end], next_cursor=next_cursor)
 
 
 @router.get("/match-logs", response_model=list[MatchLogResponse])
@@ -194,4 +287,21 @@ async def delete_match_log(log_id: int, db: AsyncSession = Depends(get_db)):
 async def clear_match_logs(db: AsyncSession = Depends(get_db)):
     await db.execute(delete(MatchLog))
     await db.commit()
-    return {"message": "cleared"}
\ No newline at end of file
+    return {"message": "cleared"}
+
+
+@router.post("/admin/projections/resync", status_code=202)
+async def resync_projections_endpoint():
+    if not start_resync():
+        raise HTTPException(status_code=409, detail="Projection resync already running")
+    return sync_status()
+
+
+@router.get("/admin/projections/resync")
+async def resync_status_endpoint():
+    return sync_status()
+
+
+@router.get("/admin/projections/drift")
+async def projection_drift_endpoint():
+    return await check_drift()
@@ -1,6 +1,7 @@
 from shared.shared.schemas.match import (
     MatchRequest,
     MatchResult,
+    MatchPage,
     MatchLogResponse,
     UpdateMatchLog,
 )
\ No newline at end of file
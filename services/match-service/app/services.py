@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import json
+import asyncio
 import math
 import os
+import random
+import secrets
+import time
 from datetime import datetime, timezone
 from typing import Any
 
@@ -10,7 +14,8 @@ import httpx
 import redis.asyncio as redis
 from dateutil import parser
 
-from shared.shared.intervals import overlaps
+from shared.shared.intervals import fully_contains, subtract_intervals
+from shared.shared.recurrence import expand_rules, normalize_rules
 
 HANDYMAN_SERVICE_URL = os.getenv("HANDYMAN_SERVICE_URL", "http://handyman-service:8000")
 AVAILABILITY_SERVICE_URL = os.getenv("AVAILABILITY_SERVICE_URL", "http://availability-service:8000")
@@ -25,8 +30,23 @@ HTTP_TIMEOUT = 2.0
 
 GRID_DEG = float(os.getenv("MATCH_GRID_DEG") or "0.05")
 TIME_BUCKET_SECONDS = int(os.getenv("MATCH_TIME_BUCKET_SECONDS") or "900")
-
-PROJ_HANDYMAN_KEY = "proj:handyman:{email}"
+REGION_DEG = float(os.getenv("MATCH_REGION_DEG") or "0.5")
+GENERATION_TTL_SECONDS = int(os.getenv("MATCH_GENERATION_TTL_SECONDS") or "86400")
+
+CACHE_TTL_SECONDS = int(os.getenv("MATCH_CACHE_TTL_SECONDS") or "60")
+DEGRADED_CACHE_TTL_SECONDS = int(os.getenv("MATCH_DEGRADED_CACHE_TTL_SECONDS") or "15")
+NEGATIVE_CACHE_TTL_SECONDS = int(os.getenv("MATCH_NEGATIVE_CACHE_TTL_SECONDS") or "10")
+CACHE_STALE_SECONDS = int(os.getenv("MATCH_CACHE_STALE_SECONDS") or "30")
+CACHE_TTL_JITTER_RATIO = float(os.getenv("MATCH_CACHE_TTL_JITTER_RATIO") or "0.1")
+REFRESH_LOCK_SECONDS = 10
+
+COMPUTE_LOCK_SECONDS = int(os.getenv("MATCH_COMPUTE_LOCK_SECONDS") or "5")
+COMPUTE_WAIT_SECONDS = float(os.getenv("MATCH_COMPUTE_WAIT_SECONDS") or "2.0")
+COMPUTE_POLL_SECONDS = 0.05
+
+PROJ_HANDYMAN_KEY = "proj:handyman:h:{email}"
+PROJ_HANDYMAN_LEGACY_KEY = "proj:handyman:{email}"
+PROJ_SCHEMA_VERSION = "3"
 PROJ_HANDYMEN_INDEX = "proj:handymen:index"
 PROJ_HANDYMEN_SKILL_INDEX = "proj:handymen:skill:{skill}"
 
@@ -79,15 +99,31 @@ def time_bucket(desired_start: datetime) -> int:
     return epoch // TIME_BUCKET_SECONDS
 
 
-def cache_key(lat: float, lon: float, skill: str, degraded: bool, desired_start: datetime) -> str:
+def region_id(lat: float, lon: float) -> tuple[int, int]:
+    return int(math.floor(lat / REGION_DEG)), int(math.floor(lon / REGION_DEG))
+
+
+def generation_key(skill: str, r_lat: int, r_lon: int) -> str:
+    return f"matchgen:{skill}:lat={r_lat}:lon={r_lon}"
+
+
+def skill_generation_key(skill: str) -> str:
+    """Bumped with any region of the skill; in-process candidate snapshots are keyed on it."""
+    return f"matchgen:{skill}"
+
+
+def cache_key(
+    lat: float,
+    lon: float,
+    skill: str,
+    degraded: bool,
+    desired_start: datetime,
+    generation: int = 0,
+) -> str:
     mode = "degraded" if degraded else "strict"
     b_lat, b_lon = bucket_id(lat, lon)
     t = time_bucket(desired_start)
-    return f"match:{mode}:{skill}:lat={b_lat}:lon={b_lon}:t={t}"
-
-
-def bucket_set_key(mode: str, skill: str, b_lat: int, b_lon: int) -> str:
-    return f"matchkeys:{mode}:{skill}:lat={b_lat}:lon={b_lon}"
+    return f"match:{mode}:{skill}:lat={b_lat}:lon={b_lon}:t={t}:g={generation}"
 
 
 def km_to_deg_lat(km: float) -> float:
@@ -101,19 +137,28 @@ def km_to_deg_lon(km: float, lat: float) -> float:
     return km / (111.0 * c)
 
 
-def buckets_in_radius(lat: float, lon: float, radius_km: float) -> list[tuple[int, int]]:
+def _grid_bounds(lat: float, lon: float, radius_km: float, cell_deg: float) -> tuple[int, int, int, int]:
     d_lat = km_to_deg_lat(radius_km)
     d_lon = km_to_deg_lon(radius_km, lat)
 
-    lat_min = lat - d_lat
-    lat_max = lat + d_lat
-    lon_min = lon - d_lon
-    lon_max = lon + d_lon
+    return (
+        int(math.floor((lat - d_lat) / cell_deg)),
+        int(math.floor((lat + d_lat) / cell_deg)),
+        int(math.floor((lon - d_lon) / cell_deg)),
+        int(math.floor((lon + d_lon) / cell_deg)),
+    )
+
 
-    b_lat_min = int(math.floor(lat_min / GRID_DEG))
-    b_lat_max = int(math.floor(lat_max / GRID_DEG))
-    b_lon_min = int(math.floor(lon_min / GRID_DEG))
-    b_lon_max = int(math.floor(lon_max / GRID_DEG))
+def bucket_bounds(lat: float, lon: float, radius_km: float) -> tuple[int, int, int, int]:
+    return _grid_bounds(lat, lon, radius_km, GRID_DEG)
+
+
+def region_bounds(lat: float, lon: float, radius_km: float) -> tuple[int, int, int, int]:
+    return _grid_bounds(lat, lon, radius_km, REGION_DEG)
+
+
+def buckets_in_radius(lat: float, lon: float, radius_km: float) -> list[tuple[int, int]]:
+    b_lat_min, b_lat_max, b_lon_min, b_lon_max = bucket_bounds(lat, lon, radius_km)
 
     out = []
     for bl in range(b_lat_min, b_lat_max + 1):
@@ -122,98 +167,272 @@ def buckets_in_radius(lat: float, lon: float, radius_km: float) -> list[tuple[in
     return out
 
 
-async def invalidate_bucket(mode: str, skill: str, b_lat: int, b_lon: int) -> int:
-    mode = norm(mode)
-    if mode not in ("strict", "degraded"):
-        mode = "strict"
+def _generation_value(raw) -> int:
+    try:
+        return int(raw or 0)
+    except (TypeError, ValueError):
+        return 0
 
+
+async def get_generations(skill: str, lat: float, lon: float) -> tuple[int, int]:
+    """(region generation, skill generation) for a match request, in one MGET."""
     skill = norm(skill)
-    set_key = bucket_set_key(mode, skill, b_lat, b_lon)
+    r_lat, r_lon = region_id(lat, lon)
+    region_raw, skill_raw = await redis_client.mget(
+        generation_key(skill, r_lat, r_lon),
+        skill_generation_key(skill),
+    )
+    return _generation_value(region_raw), _generation_value(skill_raw)
+
+
+async def bump_generations(regions: list[tuple[str, tuple[int, int, int, int]]]) -> int:
+    """
+    Invalidates cached match results by incrementing the generation of every
+    coarse (skill, region) cell covered by the given region bounds. Entries
+    under the old generation are no longer addressed and expire by TTL.
+    Each skill's own generation is bumped too, so every replica rebuilds its
+    candidate snapshot instead of serving it until SNAPSHOT_TTL_SECONDS.
+    """
+    keys: set[str] = set()
+    for skill, (r_lat_min, r_lat_max, r_lon_min, r_lon_max) in regions:
+        skill = norm(skill)
+        if not skill:
+            continue
+        keys.add(skill_generation_key(skill))
+        for r_lat in range(r_lat_min, r_lat_max + 1):
+            for r_lon in range(r_lon_min, r_lon_max + 1):
+                keys.add(generation_key(skill, r_lat, r_lon))
 
-    keys = await redis_client.smembers(set_key)
     if not keys:
-        await redis_client.delete(set_key)
         return 0
 
     pipe = redis_client.pipeline()
-    pipe.delete(*list(keys))
-    pipe.delete(set_key)
-    res = await pipe.execute()
-
-    deleted = res[0] if res and isinstance(res[0], int) else 0
-    return deleted
+    for key in sorted(keys):
+        pipe.incr(key)
+        pipe.expire(key, GENERATION_TTL_SECONDS)
+    await pipe.execute()
+    return len(keys)
+
+
+HANDYMAN_FIELDS = (
+    "years_experience",
+    "avg_rating",
+    "rating_count",
+    "service_radius_km",
+    "latitude",
+    "longitude",
+)
+
+HANDYMAN_INT_FIELDS = ("years_experience", "rating_count")
+HANDYMAN_FLOAT_FIELDS = ("avg_rating", "service_radius_km", "latitude", "longitude")
+
+# Fields read when building candidate lists; updated_at is left out.
+HANDYMAN_MATCH_FIELDS = ("email", "skills") + HANDYMAN_FIELDS
+
+# Handyman projections are Redis hashes: one field per attribute, skills as a
+# comma-joined list and missing values as absent fields.
+#
+# Upsert: writes the field/value pairs in ARGV[4..] (an empty value deletes the
+# field) and diffs skill-index memberships against the stored skills in one
+# server-side step. ARGV[2] == "1" merges into the stored hash (partial update
+# events), otherwise the hash is replaced. Returns {previous, stored} as flat
+# HGETALL arrays.
+UPSERT_HANDYMAN_LUA = """
+local key = KEYS[1]
+local old = redis.call('HGETALL', key)
+local old_skills_raw = redis.call('HGET', key, 'skills') or ''
+local new_skills_raw = ''
+if ARGV[2] == '1' then
+  new_skills_raw = old_skills_raw
+else
+  redis.call('DEL', key)
+end
+
+for i = 4, #ARGV, 2 do
+  local field, value = ARGV[i], ARGV[i + 1]
+  if value == '' then
+    redis.call('HDEL', key, field)
+  else
+    redis.call('HSET', key, field, value)
+  end
+  if field == 'skills' then new_skills_raw = value end
+end
+
+local new_skills = {}
+for s in string.gmatch(new_skills_raw, '[^,]+') do new_skills[s] = true end
+for s in string.gmatch(old_skills_raw, '[^,]+') do
+  if not new_skills[s] then redis.call('SREM', ARGV[3] .. s, ARGV[1]) end
+end
+for s in pairs(new_skills) do
+  redis.call('SADD', ARGV[3] .. s, ARGV[1])
+end
+
+redis.call('SADD', KEYS[2], ARGV[1])
+return {old, redis.call('HGETALL', key)}
+"""
+
+DELETE_HANDYMAN_LUA = """
+local old = redis.call('HGETALL', KEYS[1])
+local skills = redis.call('HGET', KEYS[1], 'skills') or ''
+for s in string.gmatch(skills, '[^,]+') do
+  redis.call('SREM', ARGV[2] .. s, ARGV[1])
+end
+redis.call('DEL', KEYS[1])
+redis.call('SREM', KEYS[2], ARGV[1])
+return old
+"""
+
+_upsert_handyman_script = redis_client.register_script(UPSERT_HANDYMAN_LUA)
+_delete_handyman_script = redis_client.register_script(DELETE_HANDYMAN_LUA)
+
+
+def _normalize_skills(skills: list[str] | None) -> list[str]:
+    skills_norm = [norm(s).replace(",", " ") for s in (skills or []) if s]
+    seen = set()
+    return [s for s in skills_norm if s and not (s in seen or seen.add(s))]
 
 
-def _normalize_handyman(doc: dict) -> dict:
+def normalize_handyman(doc: dict, *, partial: bool = False) -> dict:
+    """
+    Full documents get every projected field (missing ones as None); partial
+    documents only carry the fields present in the event so a merge does not
+    blank out stored values.
+    """
     email = (doc or {}).get("email")
     if not email:
         return {}
 
-    skills = doc.get("skills") or []
-    skills_norm = [norm(s) for s in skills if s]
-    seen = set()
-    skills_norm = [s for s in skills_norm if not (s in seen or seen.add(s))]
+    out: dict[str, Any] = {"email": email}
+    if not partial or "skills" in doc:
+        out["skills"] = _normalize_skills(doc.get("skills"))
+    for field in HANDYMAN_FIELDS:
+        if not partial or field in doc:
+            out[field] = doc.get(field)
+    out["updated_at"] = utc_now_iso()
+    return out
 
-    return {
-        "email": email,
-        "skills": skills_norm,
-        "years_experience": doc.get("years_experience"),
-        "service_radius_km": doc.get("service_radius_km"),
-        "latitude": doc.get("latitude"),
-        "longitude": doc.get("longitude"),
-        "updated_at": utc_now_iso(),
-    }
 
+def encode_handyman_fields(doc: dict) -> list[str]:
+    """Flattens a normalized handyman into hash field/value pairs ("" = absent)."""
+    pairs: list[str] = []
+    for field, value in doc.items():
+        if field == "skills":
+            value = ",".join(value or [])
+        elif value is None:
+            value = ""
+        pairs.extend((field, str(value)))
+    return pairs
 
-async def get_handyman_projection(email: str) -> dict | None:
-    if not email:
-        return None
-    raw = await redis_client.get(PROJ_HANDYMAN_KEY.format(email=email))
-    if not raw:
+
+def _to_number(raw: str | None, cast):
+    if raw is None or raw == "":
         return None
     try:
-        return json.loads(raw)
-    except Exception:
+        return cast(float(raw)) if cast is int else cast(raw)
+    except (TypeError, ValueError):
         return None
 
 
-async def upsert_handyman_projection(doc: dict) -> None:
-    normalized = _normalize_handyman(doc)
-    email = normalized.get("email")
+def decode_handyman_fields(fields: dict[str, str | None]) -> dict | None:
+    if not fields or not fields.get("email"):
+        return None
+
+    doc: dict[str, Any] = {
+        "email": fields["email"],
+        "skills": [s for s in (fields.get("skills") or "").split(",") if s],
+    }
+    for field in HANDYMAN_INT_FIELDS:
+        if field in fields:
+            doc[field] = _to_number(fields.get(field), int)
+    for field in HANDYMAN_FLOAT_FIELDS:
+        if field in fields:
+            doc[field] = _to_number(fields.get(field), float)
+    if fields.get("updated_at"):
+        doc["updated_at"] = fields["updated_at"]
+    return doc
+
+
+def _decode_flat_hash(flat: list[str] | None) -> dict | None:
+    if not flat:
+        return None
+    return decode_handyman_fields(dict(zip(flat[0::2], flat[1::2])))
+
+
+async def get_handyman_projection(email: str) -> dict | None:
     if not email:
-        return
+        return None
+    return decode_handyman_fields(await redis_client.hgetall(PROJ_HANDYMAN_KEY.format(email=email)))
 
-    old = await get_handyman_projection(email)
-    old_skills = set((old or {}).get("skills") or [])
-    new_skills = set(normalized.get("skills") or [])
+
+async def get_handyman_projections(emails) -> list[dict]:
+    """Pipelined HMGET of the match fields for each email; missing rows are skipped."""
+    emails = [e for e in emails or () if e]
+    if not emails:
+        return []
 
     pipe = redis_client.pipeline()
-    pipe.set(PROJ_HANDYMAN_KEY.format(email=email), json.dumps(normalized))
-    pipe.sadd(PROJ_HANDYMEN_INDEX, email)
+    for e in emails:
+        pipe.hmget(PROJ_HANDYMAN_KEY.format(email=e), HANDYMAN_MATCH_FIELDS)
+    rows = await pipe.execute()
+
+    out: list[dict] = []
+    for values in rows:
+        if not values:
+            continue
+        doc = decode_handyman_fields(
+            {f: v for f, v in zip(HANDYMAN_MATCH_FIELDS, values) if v is not None}
+        )
+        if doc:
+            out.append(doc)
+    return out
 
-    for s in (old_skills - new_skills):
-        pipe.srem(PROJ_HANDYMEN_SKILL_INDEX.format(skill=s), email)
 
-    for s in new_skills:
-        pipe.sadd(PROJ_HANDYMEN_SKILL_INDEX.format(skill=s), email)
+def _handyman_script_call(doc: dict, *, merge: bool) -> tuple[list[str], list[str]]:
+    email = doc["email"]
+    keys = [PROJ_HANDYMAN_KEY.format(email=email), PROJ_HANDYMEN_INDEX]
+    args = [email, "1" if merge else "0", PROJ_HANDYMEN_SKILL_INDEX.format(skill=""), *encode_handyman_fields(doc)]
+    return keys, args
 
-    await pipe.execute()
+
+async def upsert_handyman_projection(doc: dict, *, merge: bool = False) -> tuple[dict | None, dict | None]:
+    """
+    Upserts a handyman projection in a single round trip. Returns the previous
+    and the stored document so callers can invalidate both footprints.
+    """
+    normalized = normalize_handyman(doc, partial=merge)
+    if not normalized:
+        return None, None
+
+    keys, args = _handyman_script_call(normalized, merge=merge)
+    old_flat, stored_flat = await _upsert_handyman_script(keys=keys, args=args)
+    return _decode_flat_hash(old_flat), _decode_flat_hash(stored_flat)
 
 
 async def delete_handyman_projection(email: str) -> dict | None:
     if not email:
         return None
 
-    old = await get_handyman_projection(email)
-    old_skills = set((old or {}).get("skills") or [])
+    old_flat = await _delete_handyman_script(
+        keys=[PROJ_HANDYMAN_KEY.format(email=email), PROJ_HANDYMEN_INDEX],
+        args=[email, PROJ_HANDYMEN_SKILL_INDEX.format(skill="")],
+    )
+    return _decode_flat_hash(old_flat)
+
+
+async def bulk_delete_handyman_projections(emails: list[str]) -> int:
+    emails = [e for e in emails or [] if e]
+    if not emails:
+        return 0
 
     pipe = redis_client.pipeline()
-    pipe.delete(PROJ_HANDYMAN_KEY.format(email=email))
-    pipe.srem(PROJ_HANDYMEN_INDEX, email)
-    for s in old_skills:
-        pipe.srem(PROJ_HANDYMEN_SKILL_INDEX.format(skill=s), email)
+    for email in emails:
+        await _delete_handyman_script(
+            keys=[PROJ_HANDYMAN_KEY.format(email=email), PROJ_HANDYMEN_INDEX],
+            args=[email, PROJ_HANDYMEN_SKILL_INDEX.format(skill="")],
+            client=pipe,
+        )
     await pipe.execute()
-    return old
+    return len(emails)
 
 
 async def list_projected_handymen_by_skill(skill: str) -> list[dict]:
@@ -225,20 +444,7 @@ async def list_projected_handymen_by_skill(skill: str) -> list[dict]:
     if not emails:
         return []
 
-    pipe = redis_client.pipeline()
-    for e in emails:
-        pipe.get(PROJ_HANDYMAN_KEY.format(email=e))
-    raws = await pipe.execute()
-
-    out: list[dict] = []
-    for raw in raws:
-        if not raw:
-            continue
-        try:
-            out.append(json.loads(raw))
-        except Exception:
-            continue
-    return out
+    return await get_handyman_projections(emails)
 
 
 async def handyman_projection_count() -> int:
@@ -248,11 +454,8 @@ async def handyman_projection_count() -> int:
         return 0
 
 
-async def upsert_availability_projection(*, email: str, slots: list[dict]) -> None:
-    if not email:
-        return
-
-    clean_slots: list[dict] = []
+def clean_slots(slots: list[dict] | None) -> list[dict]:
+    out: list[dict] = []
     for s in (slots or []):
         if not isinstance(s, dict):
             continue
@@ -267,20 +470,134 @@ async def upsert_availability_projection(*, email: str, slots: list[dict]) -> No
             continue
         if edt <= sdt:
             continue
-        clean_slots.append({"start": sdt.isoformat(), "end": edt.isoformat()})
+        out.append({"start": sdt.isoformat(), "end": edt.isoformat()})
+    return out
+
 
-    if not clean_slots:
+def clean_rules(rules: dict | None) -> dict | None:
+    try:
+        return normalize_rules(rules)
+    except Exception:
+        return None
+
+
+def clean_availability(doc: dict | None) -> dict:
+    doc = doc or {}
+    try:
+        version = int(doc.get("version") or 0) or None
+    except (TypeError, ValueError):
+        version = None
+    return {
+        "version": version,
+        "slots": clean_slots(doc.get("slots")),
+        "rules": clean_rules(doc.get("rules")),
+        "blocked": clean_slots(doc.get("blocked")),
+    }
+
+
+def _availability_payload(email: str, doc: dict) -> str | None:
+    """JSON stored for a handyman, or None when there is nothing to keep."""
+    if not doc["slots"] and not doc["rules"]:
+        return None
+    return json.dumps({"email": email, **doc, "updated_at": utc_now_iso()})
+
+
+AVAILABILITY_DELTA_KEYS = ("slots_added", "slots_removed", "blocked_added")
+
+
+def _merge_slots(slots: list[dict], added=None, removed=None) -> list[dict]:
+    drop = {(s["start"], s["end"]) for s in clean_slots(removed)}
+    out = [s for s in slots if (s["start"], s["end"]) not in drop]
+    seen = {(s["start"], s["end"]) for s in out}
+    for s in clean_slots(added):
+        if (s["start"], s["end"]) not in seen:
+            seen.add((s["start"], s["end"]))
+            out.append(s)
+    return sorted(out, key=lambda s: (s["start"], s["end"]))
+
+
+def apply_availability_delta(doc: dict, delta: dict) -> dict:
+    """Applies slots_added / slots_removed / blocked_added; idempotent."""
+    return {
+        **doc,
+        "slots": _merge_slots(doc["slots"], delta.get("slots_added"), delta.get("slots_removed")),
+        "blocked": _merge_slots(doc["blocked"], delta.get("blocked_added")),
+    }
+
+
+async def _write_availability_projection(email: str, doc: dict) -> None:
+    payload = _availability_payload(email, doc)
+    if payload is None:
         await delete_availability_projection(email)
         return
 
-    payload = {"email": email, "slots": clean_slots, "updated_at": utc_now_iso()}
-
     pipe = redis_client.pipeline()
-    pipe.set(PROJ_AVAIL_KEY.format(email=email), json.dumps(payload))
+    pipe.set(PROJ_AVAIL_KEY.format(email=email), payload)
     pipe.sadd(PROJ_AVAIL_INDEX, email)
     await pipe.execute()
 
 
+async def refresh_availability_projection(email: str) -> dict | None:
+    """Replaces the projection with a full snapshot from availability-service."""
+    live = await fetch_availability_http(email)
+    if live is None:
+        # Better no projection (live lookups) than one known to be behind.
+        await delete_availability_projection(email)
+        return None
+    await _write_availability_projection(email, live)
+    return live
+
+
+_KEEP = object()
+
+
+async def upsert_availability_projection(
+    *,
+    email: str,
+    slots: list[dict] | None | object = _KEEP,
+    rules: dict | None | object = _KEEP,
+    blocked: list[dict] | None | object = _KEEP,
+    delta: dict | None = None,
+    version: int | None = None,
+) -> None:
+    """
+    Applies an availability.updated payload. Parts left out keep their
+    projected value, so rule-only events do not wipe explicit slots.
+
+    Versioned payloads are applied only on top of version - 1 unless they
+    carry the whole document; older or duplicate versions are ignored and
+    a gap triggers a full snapshot fetch instead.
+
+    The read and the write are separate round trips, so two events for one
+    handyman handled at once can overwrite each other; the loser's version
+    then shows up as a gap on the next event, which refetches the snapshot.
+    """
+    if not email:
+        return
+
+    given = {
+        k: v for k, v in (("slots", slots), ("rules", rules), ("blocked", blocked)) if v is not _KEEP
+    }
+    complete = len(given) == 3 and not delta
+
+    current: dict = {}
+    if not complete or version is not None:
+        current = await get_availability_projection(email) or {}
+
+    if version is not None:
+        stored = current.get("version") or 0
+        if version <= stored:
+            return
+        if not complete and version != stored + 1:
+            await refresh_availability_projection(email)
+            return
+
+    doc = clean_availability({**current, **given, "version": version})
+    if delta:
+        doc = apply_availability_delta(doc, delta)
+    await _write_availability_projection(email, doc)
+
+
 async def delete_availability_projection(email: str) -> None:
     if not email:
         return
@@ -290,20 +607,60 @@ async def delete_availability_projection(email: str) -> None:
     await pipe.execute()
 
 
-async def get_availability_slots(email: str) -> list[dict] | None:
-    if not email:
-        return None
-    raw = await redis_client.get(PROJ_AVAIL_KEY.format(email=email))
+def _decode_availability_projection(raw: str | None) -> dict | None:
     if not raw:
         return None
     try:
         obj = json.loads(raw)
-        return obj.get("slots") or []
     except Exception:
         return None
+    return {
+        "version": obj.get("version"),
+        "slots": obj.get("slots") or [],
+        "rules": obj.get("rules"),
+        "blocked": obj.get("blocked") or [],
+    }
 
 
-def projected_has_overlap(slots: list[dict], desired_start: datetime, desired_end: datetime) -> bool:
+async def get_availability_projection(email: str) -> dict | None:
+    if not email:
+        return None
+    return _decode_availability_projection(await redis_client.get(PROJ_AVAIL_KEY.format(email=email)))
+
+
+async def get_availability_projections(emails: list[str]) -> list[dict | None]:
+    """Projected availability documents in the order of emails, read with one MGET."""
+    if not emails:
+        return []
+    raws = await redis_client.mget([PROJ_AVAIL_KEY.format(email=e) for e in emails])
+    return [_decode_availability_projection(raw) for raw in raws]
+
+
+def effective_slots(doc: dict, window: tuple[datetime, datetime] | None = None) -> list[dict]:
+    """
+    Explicit slots plus the rule occurrences inside window, minus blocked
+    windows. Rules are only expanded when a window is given.
+    """
+    out = list(doc.get("slots") or [])
+    if not doc.get("rules") or window is None:
+        return out
+
+    ws, we = _as_utc(window[0]), _as_utc(window[1])
+    occurrences = expand_rules(doc["rules"], ws, we)
+    blocked = []
+    for b in doc.get("blocked") or []:
+        try:
+            blocked.append((parse_dt(b["start"]), parse_dt(b["end"])))
+        except Exception:
+            continue
+
+    for start, end in subtract_intervals(occurrences, blocked):
+        out.append({"start": start.isoformat(), "end": end.isoformat()})
+    return out
+
+
+def projected_contains(slots: list[dict], desired_start: datetime, desired_end: datetime) -> bool:
+    """True when one slot covers the whole window, the rule booking requests are checked with."""
     ds = _as_utc(desired_start)
     de = _as_utc(desired_end)
 
@@ -317,7 +674,7 @@ def projected_has_overlap(slots: list[dict], desired_start: datetime, desired_en
         except Exception:
             continue
 
-        if overlaps(ss, ee, ds, de):
+        if fully_contains(ss, ee, ds, de):
             return True
 
     return False
@@ -334,9 +691,10 @@ async def projections_have_any_availability() -> bool:
     return (await availability_projection_count()) > 0
 
 
-async def fetch_handymen_http() -> list[dict]:
+async def fetch_handymen_http(*, limit: int | None = None, offset: int = 0) -> list[dict]:
+    params = {"limit": limit, "offset": offset} if limit else None
     async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.get(f"{HANDYMAN_SERVICE_URL}/handymen")
+        r = await client.get(f"{HANDYMAN_SERVICE_URL}/handymen", params=params)
         r.raise_for_status()
         data = r.json()
 
@@ -344,13 +702,13 @@ async def fetch_handymen_http() -> list[dict]:
     for h in data or []:
         if not isinstance(h, dict):
             continue
-        normalized = _normalize_handyman(h)
+        normalized = normalize_handyman(h)
         if normalized.get("email"):
             out.append(normalized)
     return out
 
 
-async def fetch_availability_http(email: str) -> list[dict] | None:
+async def fetch_availability_http(email: str) -> dict | None:
     if not email:
         return None
 
@@ -362,59 +720,127 @@ async def fetch_availability_http(email: str) -> list[dict] | None:
     except Exception:
         return None
 
-    slots = data.get("slots") or []
-    clean: list[dict] = []
-    for s in slots:
-        if not isinstance(s, dict):
-            continue
-        start = s.get("start")
-        end = s.get("end")
-        if not start or not end:
-            continue
-        try:
-            sdt = parse_dt(start)
-            edt = parse_dt(end)
-        except Exception:
-            continue
-        if edt <= sdt:
-            continue
-        clean.append({"start": sdt.isoformat(), "end": edt.isoformat()})
+    return clean_availability(data)
 
-    return clean
 
+async def check_availability_http(checks: list[tuple[str, datetime, datetime]]) -> list[bool] | None:
+    """
+    Asks availability-service about many (email, start, end) windows in one
+    POST /availability/check; None when the call fails.
+    """
+    if not checks:
+        return []
 
-async def get_effective_availability_slots(email: str) -> tuple[list[dict] | None, str]:
-    projected = await get_availability_slots(email)
-    if projected is not None:
-        return projected, "projection"
+    payload = {
+        "checks": [
+            {"email": email, "desired_start": _as_utc(ds).isoformat(), "desired_end": _as_utc(de).isoformat()}
+            for email, ds, de in checks
+        ]
+    }
+    try:
+        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
+            r = await client.post(f"{AVAILABILITY_SERVICE_URL}/availability/check", json=payload)
+            r.raise_for_status()
+            available = r.json().get("available")
+    except Exception:
+        return None
 
-    live = await fetch_availability_http(email)
-    if live is None:
-        return None, "missing"
+    if not isinstance(available, list) or len(available) != len(checks):
+        return None
+    return [bool(a) for a in available]
+
+
+async def resolve_availability(
+    emails: list[str], desired_start: datetime, desired_end: datetime
+) -> list[tuple[bool | None, str]]:
+    """
+    (available, source) per email for the desired window. Projections are
+    read with one MGET; every handyman without one is checked live in a
+    single bulk call. Both paths require one slot (or rule occurrence) to
+    contain the whole window. available is None when neither source answered.
+    """
+    window = (desired_start, desired_end)
+    out: list[tuple[bool | None, str]] = []
+    cold: list[int] = []
+    for i, doc in enumerate(await get_availability_projections(emails)):
+        if doc is None:
+            out.append((None, "missing"))
+            cold.append(i)
+            continue
+        ok = projected_contains(effective_slots(doc, window), desired_start, desired_end)
+        out.append((ok, "projection"))
+
+    if cold:
+        live = await check_availability_http([(emails[i], desired_start, desired_end) for i in cold])
+        if live is not None:
+            for i, ok in zip(cold, live):
+                out[i] = (ok, "live")
+    return out
 
-    await upsert_availability_projection(email=email, slots=live)
-    return live, "live"
 
+async def iter_availability_export_http(*, batch: int = 500):
+    """
+    Streams GET /availability/export (NDJSON) and yields cleaned items in
+    lists of up to batch, so a full resync never holds every handyman's
+    availability in memory.
+    """
+    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
+        async with client.stream(
+            "GET",
+            f"{AVAILABILITY_SERVICE_URL}/availability/export",
+            params={"batch": batch},
+        ) as r:
+            r.raise_for_status()
+            items: list[dict] = []
+            async for line in r.aiter_lines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if isinstance(item, dict) and item.get("email"):
+                    items.append({"email": item["email"], **clean_availability(item)})
+                if len(items) >= batch:
+                    yield items
+                    items = []
+            if items:
+                yield items
+
+
+async def bulk_upsert_handyman_projections(docs: list[dict]) -> int:
+    """
+    Writes a page of handyman projections as one pipeline of upsert script
+    calls, so the whole page costs a single round trip.
+    """
+    normalized = [n for n in (normalize_handyman(d) for d in docs or []) if n.get("email")]
+    if not normalized:
+        return 0
 
-async def seed_handyman_projection_if_empty() -> dict:
-    existing = await handyman_projection_count()
-    if existing > 0:
-        return {"seeded": False, "reason": "already_present", "count": existing}
+    pipe = redis_client.pipeline()
+    for doc in normalized:
+        keys, args = _handyman_script_call(doc, merge=False)
+        await _upsert_handyman_script(keys=keys, args=args, client=pipe)
+    await pipe.execute()
+    return len(normalized)
 
-    try:
-        handymen = await fetch_handymen_http()
-    except Exception as e:
-        return {"seeded": False, "reason": f"fetch_failed: {type(e).__name__}: {e}", "count": 0}
 
-    ok = 0
-    for h in handymen or []:
-        try:
-            await upsert_handyman_projection(h)
-            ok += 1
-        except Exception:
+async def bulk_upsert_availability_projections(items: list[dict]) -> int:
+    pipe = redis_client.pipeline()
+    written = 0
+    for item in items or []:
+        email = item.get("email")
+        if not email:
             continue
+        payload = _availability_payload(email, clean_availability(item))
+        if payload is not None:
+            pipe.set(PROJ_AVAIL_KEY.format(email=email), payload)
+            pipe.sadd(PROJ_AVAIL_INDEX, email)
+        else:
+            pipe.delete(PROJ_AVAIL_KEY.format(email=email))
+            pipe.srem(PROJ_AVAIL_INDEX, email)
+        written += 1
 
-    return {"seeded": True, "reason": "bootstrapped", "count": ok}
+    if written:
+        await pipe.execute()
+    return written
 
 
 async def get_live_handymen_for_skill(skill: str) -> list[dict]:
@@ -429,10 +855,11 @@ async def get_live_handymen_for_skill(skill: str) -> list[dict]:
         skills = [norm(s) for s in (h.get("skills") or [])]
         if skill in skills:
             matched.append(h)
-            try:
-                await upsert_handyman_projection(h)
-            except Exception:
-                pass
+
+    try:
+        await bulk_upsert_handyman_projections(matched)
+    except Exception:
+        pass
 
     return matched
 
@@ -454,19 +881,91 @@ async def get_cached_result(key: str):
     return await redis_client.get(key)
 
 
-async def set_cache_with_index(
-    *,
-    cache_key_str: str,
-    value: str,
-    ttl_seconds: int,
-    mode: str,
-    skill: str,
-    b_lat: int,
-    b_lon: int,
-):
-    set_key = bucket_set_key(mode, skill, b_lat, b_lon)
-    pipe = redis_client.pipeline()
-    pipe.set(cache_key_str, value, ex=ttl_seconds)
-    pipe.sadd(set_key, cache_key_str)
-    pipe.expire(set_key, ttl_seconds + 30)
-    await pipe.execute()
\ No newline at end of file
+def result_ttl(results: list[dict], degraded: bool) -> int:
+    if not results:
+        return NEGATIVE_CACHE_TTL_SECONDS
+    return DEGRADED_CACHE_TTL_SECONDS if degraded else CACHE_TTL_SECONDS
+
+
+def encode_cached_result(results: list[dict], ttl_seconds: int, now: float | None = None) -> str:
+    fresh_until = (now if now is not None else time.time()) + ttl_seconds
+    return json.dumps({"results": results, "fresh_until": fresh_until})
+
+
+def decode_cached_result(raw: str | None, now: float | None = None) -> tuple[list[dict], bool] | None:
+    """
+    Returns (results, stale) for a cache entry, or None when there is no
+    usable entry. Entries stay in Redis for CACHE_STALE_SECONDS past their
+    freshness window so they can be served while a refresh runs.
+    """
+    if not raw:
+        return None
+    try:
+        obj = json.loads(raw)
+    except Exception:
+        return None
+
+    if not isinstance(obj, dict) or not isinstance(obj.get("results"), list):
+        return None
+
+    current = now if now is not None else time.time()
+    stale = current >= float(obj.get("fresh_until") or 0)
+    return obj["results"], stale
+
+
+def jitter_ttl(ttl_seconds: int) -> int:
+    spread = int(ttl_seconds * CACHE_TTL_JITTER_RATIO)
+    if spread <= 0:
+        return ttl_seconds
+    return ttl_seconds + random.randint(0, spread)
+
+
+async def set_cached_result(key: str, results: list[dict], ttl_seconds: int) -> None:
+    ttl_seconds = jitter_ttl(ttl_seconds)
+    await redis_client.set(
+        key,
+        encode_cached_result(results, ttl_seconds),
+        ex=ttl_seconds + CACHE_STALE_SECONDS,
+    )
+
+
+async def try_acquire_refresh(key: str) -> bool:
+    return bool(await redis_client.set(f"matchrefresh:{key}", "1", nx=True, ex=REFRESH_LOCK_SECONDS))
+
+
+# Deletes the lock only while it still holds the caller's token, so a
+# replica whose lock timed out cannot release one another replica now holds.
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_release_lock_script = redis_client.register_script(RELEASE_LOCK_LUA)
+
+
+async def try_acquire_compute_lock(key: str) -> str | None:
+    """Returns the lock token when acquired, None when another replica holds it."""
+    token = secrets.token_hex(16)
+    if await redis_client.set(f"matchlock:{key}", token, nx=True, ex=COMPUTE_LOCK_SECONDS):
+        return token
+    return None
+
+
+async def release_compute_lock(key: str, token: str) -> None:
+    await _release_lock_script(keys=[f"matchlock:{key}"], args=[token])
+
+
+async def wait_for_cached_result(key: str, timeout_seconds: float = COMPUTE_WAIT_SECONDS) -> list[dict] | None:
+    """
+    Polls the cache while another replica holds the compute lock for key.
+    Returns None if nothing shows up within timeout_seconds.
+    """
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        await asyncio.sleep(COMPUTE_POLL_SECONDS)
+        cached = decode_cached_result(await get_cached_result(key))
+        if cached is not None:
+            return cached[0]
+    return None
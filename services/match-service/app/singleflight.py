@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller starts the
+    work, later callers await the same task instead of repeating it.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+
+        # shield so one cancelled request does not cancel the work for the others
+        return await asyncio.shield(task)
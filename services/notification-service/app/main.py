@@ -5,9 +5,12 @@ import json
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from sqlalchemy.schema import CreateIndex
 
 from .consumer import consume_forever
 from .db import Base, engine
+from .models import notification_retention_index
+from .retention import retention_loop
 from .routes import router
 
 
@@ -17,8 +20,11 @@ async def lifespan(app: FastAPI):
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all never adds indexes to a table that already exists.
+        await conn.execute(CreateIndex(notification_retention_index, if_not_exists=True))
 
     consumer_task = asyncio.create_task(consume_forever(stop_event))
+    retention_task = asyncio.create_task(retention_loop(stop_event))
     print(json.dumps({"service": "notification-service", "event": "startup_complete"}))
 
     try:
@@ -26,11 +32,12 @@ async def lifespan(app: FastAPI):
     finally:
         stop_event.set()
 
-        consumer_task.cancel()
-        try:
-            await consumer_task
-        except asyncio.CancelledError:
-            pass
+        for task in (consumer_task, retention_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
         await engine.dispose()
 
 
@@ -41,6 +41,37 @@ class Notification(Base):
     )
 
 
+# Matches the retention scan in move_stale_notifications_batch: a notification
+# ages from when it was last touched, not from when it was created.
+notification_retention_index = Index(
+    "ix_notifications_status_retained_at",
+    Notification.status,
+    func.coalesce(Notification.archived_at, Notification.read_at, Notification.created_at),
+)
+
+
+class NotificationArchive(Base):
+    __tablename__ = "notifications_archive"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    user_email: Mapped[str] = mapped_column(String(320), index=True, nullable=False)
+    event_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    type: Mapped[str] = mapped_column(String(100), nullable=False)
+    category: Mapped[str] = mapped_column(String(50), nullable=False)
+    priority: Mapped[str] = mapped_column(String(20), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_type: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    entity_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    action_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    read_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    archived_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    moved_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
 class NotificationPreference(Base):
     __tablename__ = "notification_preferences"
 
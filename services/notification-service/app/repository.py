@@ -3,11 +3,32 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Sequence
 
-from sqlalchemy import func, select, update
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .models import Notification, NotificationPreference, PushDevice
+from .models import Notification, NotificationArchive, NotificationPreference, PushDevice
+
+ARCHIVABLE_STATUSES = ("read", "archived")
+
+_ARCHIVE_COLUMNS = [
+    "id",
+    "user_email",
+    "event_id",
+    "type",
+    "category",
+    "priority",
+    "title",
+    "body",
+    "status",
+    "entity_type",
+    "entity_id",
+    "action_url",
+    "payload",
+    "created_at",
+    "read_at",
+    "archived_at",
+]
 
 
 async def create_notification_if_absent(
@@ -118,6 +139,43 @@ async def mark_all_read(db: AsyncSession, *, user_email: str) -> int:
     return int(result.rowcount or 0)
 
 
+async def set_notifications_state(
+    db: AsyncSession,
+    *,
+    user_email: str,
+    notification_ids: Sequence[str],
+    state: str,
+) -> list[str]:
+    """Returns the ids that actually changed: owned by the user and not already in `state`."""
+    ids = list(dict.fromkeys(notification_ids))
+    if not ids:
+        return []
+
+    now = datetime.now(timezone.utc)
+    values = {"status": state}
+    if state == "read":
+        values["read_at"] = now
+    elif state == "archived":
+        values["archived_at"] = now
+    else:
+        raise ValueError(f"Unsupported notification state: {state!r}")
+
+    stmt = (
+        update(Notification)
+        .where(
+            Notification.user_email == user_email,
+            Notification.id.in_(ids),
+            Notification.status != state,
+        )
+        .values(**values)
+        .returning(Notification.id)
+        .execution_options(synchronize_session=False)
+    )
+    updated = list((await db.execute(stmt)).scalars().all())
+    await db.commit()
+    return updated
+
+
 async def archive_notification(db: AsyncSession, *, user_email: str, notification_id: str) -> bool:
     stmt = (
         update(Notification)
@@ -195,3 +253,41 @@ async def deactivate_push_device(db: AsyncSession, *, user_email: str, device_id
     result = await db.execute(stmt)
     await db.commit()
     return (result.rowcount or 0) > 0
+
+
+async def move_stale_notifications_batch(
+    db: AsyncSession,
+    *,
+    older_than: datetime,
+    batch_size: int,
+) -> int:
+    # Age counts from the last state change, so a notification read today is
+    # kept for the full retention period however old it is.
+    retained_at = func.coalesce(Notification.archived_at, Notification.read_at, Notification.created_at)
+    ids_stmt = (
+        select(Notification.id)
+        .where(
+            Notification.status.in_(ARCHIVABLE_STATUSES),
+            retained_at < older_than,
+        )
+        .order_by(retained_at.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    ids = list((await db.execute(ids_stmt)).scalars().all())
+    if not ids:
+        await db.rollback()
+        return 0
+
+    copy_stmt = (
+        insert(NotificationArchive)
+        .from_select(
+            _ARCHIVE_COLUMNS,
+            select(*[getattr(Notification, c) for c in _ARCHIVE_COLUMNS]).where(Notification.id.in_(ids)),
+        )
+        .on_conflict_do_nothing(index_elements=["id"])
+    )
+    await db.execute(copy_stmt)
+    result = await db.execute(delete(Notification).where(Notification.id.in_(ids)))
+    await db.commit()
+    return int(result.rowcount or 0)
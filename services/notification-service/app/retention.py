@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from .db import SessionLocal
+from .repository import move_stale_notifications_batch
+
+RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS") or "30")
+RETENTION_BATCH_SIZE = int(os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE") or "500")
+RETENTION_MAX_BATCHES = int(os.getenv("NOTIFICATION_RETENTION_MAX_BATCHES") or "200")
+RETENTION_INTERVAL_SECONDS = float(os.getenv("NOTIFICATION_RETENTION_INTERVAL_SECONDS") or "3600")
+RETENTION_BATCH_PAUSE_SECONDS = 0.05
+
+last_run: dict | None = None
+
+
+async def run_retention_once(now: datetime | None = None) -> dict:
+    """
+    Moves read/archived notifications untouched for RETENTION_DAYS into
+    notifications_archive, one short transaction per batch.
+    """
+    started = now or datetime.now(timezone.utc)
+    cutoff = started - timedelta(days=RETENTION_DAYS)
+
+    moved = 0
+    batches = 0
+    while batches < RETENTION_MAX_BATCHES:
+        async with SessionLocal() as db:
+            n = await move_stale_notifications_batch(
+                db,
+                older_than=cutoff,
+                batch_size=RETENTION_BATCH_SIZE,
+            )
+        if n <= 0:
+            break
+
+        moved += n
+        batches += 1
+        if n < RETENTION_BATCH_SIZE:
+            break
+        await asyncio.sleep(RETENTION_BATCH_PAUSE_SECONDS)
+
+    return {
+        "cutoff": cutoff.isoformat(),
+        "moved": moved,
+        "batches": batches,
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+async def retention_loop(stop_event: asyncio.Event) -> None:
+    global last_run
+
+    while not stop_event.is_set():
+        try:
+            last_run = await run_retention_once()
+            print(json.dumps({"service": "notification-service", "event": "retention_run", **last_run}))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            print(json.dumps({"service": "notification-service", "event": "retention_error", "error": str(exc)}))
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=RETENTION_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            continue
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from . import retention
 from .auth import get_current_email
 from .db import get_db
 from .repository import (
@@ -16,11 +17,14 @@ from .repository import (
     list_notifications,
     mark_all_read,
     mark_read,
+    set_notifications_state,
     unread_count,
     update_preferences,
     upsert_push_device,
 )
 from .schemas import (
+    BulkNotificationStateRequest,
+    BulkNotificationStateResponse,
     MarkAllReadResponse,
     NotificationListResponse,
     NotificationPreferencesResponse,
@@ -37,7 +41,7 @@ router = APIRouter()
 
 @router.get("/health")
 async def health() -> dict:
-    return {"ok": True, "service": "notification-service"}
+    return {"ok": True, "service": "notification-service", "retention": retention.last_run}
 
 
 @router.get("/me/notifications", response_model=NotificationListResponse)
@@ -87,6 +91,32 @@ async def mark_my_notifications_read(
     return MarkAllReadResponse(updated=updated)
 
 
+@router.post("/me/notifications/bulk", response_model=BulkNotificationStateResponse)
+async def bulk_update_my_notifications(
+    payload: BulkNotificationStateRequest,
+    email: str = Depends(get_current_email),
+    db: AsyncSession = Depends(get_db),
+) -> BulkNotificationStateResponse:
+    updated_ids = await set_notifications_state(
+        db,
+        user_email=email,
+        notification_ids=payload.ids,
+        state=payload.state,
+    )
+    count = await unread_count(db, user_email=email)
+    if updated_ids:
+        await hub.publish(
+            email,
+            {
+                "type": "notifications.updated",
+                "ids": updated_ids,
+                "state": payload.state,
+                "unread_count": count,
+            },
+        )
+    return BulkNotificationStateResponse(updated=len(updated_ids), unread_count=count)
+
+
 @router.post("/me/notifications/{notification_id}/archive")
 async def archive_my_notification(
     notification_id: str,
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from shared.shared.schemas.notifications import (
+    BulkNotificationStateRequest,
+    BulkNotificationStateResponse,
     MarkAllReadResponse,
     NotificationItem,
     NotificationListResponse,
@@ -12,6 +14,8 @@ from shared.shared.schemas.notifications import (
 )
 
 __all__ = [
+    "BulkNotificationStateRequest",
+    "BulkNotificationStateResponse",
     "MarkAllReadResponse",
     "NotificationItem",
     "NotificationListResponse",
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from datetime import datetime
+import heapq
+from datetime import datetime, timedelta
 
 
 def overlaps(
@@ -16,3 +17,118 @@ def fully_contains(
     inner_end: datetime,
 ) -> bool:
     return outer_start <= inner_start and outer_end >= inner_end
+
+
+def subtract_intervals(
+    intervals: list[tuple[datetime, datetime]],
+    cuts: list[tuple[datetime, datetime]],
+) -> list[tuple[datetime, datetime]]:
+    """Removes every cut from every interval, keeping the uncovered pieces."""
+    out: list[tuple[datetime, datetime]] = []
+    for start, end in intervals:
+        pieces = [(start, end)]
+        for cs, ce in cuts:
+            next_pieces = []
+            for ps, pe in pieces:
+                if not overlaps(ps, pe, cs, ce):
+                    next_pieces.append((ps, pe))
+                    continue
+                if ps < cs:
+                    next_pieces.append((ps, cs))
+                if pe > ce:
+                    next_pieces.append((ce, pe))
+            pieces = next_pieces
+        out.extend(pieces)
+    return out
+
+
+def merge_intervals(
+    intervals: list[tuple[datetime, datetime]],
+) -> list[tuple[datetime, datetime]]:
+    """Sorted, non-overlapping union of the given intervals."""
+    out: list[tuple[datetime, datetime]] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if out and start <= out[-1][1]:
+            out[-1] = (out[-1][0], max(out[-1][1], end))
+        else:
+            out.append((start, end))
+    return out
+
+
+def free_windows(
+    intervals: list[tuple[datetime, datetime]],
+    busy: list[tuple[datetime, datetime]],
+    duration: timedelta,
+    limit: int,
+    *,
+    not_before: datetime | None = None,
+) -> list[tuple[datetime, datetime]]:
+    """
+    The first `limit` windows of `duration` that fit inside a single interval
+    without touching anything busy, back to back within each free stretch.
+
+    Intervals are swept in start order against the merged busy list; since
+    starts only grow, busy entries that end before the current interval are
+    never looked at again. Each free stretch feeds a lazy run of windows into
+    a heap, and windows starting before the next interval are final, so the
+    sweep stops as soon as `limit` windows are known.
+    """
+    if duration <= timedelta(0) or limit <= 0:
+        return []
+
+    cuts = merge_intervals(busy)
+
+    def free_pieces(start, end, j):
+        while j < len(cuts) and cuts[j][0] < end:
+            cs, ce = cuts[j]
+            if cs > start:
+                yield start, min(cs, end)
+            start = max(start, ce)
+            j += 1
+        if start < end:
+            yield start, end
+
+    def tiles(start, end):
+        while start + duration <= end:
+            yield start, start + duration
+            start += duration
+
+    out: list[tuple[datetime, datetime]] = []
+    heap: list = []
+    seq = 0
+
+    def emit_before(bound) -> bool:
+        while heap and (bound is None or heap[0][0] < bound):
+            ws, we, n, run = heapq.heappop(heap)
+            if not out or out[-1] != (ws, we):
+                out.append((ws, we))
+                if len(out) == limit:
+                    return True
+            following = next(run, None)
+            if following is not None:
+                heapq.heappush(heap, (following[0], following[1], n, run))
+        return False
+
+    j = 0
+    for start, end in sorted(intervals):
+        if not_before is not None:
+            start = max(start, not_before)
+        if end - start < duration:
+            continue
+        # Later intervals start here or later, so nothing they add can come
+        # before what is already queued ahead of this start.
+        if emit_before(start):
+            return out
+        while j < len(cuts) and cuts[j][1] <= start:
+            j += 1
+        for ps, pe in free_pieces(start, end, j):
+            run = tiles(ps, pe)
+            first = next(run, None)
+            if first is not None:
+                heapq.heappush(heap, (first[0], first[1], seq, run))
+                seq += 1
+
+    emit_before(None)
+    return out
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .intervals import fully_contains, overlaps
+
+# Rules never expand further than this past the window start, whatever the
+# caller asks for.
+MAX_EXPANSION_DAYS = 62
+
+
+def _parse_hhmm(value: str) -> time | None:
+    """Parses "HH:MM"; "24:00" is accepted as an end-of-day marker (returned as None)."""
+    hh, mm = value.strip().split(":")
+    h, m = int(hh), int(mm)
+    if h == 24 and m == 0:
+        return None
+    return time(h, m)
+
+
+def normalize_rules(doc: dict | None) -> dict | None:
+    """
+    Validates and canonicalizes a recurrence document:
+
+        {"timezone": "Europe/Rome",
+         "weekly": [{"weekday": 0, "start": "09:00", "end": "17:00"}, ...],
+         "exceptions": ["2026-04-06", ...],
+         "valid_from": "2026-03-01", "valid_until": null}
+
+    weekday follows datetime.weekday() (Monday == 0); exceptions are local
+    dates on which no rule applies. Returns None for an empty document and
+    raises ValueError on anything malformed.
+    """
+    if not doc:
+        return None
+
+    tz_name = doc.get("timezone") or "UTC"
+    try:
+        ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {tz_name}")
+
+    weekly: list[dict] = []
+    for rule in doc.get("weekly") or []:
+        weekday = int(rule["weekday"])
+        if not 0 <= weekday <= 6:
+            raise ValueError("weekday must be between 0 and 6")
+        start = _parse_hhmm(rule["start"])
+        end = _parse_hhmm(rule["end"])
+        if start is None or (end is not None and end <= start):
+            raise ValueError("Rule end must be after start")
+        weekly.append(
+            {
+                "weekday": weekday,
+                "start": start.strftime("%H:%M"),
+                "end": "24:00" if end is None else end.strftime("%H:%M"),
+            }
+        )
+
+    if not weekly:
+        return None
+
+    exceptions = sorted({date.fromisoformat(d).isoformat() for d in doc.get("exceptions") or []})
+    valid_from = doc.get("valid_from")
+    valid_until = doc.get("valid_until")
+
+    return {
+        "timezone": tz_name,
+        "weekly": sorted(weekly, key=lambda r: (r["weekday"], r["start"], r["end"])),
+        "exceptions": exceptions,
+        "valid_from": date.fromisoformat(valid_from).isoformat() if valid_from else None,
+        "valid_until": date.fromisoformat(valid_until).isoformat() if valid_until else None,
+    }
+
+
+def expand_rules(rules: dict | None, window_start: datetime, window_end: datetime) -> list[tuple[datetime, datetime]]:
+    """
+    Materializes the rule occurrences overlapping [window_start, window_end),
+    in UTC and start order. The window is clamped to MAX_EXPANSION_DAYS.
+    """
+    if not rules or window_end <= window_start:
+        return []
+
+    window_end = min(window_end, window_start + timedelta(days=MAX_EXPANSION_DAYS))
+    tz = ZoneInfo(rules.get("timezone") or "UTC")
+    exceptions = set(rules.get("exceptions") or [])
+    valid_from = date.fromisoformat(rules["valid_from"]) if rules.get("valid_from") else None
+    valid_until = date.fromisoformat(rules["valid_until"]) if rules.get("valid_until") else None
+
+    by_weekday: dict[int, list[dict]] = {}
+    for rule in rules.get("weekly") or []:
+        by_weekday.setdefault(int(rule["weekday"]), []).append(rule)
+
+    # One extra local day on each side covers timezone offsets.
+    day = window_start.astimezone(tz).date() - timedelta(days=1)
+    last = window_end.astimezone(tz).date() + timedelta(days=1)
+
+    out: list[tuple[datetime, datetime]] = []
+    while day <= last:
+        if day.isoformat() not in exceptions \
+                and (valid_from is None or day >= valid_from) \
+                and (valid_until is None or day <= valid_until):
+            for rule in by_weekday.get(day.weekday(), ()):
+                start = datetime.combine(day, _parse_hhmm(rule["start"]), tz)
+                end_t = _parse_hhmm(rule["end"])
+                if end_t is None:
+                    end = datetime.combine(day + timedelta(days=1), time(0), tz)
+                else:
+                    end = datetime.combine(day, end_t, tz)
+                start, end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+                if overlaps(start, end, window_start, window_end):
+                    out.append((start, end))
+        day += timedelta(days=1)
+
+    out.sort()
+    return out
+
+
+def rules_contain(
+    rules: dict | None,
+    blocked: list[tuple[datetime, datetime]],
+    desired_start: datetime,
+    desired_end: datetime,
+) -> bool:
+    """True when one rule occurrence covers the window and nothing blocked overlaps it."""
+    if desired_end <= desired_start:
+        return False
+    if any(overlaps(bs, be, desired_start, desired_end) for bs, be in blocked or []):
+        return False
+    return any(
+        fully_contains(ss, ee, desired_start, desired_end)
+        for ss, ee in expand_rules(rules, desired_start, desired_end)
+    )
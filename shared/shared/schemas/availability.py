@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 
 class AvailabilitySlot(BaseModel):
@@ -16,3 +16,29 @@ class SetAvailability(BaseModel):
 class OverlapRequest(BaseModel):
     desired_start: str = Field(..., min_length=1)
     desired_end: str = Field(..., min_length=1)
+
+
+class AvailabilityCheck(OverlapRequest):
+    email: str = Field(..., min_length=1)
+
+
+class BulkAvailabilityCheck(BaseModel):
+    checks: List[AvailabilityCheck] = Field(default_factory=list, max_length=1000)
+
+
+class WeeklyRule(BaseModel):
+    weekday: int = Field(..., ge=0, le=6)
+    start: str = Field(..., min_length=4, max_length=5)
+    end: str = Field(..., min_length=4, max_length=5)
+
+
+class AvailabilityRules(BaseModel):
+    timezone: str = "UTC"
+    weekly: List[WeeklyRule] = Field(default_factory=list)
+    exceptions: List[str] = Field(default_factory=list)
+    valid_from: Optional[str] = None
+    valid_until: Optional[str] = None
+
+
+class ExtendReservation(BaseModel):
+    seconds: int = Field(..., ge=1, le=3600)
@@ -9,6 +9,10 @@ class CreateBooking(BaseModel):
     desired_start: datetime
     desired_end: datetime
     job_description: Optional[str] = None
+    # How long availability should hold the slot before the booking expires;
+    # left out, the availability service picks a default per category.
+    hold_seconds: Optional[int] = Field(None, ge=30, le=3600)
+    category: Optional[str] = None
 
 
 class BookingResponse(BaseModel):
@@ -69,3 +73,8 @@ class UpdateBookingAdmin(BaseModel):
     failure_reason: Optional[str] = None
     cancellation_reason: Optional[str] = None
     job_description: Optional[str] = None
+
+
+class BookingListResponse(BaseModel):
+    items: list[BookingResponse]
+    next_cursor: Optional[str] = None
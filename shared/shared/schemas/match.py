@@ -17,16 +17,26 @@ class MatchResult(BaseModel):
     latitude: float
     longitude: float
     distance_km: float
-    years_experience: int
+    years_experience: Optional[int] = None
+    avg_rating: Optional[float] = None
+    rating_count: Optional[int] = None
+    score: Optional[float] = None
     availability_unknown: bool = False
 
 
+class MatchPage(BaseModel):
+    items: list[MatchResult]
+    next_cursor: Optional[str] = None
+
+
 class MatchLogResponse(BaseModel):
     id: int
     user_latitude: float
     user_longitude: float
     skill: str
     job_description: Optional[str] = None
+    cache_hit: bool = False
+    result_count: Optional[int] = None
 
 
 class UpdateMatchLog(BaseModel):
@@ -37,6 +37,16 @@ class MarkAllReadResponse(BaseModel):
     updated: int = Field(..., ge=0)
 
 
+class BulkNotificationStateRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1, max_length=500)
+    state: Literal["read", "archived"]
+
+
+class BulkNotificationStateResponse(BaseModel):
+    updated: int = Field(..., ge=0)
+    unread_count: int = Field(..., ge=0)
+
+
 class NotificationPreferencesResponse(BaseModel):
     booking_in_app_enabled: bool = True
     booking_push_enabled: bool = True
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from unittest.mock import AsyncMock, MagicMock
 
+import httpx
 import pytest
 import redis.asyncio as redis_async
 from fastapi import HTTPException
@@ -210,4 +211,99 @@ class TestCircuitBreaker:
         assert status["state"] == "OPEN"
         assert status["failures"] == 3
         assert status["opened_at_epoch"] == 100.0
-        assert status["open_for_seconds"] == 8.2
\ No newline at end of file
+        assert status["open_for_seconds"] == 8.2
+
+@pytest.fixture
+def gateway_clients_module(gateway_modules):
+    return load_service_app_module(
+        "gateway-service",
+        "clients",
+        package_name="gateway_service_test_app",
+    )
+
+
+def _mock_http(monkeypatch, clients_module, handler):
+    real_client = clients_module.httpx.AsyncClient
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(
+        clients_module.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=transport, **kwargs),
+    )
+
+
+@pytest.mark.unit
+class TestStreamWithBreaker:
+
+    @pytest.mark.asyncio
+    async def test_streams_body_and_records_success(self, gateway_clients_module, monkeypatch):
+        breaker = MagicMock()
+        breaker.allow_request = AsyncMock()
+        breaker.record_success = AsyncMock()
+        breaker.record_failure = AsyncMock()
+        _mock_http(monkeypatch, gateway_clients_module, lambda request: httpx.Response(200, content=b'{"email":"a"}\n'))
+
+        chunks = await gateway_clients_module._stream_with_breaker(breaker, "http://availability/export", {"batch": 1}, "req-1", None)
+
+        assert b"".join([c async for c in chunks]) == b'{"email":"a"}\n'
+        breaker.record_success.assert_awaited_once()
+        breaker.record_failure.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_is_raised_before_streaming(self, gateway_clients_module, monkeypatch):
+        breaker = MagicMock()
+        breaker.allow_request = AsyncMock()
+        breaker.record_success = AsyncMock()
+        breaker.record_failure = AsyncMock()
+        _mock_http(monkeypatch, gateway_clients_module, lambda request: httpx.Response(503, json={"detail": "down"}))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await gateway_clients_module._stream_with_breaker(breaker, "http://availability/export", None, None, None)
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.detail == {"detail": "down"}
+        breaker.record_failure.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_short_circuits(self, gateway_clients_module):
+        breaker = MagicMock()
+        breaker.allow_request = AsyncMock(side_effect=gateway_clients_module.CircuitBreakerOpen("open"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await gateway_clients_module._stream_with_breaker(breaker, "http://availability/export", None, None, None)
+
+        assert exc_info.value.status_code == 503
+
+
+@pytest.mark.unit
+class TestMatchAdminClients:
+
+    @pytest.mark.asyncio
+    async def test_drift_uses_admin_breaker_and_long_timeout(self, gateway_clients_module, monkeypatch):
+        call = AsyncMock(return_value={"in_sync": True})
+        monkeypatch.setattr(gateway_clients_module, "_call_with_breaker", call)
+
+        await gateway_clients_module.match_projection_drift(request_id="req-1")
+
+        args, kwargs = call.await_args
+        assert args[0] is gateway_clients_module.cb_match_admin
+        assert args[0] is not gateway_clients_module.cb_match
+        assert kwargs["timeout"] == gateway_clients_module.ADMIN_TIMEOUT
+
+    @pytest.mark.asyncio
+    async def test_timeout_is_passed_to_http_client(self, gateway_clients_module, monkeypatch):
+        breaker = MagicMock()
+        breaker.allow_request = AsyncMock()
+        breaker.record_success = AsyncMock()
+        seen = {}
+        real_client = gateway_clients_module.httpx.AsyncClient
+
+        def client(**kwargs):
+            seen["timeout"] = kwargs.get("timeout")
+            return real_client(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})), **kwargs)
+
+        monkeypatch.setattr(gateway_clients_module.httpx, "AsyncClient", client)
+
+        await gateway_clients_module._call_with_breaker(breaker, "GET", "http://match/drift", None, None, None, timeout=90.0)
+
+        assert seen["timeout"] == 90.0
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 
-from shared.shared.intervals import overlaps, fully_contains
+from shared.shared.intervals import overlaps, fully_contains, free_windows, merge_intervals, subtract_intervals
 
 
 @pytest.mark.unit
@@ -139,3 +139,88 @@ class TestFullyContains:
         
         too_late_end = outer_end + timedelta(minutes=1)
         assert fully_contains(outer_start, outer_end, outer_start, too_late_end) is False
+
+
+@pytest.mark.unit
+@pytest.mark.intervals
+class TestSubtractIntervals:
+
+    def test_subtract_splits_and_drops_covered_pieces(self):
+        base = datetime(2026, 3, 17, 9, 0, 0, tzinfo=timezone.utc)
+        day = (base, base + timedelta(hours=8))
+        cuts = [
+            (base + timedelta(hours=1), base + timedelta(hours=2)),
+            (base + timedelta(hours=7), base + timedelta(hours=9)),
+        ]
+
+        assert subtract_intervals([day], cuts) == [
+            (base, base + timedelta(hours=1)),
+            (base + timedelta(hours=2), base + timedelta(hours=7)),
+        ]
+        assert subtract_intervals([day], [day]) == []
+        assert subtract_intervals([day], []) == [day]
+
+
+@pytest.mark.unit
+@pytest.mark.intervals
+class TestFreeWindows:
+
+    base = datetime(2026, 3, 17, 9, 0, 0, tzinfo=timezone.utc)
+
+    def _at(self, hours: float) -> datetime:
+        return self.base + timedelta(hours=hours)
+
+    def test_merge_intervals_joins_overlapping_and_touching(self):
+        merged = merge_intervals([(self._at(3), self._at(4)), (self._at(0), self._at(1)), (self._at(1), self._at(2))])
+
+        assert merged == [(self._at(0), self._at(2)), (self._at(3), self._at(4))]
+
+    def test_windows_skip_busy_and_short_gaps(self):
+        day = (self._at(0), self._at(8))
+        busy = [(self._at(1), self._at(2)), (self._at(2.5), self._at(3)), (self._at(5), self._at(9))]
+
+        windows = free_windows([day], busy, timedelta(hours=1), 10)
+
+        assert windows == [
+            (self._at(0), self._at(1)),
+            (self._at(3), self._at(4)),
+            (self._at(4), self._at(5)),
+        ]
+
+    def test_windows_come_back_in_start_order_across_intervals(self):
+        long_slot = (self._at(0), self._at(6))
+        short_slot = (self._at(0.5), self._at(1.5))
+
+        windows = free_windows([long_slot, short_slot], [], timedelta(hours=1), 3)
+
+        assert windows == [
+            (self._at(0), self._at(1)),
+            (self._at(0.5), self._at(1.5)),
+            (self._at(1), self._at(2)),
+        ]
+
+    def test_not_before_and_limit(self):
+        windows = free_windows(
+            [(self._at(0), self._at(8))], [], timedelta(hours=2), 2, not_before=self._at(3)
+        )
+
+        assert windows == [(self._at(3), self._at(5)), (self._at(5), self._at(7))]
+        assert free_windows([(self._at(0), self._at(8))], [], timedelta(0), 5) == []
+
+    def test_duplicate_windows_are_reported_once(self):
+        slot = (self._at(0), self._at(2))
+
+        assert free_windows([slot, slot], [], timedelta(hours=2), 5) == [slot]
+
+    def test_later_interval_filling_a_gap_is_ordered(self):
+        long_slot = (self._at(0), self._at(10))
+        inner = (self._at(2), self._at(4))
+        busy = [(self._at(1), self._at(3))]
+
+        windows = free_windows([long_slot, inner], busy, timedelta(hours=1), 3)
+
+        assert windows == [
+            (self._at(0), self._at(1)),
+            (self._at(3), self._at(4)),
+            (self._at(4), self._at(5)),
+        ]
@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from shared.shared.recurrence import MAX_EXPANSION_DAYS, expand_rules, normalize_rules, rules_contain
+
+
+def _utc(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 3, day, hour, minute, tzinfo=timezone.utc)
+
+
+# 2026-03-16 is a Monday.
+WEEKDAYS_9_TO_17 = {
+    "timezone": "UTC",
+    "weekly": [{"weekday": d, "start": "09:00", "end": "17:00"} for d in range(5)],
+}
+
+
+@pytest.mark.unit
+class TestNormalizeRules:
+
+    def test_normalize_sorts_and_fills_defaults(self):
+        rules = normalize_rules(
+            {
+                "weekly": [
+                    {"weekday": 2, "start": "9:00", "end": "12:00"},
+                    {"weekday": 0, "start": "13:00", "end": "24:00"},
+                ],
+                "exceptions": ["2026-04-06", "2026-04-06", "2026-01-01"],
+            }
+        )
+
+        assert rules == {
+            "timezone": "UTC",
+            "weekly": [
+                {"weekday": 0, "start": "13:00", "end": "24:00"},
+                {"weekday": 2, "start": "09:00", "end": "12:00"},
+            ],
+            "exceptions": ["2026-01-01", "2026-04-06"],
+            "valid_from": None,
+            "valid_until": None,
+        }
+
+    def test_normalize_returns_none_without_weekly_rules(self):
+        assert normalize_rules(None) is None
+        assert normalize_rules({"timezone": "UTC", "weekly": []}) is None
+
+    @pytest.mark.parametrize(
+        "doc",
+        [
+            {"timezone": "Mars/Olympus", "weekly": [{"weekday": 0, "start": "09:00", "end": "10:00"}]},
+            {"weekly": [{"weekday": 7, "start": "09:00", "end": "10:00"}]},
+            {"weekly": [{"weekday": 0, "start": "10:00", "end": "09:00"}]},
+            {"weekly": [{"weekday": 0, "start": "24:00", "end": "24:00"}]},
+            {"weekly": [{"weekday": 0, "start": "09:00", "end": "10:00"}], "exceptions": ["not-a-date"]},
+        ],
+    )
+    def test_normalize_rejects_malformed_documents(self, doc):
+        with pytest.raises(ValueError):
+            normalize_rules(doc)
+
+
+@pytest.mark.unit
+class TestExpandRules:
+
+    def test_expand_only_materializes_occurrences_in_window(self):
+        rules = normalize_rules(WEEKDAYS_9_TO_17)
+
+        out = expand_rules(rules, _utc(16, 12), _utc(18, 8))
+
+        assert out == [(_utc(16, 9), _utc(16, 17)), (_utc(17, 9), _utc(17, 17))]
+
+    def test_expand_skips_exceptions_and_validity_bounds(self):
+        rules = normalize_rules(
+            {**WEEKDAYS_9_TO_17, "exceptions": ["2026-03-17"], "valid_until": "2026-03-18"}
+        )
+
+        out = expand_rules(rules, _utc(16, 0), _utc(21, 0))
+
+        assert [s.day for s, _ in out] == [16, 18]
+
+    def test_expand_converts_local_times_to_utc(self):
+        # Rome is UTC+1 in March before the DST switch on the 29th.
+        rules = normalize_rules(
+            {"timezone": "Europe/Rome", "weekly": [{"weekday": 1, "start": "09:00", "end": "24:00"}]}
+        )
+
+        out = expand_rules(rules, _utc(17, 0), _utc(18, 0))
+
+        assert out == [(_utc(17, 8), _utc(17, 23))]
+
+    def test_expand_clamps_long_windows(self):
+        rules = normalize_rules(WEEKDAYS_9_TO_17)
+
+        out = expand_rules(rules, _utc(16, 0), datetime(2027, 3, 16, tzinfo=timezone.utc))
+
+        assert (out[-1][0] - _utc(16, 0)).days < MAX_EXPANSION_DAYS
+
+
+@pytest.mark.unit
+class TestRulesContain:
+
+    def test_contained_window_is_available_unless_blocked(self):
+        rules = normalize_rules(WEEKDAYS_9_TO_17)
+
+        assert rules_contain(rules, [], _utc(17, 10), _utc(17, 12)) is True
+        assert rules_contain(rules, [(_utc(17, 11), _utc(17, 13))], _utc(17, 10), _utc(17, 12)) is False
+        assert rules_contain(rules, [(_utc(17, 12), _utc(17, 13))], _utc(17, 10), _utc(17, 12)) is True
+
+    def test_window_outside_occurrences_is_rejected(self):
+        rules = normalize_rules(WEEKDAYS_9_TO_17)
+
+        assert rules_contain(rules, [], _utc(17, 16), _utc(17, 18)) is False
+        assert rules_contain(rules, [], _utc(21, 10), _utc(21, 12)) is False
+        assert rules_contain(None, [], _utc(17, 10), _utc(17, 12)) is False
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -12,7 +13,6 @@ from tests.service_loader import load_service_app_module
 @pytest.fixture
 def reservations_module(monkeypatch):
     fake_redis = MagicMock()
-    fake_redis.smembers = AsyncMock(return_value=set())
     fake_redis.get = AsyncMock(return_value=None)
     fake_redis.pipeline = MagicMock()
 
@@ -40,8 +40,36 @@ class TestReservationKeys:
     def test_res_key(self, reservations_module):
         assert reservations_module._res_key("booking-1") == "reservation:booking-1"
 
-    def test_res_handyman_set(self, reservations_module):
-        assert reservations_module._res_handyman_set("pro@example.com") == "reservations_by_handyman:pro@example.com"
+    def test_res_window_keys(self, reservations_module):
+        assert reservations_module._res_windows_key("pro@example.com") == "reservation_windows:pro@example.com"
+        assert reservations_module._res_window_ends_key("pro@example.com") == "reservation_window_ends:pro@example.com"
+        assert reservations_module._res_windows_maxlen_key("pro@example.com") == "reservation_windows_maxlen:pro@example.com"
+
+
+@pytest.mark.unit
+class TestTtlByCategory:
+
+    def test_parses_valid_json(self, reservations_module):
+        parsed = reservations_module._parse_ttl_by_category('{"Plumbing": "900", "paint": 600}')
+        assert parsed == {"plumbing": 900, "paint": 600}
+
+    def test_malformed_json_falls_back_to_empty(self, reservations_module):
+        assert reservations_module._parse_ttl_by_category("{plumbing: 900") == {}
+        assert reservations_module._parse_ttl_by_category("[900]") == {}
+
+    def test_skips_invalid_entries(self, reservations_module):
+        parsed = reservations_module._parse_ttl_by_category('{"plumbing": "soon", "paint": 600, "roof": null}')
+        assert parsed == {"paint": 600}
+
+    def test_bad_env_value_does_not_break_import(self, monkeypatch, reservations_module):
+        monkeypatch.setenv("RESERVATION_TTL_BY_CATEGORY", "not-json")
+        module = load_service_app_module(
+            "availability-service",
+            "reservations",
+            package_name="availability_service_test_app",
+            reload_modules=True,
+        )
+        assert module.RES_TTL_BY_CATEGORY == {}
 
 
 @pytest.mark.unit
@@ -49,13 +77,7 @@ class TestReservationCrud:
 
     @pytest.mark.asyncio
     async def test_create_reservation_persists_payload(self, reservations_module, monkeypatch):
-        fake_pipe = MagicMock()
-        fake_pipe.set = MagicMock()
-        fake_pipe.sadd = MagicMock()
-        fake_pipe.expire = MagicMock()
-        fake_pipe.zadd = MagicMock()
-        fake_pipe.execute = AsyncMock(return_value=[True, 1, True, 1])
-        reservations_module.redis_client.pipeline = MagicMock(return_value=fake_pipe)
+        reservations_module._reserve_script = AsyncMock(return_value=1)
         monkeypatch.setattr(reservations_module.time, "time", lambda: 1000.0)
 
         result = await reservations_module.create_reservation(
@@ -67,25 +89,77 @@ class TestReservationCrud:
         )
 
         assert result is True
-        payload_json = fake_pipe.set.call_args.args[1]
+        kwargs = reservations_module._reserve_script.await_args.kwargs
+        assert kwargs["keys"] == [
+            "reservation:booking-1",
+            "reservation_windows:pro@example.com",
+            "reservation_window_ends:pro@example.com",
+            "reservation_windows_maxlen:pro@example.com",
+            "reservation_expiry",
+            "reservation_holders",
+        ]
+        booking_id, ds, de, payload_json, payload_ttl, expires_at, now, holder = kwargs["args"]
+        assert booking_id == "booking-1"
+        assert float(ds) == 1773741600.0
+        assert float(de) == 1773748800.0
         payload = json.loads(payload_json)
         assert payload["booking_id"] == "booking-1"
         assert payload["user_email"] == "user@example.com"
         assert payload["handyman_email"] == "pro@example.com"
-        fake_pipe.expire.assert_called_once_with("reservations_by_handyman:pro@example.com", reservations_module.RES_TTL_SECONDS + 30)
-        fake_pipe.zadd.assert_called_once_with("reservation_expiry", {"booking-1": 1000.0 + reservations_module.RES_TTL_SECONDS})
+        assert payload_ttl == reservations_module.RES_TTL_SECONDS + reservations_module.RES_PAYLOAD_GRACE_SECONDS
+        assert expires_at == 1000.0 + reservations_module.RES_TTL_SECONDS
+        assert now == 1000.0
+        assert holder == "pro@example.com"
+
+    @pytest.mark.asyncio
+    async def test_migrate_legacy_holds_indexes_live_holds_and_drops_sets(self, reservations_module, monkeypatch):
+        redis = reservations_module.redis_client
+        redis.scan = AsyncMock(return_value=(0, ["reservations_by_handyman:pro@example.com", "reservations_by_handyman:odd"]))
+        redis.type = AsyncMock(side_effect=["set", "string"])
+        redis.smembers = AsyncMock(return_value={"booking-1"})
+        redis.get = AsyncMock(return_value=json.dumps({
+            "booking_id": "booking-1",
+            "handyman_email": "pro@example.com",
+            "desired_start": "2026-03-17T10:00:00+00:00",
+            "desired_end": "2026-03-17T12:00:00+00:00",
+        }))
+        redis.delete = AsyncMock()
+        reservations_module._migrate_legacy_hold_script = AsyncMock(return_value=1)
+        monkeypatch.setattr(reservations_module.time, "time", lambda: 1000.0)
+
+        assert await reservations_module.migrate_legacy_holds() == 1
+
+        kwargs = reservations_module._migrate_legacy_hold_script.await_args.kwargs
+        assert kwargs["keys"] == [
+            "reservation:booking-1",
+            "reservation_windows:pro@example.com",
+            "reservation_window_ends:pro@example.com",
+            "reservation_windows_maxlen:pro@example.com",
+            "reservation_expiry",
+            "reservation_holders",
+        ]
+        booking_id, ds, de, now, holder = kwargs["args"]
+        assert (booking_id, float(ds), float(de), now, holder) == ("booking-1", 1773741600.0, 1773748800.0, 1000.0, "pro@example.com")
+        redis.delete.assert_awaited_once_with("reservations_by_handyman:pro@example.com")
+
+    @pytest.mark.asyncio
+    async def test_migrate_legacy_holds_skips_missing_payloads(self, reservations_module):
+        redis = reservations_module.redis_client
+        redis.scan = AsyncMock(return_value=(0, ["reservations_by_handyman:pro@example.com"]))
+        redis.type = AsyncMock(return_value="set")
+        redis.smembers = AsyncMock(return_value={"gone"})
+        redis.get = AsyncMock(return_value=None)
+        redis.delete = AsyncMock()
+        reservations_module._migrate_legacy_hold_script = AsyncMock(return_value=1)
+
+        assert await reservations_module.migrate_legacy_holds() == 0
+
+        reservations_module._migrate_legacy_hold_script.assert_not_awaited()
+        redis.delete.assert_awaited_once_with("reservations_by_handyman:pro@example.com")
 
     @pytest.mark.asyncio
     async def test_create_reservation_rejects_overlap(self, reservations_module):
-        reservations_module.redis_client.smembers = AsyncMock(return_value={"booking-existing"})
-        reservations_module.redis_client.get = AsyncMock(
-            return_value=json.dumps(
-                {
-                    "desired_start": "2026-03-17T10:00:00+00:00",
-                    "desired_end": "2026-03-17T12:00:00+00:00",
-                }
-            )
-        )
+        reservations_module._reserve_script = AsyncMock(return_value=0)
 
         result = await reservations_module.create_reservation(
             "booking-new",
@@ -98,27 +172,87 @@ class TestReservationCrud:
         assert result is False
 
     @pytest.mark.asyncio
-    async def test_create_reservation_skips_invalid_existing_payloads(self, reservations_module):
-        fake_pipe = MagicMock()
-        fake_pipe.set = MagicMock()
-        fake_pipe.sadd = MagicMock()
-        fake_pipe.expire = MagicMock()
-        fake_pipe.zadd = MagicMock()
-        fake_pipe.execute = AsyncMock(return_value=[True, 1, True, 1])
-        reservations_module.redis_client.pipeline = MagicMock(return_value=fake_pipe)
-        reservations_module.redis_client.smembers = AsyncMock(return_value={"bad-1", "bad-2"})
-        reservations_module.redis_client.get = AsyncMock(side_effect=["not-json", None])
+    async def test_create_reservation_treats_naive_times_as_utc(self, reservations_module):
+        reservations_module._reserve_script = AsyncMock(return_value=1)
 
-        result = await reservations_module.create_reservation(
-            "booking-new",
+        await reservations_module.create_reservation(
+            "booking-1",
             "user@example.com",
             "pro@example.com",
-            "2026-03-17T13:00:00+00:00",
-            "2026-03-17T14:00:00+00:00",
+            "2026-03-17T10:00:00",
+            "2026-03-17T12:00:00",
         )
 
-        assert result is True
-        fake_pipe.execute.assert_awaited_once()
+        args = reservations_module._reserve_script.await_args.kwargs["args"]
+        assert float(args[1]) == 1773741600.0
+        assert float(args[2]) == 1773748800.0
+
+    @pytest.mark.asyncio
+    async def test_create_reservation_uses_requested_hold(self, reservations_module, monkeypatch):
+        reservations_module._reserve_script = AsyncMock(return_value=1)
+        monkeypatch.setattr(reservations_module.time, "time", lambda: 1000.0)
+
+        await reservations_module.create_reservation(
+            "booking-1",
+            "user@example.com",
+            "pro@example.com",
+            "2026-03-17T10:00:00+00:00",
+            "2026-03-17T12:00:00+00:00",
+            ttl_seconds=900,
+        )
+
+        args = reservations_module._reserve_script.await_args.kwargs["args"]
+        assert json.loads(args[3])["hold_seconds"] == 900
+        assert args[4] == 900 + reservations_module.RES_PAYLOAD_GRACE_SECONDS
+        assert args[5] == 1900.0
+
+    def test_reservation_ttl_prefers_request_then_category(self, reservations_module, monkeypatch):
+        monkeypatch.setattr(reservations_module, "RES_TTL_BY_CATEGORY", {"plumbing": 900})
+
+        assert reservations_module.reservation_ttl(120, "plumbing") == 120
+        assert reservations_module.reservation_ttl(None, "Plumbing") == 900
+        assert reservations_module.reservation_ttl(None, "painting") == reservations_module.RES_TTL_SECONDS
+        assert reservations_module.reservation_ttl() == reservations_module.RES_TTL_SECONDS
+        assert reservations_module.reservation_ttl(10**6) == reservations_module.RES_MAX_TTL_SECONDS
+
+    @pytest.mark.asyncio
+    async def test_extend_reservation_returns_new_expiry(self, reservations_module, monkeypatch):
+        reservations_module._extend_script = AsyncMock(return_value="1600")
+        monkeypatch.setattr(reservations_module.time, "time", lambda: 1000.0)
+
+        assert await reservations_module.extend_reservation("booking-1", 600) == 1600.0
+        kwargs = reservations_module._extend_script.await_args.kwargs
+        assert kwargs["keys"] == ["reservation_expiry", "reservation:booking-1"]
+        assert kwargs["args"] == ["booking-1", 1600.0, 1000.0, reservations_module.RES_PAYLOAD_GRACE_SECONDS]
+
+    @pytest.mark.asyncio
+    async def test_extend_reservation_caps_hold_and_reports_missing(self, reservations_module, monkeypatch):
+        reservations_module._extend_script = AsyncMock(return_value=None)
+        monkeypatch.setattr(reservations_module.time, "time", lambda: 1000.0)
+
+        assert await reservations_module.extend_reservation("booking-1", 10**6) is None
+        args = reservations_module._extend_script.await_args.kwargs["args"]
+        assert args[1] == 1000.0 + reservations_module.RES_MAX_TTL_SECONDS
+
+    @pytest.mark.asyncio
+    async def test_active_holds_decodes_epoch_pairs(self, reservations_module):
+        reservations_module._active_holds_script = AsyncMock(return_value=["1773741600", "1773748800"])
+
+        holds = await reservations_module.active_holds(
+            "pro@example.com",
+            datetime(2026, 3, 17, 8, 0, tzinfo=timezone.utc),
+            datetime(2026, 3, 18, 8, 0, tzinfo=timezone.utc),
+        )
+
+        assert holds == [
+            (datetime(2026, 3, 17, 10, 0, tzinfo=timezone.utc), datetime(2026, 3, 17, 12, 0, tzinfo=timezone.utc))
+        ]
+        assert reservations_module._active_holds_script.await_args.kwargs["keys"] == [
+            "reservation_windows:pro@example.com",
+            "reservation_window_ends:pro@example.com",
+            "reservation_windows_maxlen:pro@example.com",
+            "reservation_expiry",
+        ]
 
     @pytest.mark.asyncio
     async def test_get_reservation_returns_none_when_missing(self, reservations_module):
@@ -145,35 +279,76 @@ class TestReservationCrud:
         assert result == {"booking_id": "booking-1"}
 
     @pytest.mark.asyncio
-    async def test_delete_reservation_removes_handyman_mapping(self, reservations_module):
-        fake_pipe = MagicMock()
-        fake_pipe.delete = MagicMock()
-        fake_pipe.zrem = MagicMock()
-        fake_pipe.srem = MagicMock()
-        fake_pipe.execute = AsyncMock(return_value=[1, 1, 1])
-        reservations_module.redis_client.pipeline = MagicMock(return_value=fake_pipe)
-        reservations_module.get_reservation = AsyncMock(
-            return_value={"handyman_email": "pro@example.com"}
-        )
+    async def test_delete_reservation_runs_one_script(self, reservations_module):
+        reservations_module._delete_reservation_script = AsyncMock(return_value=1)
 
         await reservations_module.delete_reservation("booking-1")
 
-        fake_pipe.delete.assert_called_once_with("reservation:booking-1")
-        fake_pipe.zrem.assert_called_once_with("reservation_expiry", "booking-1")
-        fake_pipe.srem.assert_called_once_with("reservations_by_handyman:pro@example.com", "booking-1")
+        kwargs = reservations_module._delete_reservation_script.await_args.kwargs
+        assert kwargs["keys"] == ["reservation:booking-1", "reservation_expiry", "reservation_holders"]
+        assert kwargs["args"] == ["booking-1", "reservation_windows:", "reservation_window_ends:"]
 
     @pytest.mark.asyncio
-    async def test_delete_reservation_handles_missing_reservation(self, reservations_module):
-        fake_pipe = MagicMock()
-        fake_pipe.delete = MagicMock()
-        fake_pipe.zrem = MagicMock()
-        fake_pipe.srem = MagicMock()
-        fake_pipe.execute = AsyncMock(return_value=[1, 1])
-        reservations_module.redis_client.pipeline = MagicMock(return_value=fake_pipe)
-        reservations_module.get_reservation = AsyncMock(return_value=None)
+    async def test_claim_expired_reservations_decodes_script_reply(self, reservations_module):
+        reservations_module._claim_expired_script = AsyncMock(
+            return_value=[
+                ["booking-1", json.dumps({"user_email": "user@example.com"}), "booking-2", None],
+                "1300.5",
+            ]
+        )
 
-        await reservations_module.delete_reservation("booking-1")
+        claimed, next_score = await reservations_module.claim_expired_reservations(1000.0, 50)
+
+        assert claimed == [("booking-1", {"user_email": "user@example.com"}), ("booking-2", None)]
+        assert next_score == 1300.5
+        kwargs = reservations_module._claim_expired_script.await_args.kwargs
+        assert kwargs["keys"] == ["reservation_expiry", "reservation_holders", "outbox:availability:pending"]
+        now, limit, res_prefix, windows_prefix, ends_prefix, occurred_at, created_at_ms, source = kwargs["args"]
+        assert (now, limit, res_prefix, windows_prefix, ends_prefix) == (
+            1000.0,
+            50,
+            "reservation:",
+            "reservation_windows:",
+            "reservation_window_ends:",
+        )
+        assert datetime.fromisoformat(occurred_at).tzinfo is not None
+        assert isinstance(created_at_ms, int)
+        assert source == "availability-service"
+
+    @pytest.mark.asyncio
+    async def test_claim_expired_reservations_without_pending_expiry(self, reservations_module):
+        reservations_module._claim_expired_script = AsyncMock(return_value=[[], None])
+
+        assert await reservations_module.claim_expired_reservations(1000.0, 50) == ([], None)
+
+
+@pytest.fixture
+def expiry_worker_module(reservations_module):
+    return load_service_app_module(
+        "availability-service",
+        "expiry_worker",
+        package_name="availability_service_test_app",
+    )
+
+
+@pytest.mark.unit
+class TestExpiryWorker:
+
+    @pytest.mark.asyncio
+    async def test_expire_due_reservations_claims_one_batch(self, expiry_worker_module):
+        expiry_worker_module.claim_expired_reservations = AsyncMock(
+            return_value=([("booking-1", {"user_email": "user@example.com"}), ("booking-2", None)], 1300.0)
+        )
+
+        assert await expiry_worker_module.expire_due_reservations(1000.0) == (2, 1300.0)
+        expiry_worker_module.claim_expired_reservations.assert_awaited_once_with(1000.0, expiry_worker_module.EXPIRY_BATCH)
+
+    def test_sleep_tracks_next_expiry_within_bounds(self, expiry_worker_module):
+        sleep = expiry_worker_module._sleep_seconds
+        max_sleep = expiry_worker_module.EXPIRY_MAX_SLEEP_SECONDS
 
-        fake_pipe.delete.assert_called_once_with("reservation:booking-1")
-        fake_pipe.zrem.assert_called_once_with("reservation_expiry", "booking-1")
-        fake_pipe.srem.assert_not_called()
\ No newline at end of file
+        assert sleep(1000.0, 1000.5, 3) == 0.5
+        assert sleep(1000.0, 999.0, 3) == expiry_worker_module.EXPIRY_MIN_SLEEP_SECONDS
+        assert sleep(1000.0, 5000.0, 0) == max_sleep
+        assert sleep(1000.0, None, 0) == max_sleep
+        assert sleep(1000.0, 1000.5, expiry_worker_module.EXPIRY_BATCH) == 0.0
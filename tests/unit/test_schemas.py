@@ -46,6 +46,11 @@ class TestBookingSchemas:
                 job_description="Fix leaky faucet",
             )
 
+    def test_create_booking_schema_hold_seconds_bounds(self, sample_booking_data):
+        assert CreateBooking(**sample_booking_data, hold_seconds=600).hold_seconds == 600
+        with pytest.raises(ValidationError):
+            CreateBooking(**sample_booking_data, hold_seconds=5)
+
     def test_create_booking_schema_date_string_is_accepted(self):
         payload = CreateBooking(
             user_email="user@example.com",
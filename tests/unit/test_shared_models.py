@@ -16,7 +16,12 @@ from shared.shared.schemas.auth import (
     UpdateAuthUserPassword,
     UpdateAuthUserRoles,
 )
-from shared.shared.schemas.availability import AvailabilitySlot, OverlapRequest, SetAvailability
+from shared.shared.schemas.availability import (
+    AvailabilitySlot,
+    BulkAvailabilityCheck,
+    OverlapRequest,
+    SetAvailability,
+)
 from shared.shared.schemas.handymen import (
     CreateHandyman,
     CreateHandymanReview,
@@ -33,6 +38,7 @@ from shared.shared.schemas.handymen import (
     UpdateLocation,
 )
 from shared.shared.schemas.match import MatchLogResponse, MatchRequest, MatchResult, UpdateMatchLog
+from shared.shared.schemas.notifications import BulkNotificationStateRequest
 from shared.shared.schemas.users import CreateUser, UpdateUser, UpdateUserLocation, UserResponse
 
 
@@ -101,6 +107,13 @@ class TestAvailabilitySchemas:
         with pytest.raises(ValidationError):
             OverlapRequest(desired_start="", desired_end="2026-03-17T12:00:00Z")
 
+    def test_bulk_availability_check_caps_batch_size(self):
+        check = {"email": "pro@example.com", "desired_start": "2026-03-17T10:00:00Z", "desired_end": "2026-03-17T12:00:00Z"}
+
+        assert len(BulkAvailabilityCheck(checks=[check] * 1000).checks) == 1000
+        with pytest.raises(ValidationError):
+            BulkAvailabilityCheck(checks=[check] * 1001)
+
 
 @pytest.mark.unit
 class TestMatchSchemas:
@@ -257,6 +270,24 @@ class TestHandymanSchemas:
         assert payload.rating == 5
 
 
+@pytest.mark.unit
+class TestNotificationSchemas:
+
+    def test_bulk_state_request_accepts_read_and_archived(self):
+        payload = BulkNotificationStateRequest(ids=["n1", "n2"], state="archived")
+
+        assert payload.ids == ["n1", "n2"]
+        assert payload.state == "archived"
+
+    def test_bulk_state_request_rejects_unknown_state(self):
+        with pytest.raises(ValidationError):
+            BulkNotificationStateRequest(ids=["n1"], state="unread")
+
+    def test_bulk_state_request_requires_ids(self):
+        with pytest.raises(ValidationError):
+            BulkNotificationStateRequest(ids=[], state="read")
+
+
 @pytest.mark.unit
 class TestSharedEventsAndDb:
 
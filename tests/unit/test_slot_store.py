@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis.asyncio as redis_async
+
+from tests.service_loader import load_service_app_module
+
+
+def _dt(hour: int) -> datetime:
+    return datetime(2026, 3, 17, hour, 0, tzinfo=timezone.utc)
+
+
+def _member(start_hour: int, end_hour: int) -> str:
+    return f"{_dt(start_hour).isoformat()}|{_dt(end_hour).isoformat()}|{_dt(end_hour).timestamp()!r}"
+
+
+@pytest.fixture
+def slot_store_module(monkeypatch):
+    fake_redis = MagicMock()
+    fake_redis.pipeline = MagicMock()
+
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+    monkeypatch.setattr(redis_async, "from_url", lambda *args, **kwargs: fake_redis)
+
+    load_service_app_module(
+        "availability-service",
+        "redis_client",
+        package_name="availability_service_test_app",
+        reload_modules=True,
+    )
+    module = load_service_app_module(
+        "availability-service",
+        "slot_store",
+        package_name="availability_service_test_app",
+    )
+    module.redis_client = fake_redis
+    return module
+
+
+@pytest.mark.unit
+class TestSlotEncoding:
+
+    def test_parse_raw_slot_defaults_naive_to_utc(self, slot_store_module):
+        helpers = load_service_app_module("availability-service", "slot_helpers", package_name="availability_service_test_app")
+
+        start, end = helpers.parse_raw_slot("2026-03-17T10:00:00|2026-03-17T12:00:00")
+
+        assert start == _dt(10)
+        assert end.tzinfo == timezone.utc
+
+    def test_encode_slot_scores_by_epoch_start(self, slot_store_module):
+        helpers = load_service_app_module("availability-service", "slot_helpers", package_name="availability_service_test_app")
+
+        member, score = helpers.encode_slot(_dt(10), _dt(12))
+
+        assert member == _member(10, 12)
+        assert helpers.parse_raw_slot(member) == (_dt(10), _dt(12))
+        assert score == _dt(10).timestamp()
+
+
+@pytest.mark.unit
+class TestSlotStore:
+
+    @pytest.mark.asyncio
+    async def test_replace_slots_swaps_set_in_one_script_and_returns_delta(self, slot_store_module):
+        slot_store_module._replace_slots_script = AsyncMock(return_value=[3, [_member(8, 9), _member(10, 12)]])
+
+        change = await slot_store_module.replace_slots("pro@example.com", [(_dt(10), _dt(12)), (_dt(14), _dt(15))])
+
+        kwargs = slot_store_module._replace_slots_script.await_args.kwargs
+        assert kwargs["keys"] == [
+            "avail:slots:pro@example.com",
+            "avail:maxlen:pro@example.com",
+            "avail:version:pro@example.com",
+            "avail:index",
+            "avail:rules:pro@example.com",
+        ]
+        assert kwargs["args"] == ["pro@example.com", 7201, _dt(10).timestamp(), _member(10, 12), _dt(14).timestamp(), _member(14, 15)]
+        assert change == {
+            "email": "pro@example.com",
+            "version": 3,
+            "slots_added": [{"start": _dt(14).isoformat(), "end": _dt(15).isoformat()}],
+            "slots_removed": [{"start": _dt(8).isoformat(), "end": _dt(9).isoformat()}],
+        }
+
+    @pytest.mark.asyncio
+    async def test_set_rules_runs_one_script_that_maintains_the_index(self, slot_store_module):
+        slot_store_module._set_rules_script = AsyncMock(side_effect=[6, 7])
+
+        assert await slot_store_module.set_rules("pro@example.com", {"timezone": "UTC"}) == 6
+        assert await slot_store_module.set_rules("pro@example.com", None) == 7
+
+        set_call, clear_call = slot_store_module._set_rules_script.await_args_list
+        assert set_call.kwargs["keys"] == [
+            "avail:rules:pro@example.com",
+            "avail:blocked:pro@example.com",
+            "avail:blocked_maxlen:pro@example.com",
+            "avail:version:pro@example.com",
+            "avail:index",
+            "avail:slots:pro@example.com",
+        ]
+        assert set_call.kwargs["args"] == ["pro@example.com", '{"timezone":"UTC"}']
+        # An empty document lets the script drop the email when no slots remain.
+        assert clear_call.kwargs["args"] == ["pro@example.com", ""]
+
+    @pytest.mark.asyncio
+    async def test_clear_availability_bumps_version_in_same_transaction(self, slot_store_module):
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[5, 7])
+        slot_store_module.redis_client.pipeline = MagicMock(return_value=pipe)
+
+        assert await slot_store_module.clear_availability("pro@example.com") == 7
+
+        slot_store_module.redis_client.pipeline.assert_called_with(transaction=True)
+        pipe.incr.assert_called_once_with("avail:version:pro@example.com")
+        pipe.srem.assert_called_once_with("avail:index", "pro@example.com")
+
+    @pytest.mark.asyncio
+    async def test_has_containing_slot_queries_window_around_request(self, slot_store_module):
+        slot_store_module._find_slots_script = AsyncMock(return_value=[_member(8, 9), _member(9, 13)])
+
+        result = await slot_store_module.has_containing_slot("pro@example.com", _dt(10), _dt(12))
+
+        assert result is True
+        kwargs = slot_store_module._find_slots_script.await_args.kwargs
+        assert kwargs["keys"] == ["avail:slots:pro@example.com", "avail:maxlen:pro@example.com"]
+        _now, lo, hi = kwargs["args"]
+        assert (lo, hi) == (_dt(12).timestamp(), _dt(10).timestamp())
+
+    @pytest.mark.asyncio
+    async def test_has_containing_slot_rejects_partial_cover_and_empty_window(self, slot_store_module):
+        slot_store_module._find_slots_script = AsyncMock(return_value=[_member(9, 11)])
+        slot_store_module.redis_client.get = AsyncMock(return_value=None)
+
+        assert await slot_store_module.has_containing_slot("pro@example.com", _dt(10), _dt(12)) is False
+        assert await slot_store_module.has_containing_slot("pro@example.com", _dt(12), _dt(12)) is False
+        assert slot_store_module._find_slots_script.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_has_containing_slot_falls_back_to_rules_and_respects_blocked(self, slot_store_module):
+        # 2026-03-17 is a Tuesday.
+        rules = {"timezone": "UTC", "weekly": [{"weekday": 1, "start": "09:00", "end": "17:00"}]}
+        slot_store_module.redis_client.get = AsyncMock(return_value=json.dumps(rules))
+        slot_store_module._find_slots_script = AsyncMock(side_effect=[[], []])
+
+        assert await slot_store_module.has_containing_slot("pro@example.com", _dt(10), _dt(12)) is True
+
+        slot_store_module._find_slots_script = AsyncMock(side_effect=[[], [_member(11, 13)]])
+
+        assert await slot_store_module.has_containing_slot("pro@example.com", _dt(10), _dt(12)) is False
+        blocked_keys = slot_store_module._find_slots_script.await_args.kwargs["keys"]
+        assert blocked_keys == ["avail:blocked:pro@example.com", "avail:blocked_maxlen:pro@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_has_containing_slots_evaluates_all_checks_from_one_pipeline(self, slot_store_module):
+        rules = {"timezone": "UTC", "weekly": [{"weekday": 1, "start": "09:00", "end": "17:00"}]}
+        pipe = MagicMock()
+        pipe.get = MagicMock()
+        pipe.execute = AsyncMock(
+            return_value=[
+                [_member(9, 13)], None, [],
+                [], json.dumps(rules), [],
+                [], json.dumps(rules), [_member(11, 12)],
+                [], None, [],
+            ]
+        )
+        slot_store_module.redis_client.pipeline = MagicMock(return_value=pipe)
+        slot_store_module._find_slots_script = AsyncMock()
+
+        result = await slot_store_module.has_containing_slots(
+            [
+                ("a@example.com", _dt(10), _dt(12)),
+                ("b@example.com", _dt(10), _dt(12)),
+                ("c@example.com", _dt(10), _dt(12)),
+                ("d@example.com", _dt(12), _dt(10)),
+                ("e@example.com", _dt(10), _dt(12)),
+            ]
+        )
+
+        assert result == [True, True, False, False, False]
+        pipe.execute.assert_awaited_once()
+        assert slot_store_module._find_slots_script.await_count == 8
+        assert all(c.kwargs["client"] is pipe for c in slot_store_module._find_slots_script.await_args_list)
+
+    @pytest.mark.asyncio
+    async def test_read_open_intervals_merges_slots_and_rule_occurrences(self, slot_store_module):
+        rules = {"timezone": "UTC", "weekly": [{"weekday": 1, "start": "14:00", "end": "17:00"}]}
+        pipe = MagicMock()
+        pipe.get = MagicMock()
+        pipe.execute = AsyncMock(return_value=[[_member(9, 12)], json.dumps(rules), [_member(15, 16)]])
+        slot_store_module.redis_client.pipeline = MagicMock(return_value=pipe)
+        slot_store_module._find_slots_script = AsyncMock()
+
+        intervals, blocked = await slot_store_module.read_open_intervals("pro@example.com", _dt(8), _dt(20))
+
+        assert intervals == [(_dt(9), _dt(12)), (_dt(14), _dt(17))]
+        assert blocked == [(_dt(15), _dt(16))]
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_subtract_interval_runs_one_script_and_returns_new_slots(self, slot_store_module):
+        slot_store_module._subtract_interval_script = AsyncMock(
+            return_value=[4, [_member(9, 13)], [_member(9, 10), _member(12, 13)], []]
+        )
+        slot_store_module.redis_client.pipeline = MagicMock()
+        slot_store_module.redis_client.get = AsyncMock(return_value=None)
+
+        change = await slot_store_module.subtract_interval("pro@example.com", _dt(10), _dt(12))
+
+        assert change == {
+            "email": "pro@example.com",
+            "version": 4,
+            "slots_added": [
+                {"start": _dt(9).isoformat(), "end": _dt(10).isoformat()},
+                {"start": _dt(12).isoformat(), "end": _dt(13).isoformat()},
+            ],
+            "slots_removed": [{"start": _dt(9).isoformat(), "end": _dt(13).isoformat()}],
+            "blocked_added": [],
+        }
+        kwargs = slot_store_module._subtract_interval_script.await_args.kwargs
+        assert kwargs["keys"] == [
+            "avail:slots:pro@example.com",
+            "avail:maxlen:pro@example.com",
+            "avail:rules:pro@example.com",
+            "avail:blocked:pro@example.com",
+            "avail:blocked_maxlen:pro@example.com",
+            "avail:version:pro@example.com",
+            "avail:index",
+        ]
+        assert kwargs["args"] == [
+            repr(_dt(10).timestamp()),
+            repr(_dt(12).timestamp()),
+            _dt(10).isoformat(),
+            _dt(12).isoformat(),
+            "",
+            "",
+            "pro@example.com",
+        ]
+        slot_store_module.redis_client.pipeline.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_subtract_interval_blocks_rule_window_even_when_slot_is_split(self, slot_store_module):
+        rules = json.dumps({"timezone": "UTC", "weekly": [{"weekday": 1, "start": "09:00", "end": "17:00"}]})
+        slot_store_module.redis_client.get = AsyncMock(return_value=rules)
+        slot_store_module._subtract_interval_script = AsyncMock(
+            return_value=[5, [_member(9, 12)], [_member(9, 10), _member(11, 12)], [_member(10, 11)]]
+        )
+
+        change = await slot_store_module.subtract_interval("pro@example.com", _dt(10), _dt(11))
+
+        args = slot_store_module._subtract_interval_script.await_args.kwargs["args"]
+        assert args[4:] == ["1", rules, "pro@example.com"]
+        assert change["blocked_added"] == [{"start": _dt(10).isoformat(), "end": _dt(11).isoformat()}]
+
+    @pytest.mark.asyncio
+    async def test_subtract_interval_outside_rule_occurrences_is_not_blocked(self, slot_store_module):
+        rules = json.dumps({"timezone": "UTC", "weekly": [{"weekday": 1, "start": "13:00", "end": "17:00"}]})
+        slot_store_module.redis_client.get = AsyncMock(return_value=rules)
+        slot_store_module._subtract_interval_script = AsyncMock(return_value=[5, [_member(9, 12)], [_member(9, 10), _member(11, 12)], []])
+
+        await slot_store_module.subtract_interval("pro@example.com", _dt(10), _dt(11))
+
+        assert slot_store_module._subtract_interval_script.await_args.kwargs["args"][4:] == ["", rules, "pro@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_subtract_interval_reports_no_version_when_nothing_changed(self, slot_store_module):
+        slot_store_module._subtract_interval_script = AsyncMock(return_value=[0, [], [], []])
+        slot_store_module.redis_client.get = AsyncMock(return_value=None)
+
+        change = await slot_store_module.subtract_interval("pro@example.com", _dt(10), _dt(12))
+
+        assert change["version"] is None
+
+    def test_subtract_script_pieces_match_python_encoding(self, slot_store_module):
+        helpers = load_service_app_module("availability-service", "slot_helpers", package_name="availability_service_test_app")
+
+        left_member, _ = helpers.encode_slot(_dt(9), _dt(10))
+        right_member, _ = helpers.encode_slot(_dt(12), _dt(13))
+
+        # The script builds "s_iso|ds_iso|ds_epoch" and "de_iso|e_iso|e_epoch" from its ARGV.
+        assert left_member == f"{_dt(9).isoformat()}|{_dt(10).isoformat()}|{helpers.epoch_str(_dt(10))}"
+        assert right_member == _member(12, 13)
+
+    @pytest.mark.asyncio
+    async def test_read_slots_skips_malformed_members(self, slot_store_module):
+        slot_store_module._find_slots_script = AsyncMock(return_value=[_member(10, 12), "garbage"])
+
+        slots = await slot_store_module.read_slots("pro@example.com")
+
+        assert slots == [{"start": _dt(10).isoformat(), "end": _dt(12).isoformat()}]
+
+    @pytest.mark.asyncio
+    async def test_list_slots_page_pipelines_reads(self, slot_store_module):
+        rules = {"timezone": "UTC", "weekly": [{"weekday": 1, "start": "09:00", "end": "17:00"}]}
+        slot_store_module.redis_client.sscan = AsyncMock(return_value=(5, ["a@example.com", "b@example.com"]))
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[[_member(10, 12)], None, [], None, [], json.dumps(rules), [_member(13, 14)], "9"])
+        slot_store_module.redis_client.pipeline = MagicMock(return_value=pipe)
+
+        cursor, items = await slot_store_module.list_slots_page(0, 100)
+
+        assert cursor == 5
+        assert items == [
+            {
+                "email": "a@example.com",
+                "version": 0,
+                "slots": [{"start": _dt(10).isoformat(), "end": _dt(12).isoformat()}],
+                "rules": None,
+                "blocked": [],
+            },
+            {
+                "email": "b@example.com",
+                "version": 9,
+                "slots": [],
+                "rules": rules,
+                "blocked": [{"start": _dt(13).isoformat(), "end": _dt(14).isoformat()}],
+            },
+        ]
+        assert pipe.zrange.call_count == 4
+        slot_store_module.redis_client.sscan.assert_awaited_once_with("avail:index", cursor=0, count=100)
+
+    @pytest.mark.asyncio
+    async def test_iter_availability_follows_sscan_cursor(self, slot_store_module):
+        slot_store_module.list_slots_page = AsyncMock(
+            side_effect=[(9, [{"email": "a@example.com"}]), (4, []), (0, [{"email": "b@example.com"}])]
+        )
+
+        pages = [items async for items in slot_store_module.iter_availability(50)]
+
+        assert pages == [[{"email": "a@example.com"}], [{"email": "b@example.com"}]]
+        assert [c.args for c in slot_store_module.list_slots_page.await_args_list] == [(0, 50), (9, 50), (4, 50)]
+
+    @pytest.mark.asyncio
+    async def test_build_availability_index_backfills_once(self, slot_store_module):
+        redis = slot_store_module.redis_client
+        redis.exists = AsyncMock(return_value=0)
+        redis.scan = AsyncMock(
+            return_value=(0, ["avail:slots:a@example.com", "avail:rules:b@example.com", "avail:maxlen:a@example.com"])
+        )
+        redis.sadd = AsyncMock(return_value=2)
+        redis.set = AsyncMock()
+
+        assert await slot_store_module.build_availability_index() == 2
+        assert set(redis.sadd.await_args.args[1:]) == {"a@example.com", "b@example.com"}
+        redis.set.assert_awaited_once_with("avail:index:built", "1")
+
+        redis.exists = AsyncMock(return_value=1)
+        assert await slot_store_module.build_availability_index() == 0
+        assert redis.scan.await_count == 1